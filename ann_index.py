@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Approximate nearest-neighbour (IVF) index for large knowledge store partitions
+
+Exact search scores every chunk in a partition, which is what the demo
+knowledge bases want and what a catalog of millions of chunks can't afford.
+IVFIndex is an inverted-file index in plain NumPy: spherical k-means splits
+the partition into `nlist` clusters, and a query only scores the chunks of
+its `nprobe` nearest clusters. nprobe trades recall for latency per search;
+bench_ann_index.py measures recall@k against exact search.
+
+The index keeps its own copy of the partition's vectors in cluster order,
+next to the centroids, the row ids in that order and the cluster offsets,
+so a probe scores contiguous slices (gathering scattered store rows instead
+is several times slower per candidate). That doubles the partition's
+footprint, which is why small partitions stay exact. Indexes are saved next
+to the store as .npy files and memory-mapped, so forked workers share one
+copy and a rebuilt store (a new directory) never sees a stale index.
+"""
+
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+from signalwire_agents.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_NPROBE = 16
+KMEANS_ITERATIONS = 10
+# Training rows per cluster; more only slows the build down
+KMEANS_SAMPLE_PER_LIST = 64
+# Rows scored against the centroids at a time while assigning
+ASSIGN_BLOCK = 16384
+
+
+def default_nlist(rows: int) -> int:
+    """About sqrt(rows) clusters, the usual IVF starting point"""
+    return max(1, int(rows ** 0.5))
+
+
+class IVFIndex:
+    """
+    Inverted-file index over one partition's unit-normalized embeddings
+
+    Build with IVFIndex.build(vectors), or load a saved one with
+    IVFIndex.load(prefix). Row ids are relative to the partition.
+    """
+
+    _ARRAYS = ("centroids", "order", "offsets", "vectors")
+
+    def __init__(self, centroids, order, offsets, vectors):
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+        self.vectors = vectors
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors, nlist: Optional[int] = None, iterations: int = KMEANS_ITERATIONS,
+              seed: int = 0) -> "IVFIndex":
+        """
+        Cluster vectors with spherical k-means and bucket every row
+
+        Args:
+            vectors: N x D unit-normalized embeddings (a mapped array is fine)
+            nlist: Number of clusters (default about sqrt(N))
+            iterations: k-means iterations over the training sample
+            seed: Seed for the training sample and initial centroids
+        """
+        import numpy as np
+
+        rows = len(vectors)
+        nlist = min(nlist or default_nlist(rows), rows)
+        rng = np.random.default_rng(seed)
+        sample_size = min(rows, nlist * KMEANS_SAMPLE_PER_LIST)
+        sample = np.asarray(vectors[np.sort(rng.choice(rows, sample_size, replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0.0
+            # Re-seed empty clusters from random training rows
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        assignment = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, ASSIGN_BLOCK):
+            block = np.asarray(vectors[start:start + ASSIGN_BLOCK], dtype=np.float32)
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable").astype(np.int32)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=nlist), out=offsets[1:])
+        ordered = np.empty((rows, vectors.shape[1]), dtype=np.float32)
+        for start in range(0, rows, ASSIGN_BLOCK):
+            ordered[start:start + ASSIGN_BLOCK] = vectors[order[start:start + ASSIGN_BLOCK]]
+        return cls(centroids, order, offsets, ordered)
+
+    def save(self, prefix: str) -> None:
+        """Write <prefix>.centroids.npy, .order.npy, .offsets.npy and .vectors.npy (atomically each)"""
+        import numpy as np
+
+        for name in self._ARRAYS:
+            array = getattr(self, name)
+            path = f"{prefix}.{name}.npy"
+            staging = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(staging, "wb") as f:
+                np.save(f, array)
+            os.replace(staging, path)
+
+    @classmethod
+    def load(cls, prefix: str) -> "IVFIndex":
+        """Memory-map an index written by save()"""
+        import numpy as np
+
+        return cls(*(np.load(f"{prefix}.{name}.npy", mmap_mode="r") for name in cls._ARRAYS))
+
+    def search(self, query, count: int, nprobe: int = DEFAULT_NPROBE) -> Tuple:
+        """
+        Approximate top-count rows for one unit-normalized query
+
+        Returns:
+            (row ids, scores), ordered by descending score
+        """
+        return self._probe(query, self.centroids @ query, count, nprobe)
+
+    def search_batch(self, queries, count: int, nprobe: int = DEFAULT_NPROBE):
+        """search() for B unit-normalized queries, scoring the centroids with one matrix multiply"""
+        centroid_scores = queries @ self.centroids.T
+        return [self._probe(query, scores, count, nprobe) for query, scores in zip(queries, centroid_scores)]
+
+    def _probe(self, query, centroid_scores, count: int, nprobe: int) -> Tuple:
+        import numpy as np
+
+        nprobe = min(nprobe, self.nlist)
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        ids = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+        if not len(ids):
+            return ids, np.zeros(0, dtype=np.float32)
+        scores = np.concatenate([self.vectors[self.offsets[c]:self.offsets[c + 1]] @ query for c in probe])
+        count = min(count, len(ids))
+        top = np.argpartition(-scores, count - 1)[:count]
+        top = top[np.argsort(-scores[top])]
+        return ids[top], scores[top]
+
+
+def load_or_build(directory: str, partition: str, vectors, nlist: Optional[int] = None) -> IVFIndex:
+    """
+    The partition's saved index, or a new one saved for the next process
+
+    A store directory that can't be written to still gets an in-memory index.
+    """
+    nlist = min(nlist or default_nlist(len(vectors)), len(vectors))
+    prefix = os.path.join(directory, f"ivf-{partition}-{nlist}")
+    try:
+        return IVFIndex.load(prefix)
+    except (OSError, ValueError):
+        pass
+    started = time.perf_counter()
+    index = IVFIndex.build(vectors, nlist)
+    build_ms = round((time.perf_counter() - started) * 1000, 1)
+    try:
+        index.save(prefix)
+    except OSError as e:
+        logger.warning("ann_index_not_saved", partition=partition, error=str(e))
+    logger.info("ann_index_built", partition=partition, rows=len(vectors), nlist=nlist, build_ms=build_ms)
+    return index
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Run async SWAIG tool handlers to completion, off the server's event loop
+
+The SDK calls tool handlers synchronously and serializes whatever they
+return, so an `async def` tool hands back an un-awaited coroutine. Awaitable
+results are run here on one long-lived background event loop, which also
+gives async resources a single loop to live on.
+
+The SDK also dispatches SWAIG calls synchronously from its async request
+handler, so a slow tool would stall every other request the server's event
+loop is handling. SWAIG POSTs are therefore handled on a bounded pool of
+threads (SWAIG_WORKERS, default 16), each with its own event loop; the
+server's loop only reads the request body and awaits the result.
+
+Async generator handlers stream their result (see tool_streams.py).
+"""
+
+import asyncio
+import inspect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from process_local import ProcessLocal
+from tool_streams import define_continuation_tool, start_stream
+
+DEFAULT_SWAIG_WORKERS = 16
+
+_thread_state = threading.local()
+
+
+def _start_tool_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="async-tools", daemon=True).start()
+    return loop
+
+
+# The loop's thread doesn't survive fork; a forked worker starts its own
+_loop = ProcessLocal(_start_tool_loop)
+_swaig_pool = ProcessLocal(lambda: ThreadPoolExecutor(
+    max_workers=int(os.getenv("SWAIG_WORKERS", str(DEFAULT_SWAIG_WORKERS))),
+    thread_name_prefix="swaig",
+))
+
+
+def get_tool_loop() -> asyncio.AbstractEventLoop:
+    """The background event loop async tools run on, started on first use"""
+    return _loop.get()
+
+
+def run_awaitable(awaitable, timeout: Optional[float] = None) -> Any:
+    """Block until awaitable completes on the tool loop and return its result"""
+    async def wait():
+        return await awaitable
+    return asyncio.run_coroutine_threadsafe(wait(), get_tool_loop()).result(timeout)
+
+
+def get_swaig_pool() -> ThreadPoolExecutor:
+    """Threads SWAIG requests are handled on, started on first use"""
+    return _swaig_pool.get()
+
+
+def _run_on_thread_loop(coroutine) -> Any:
+    """Run a coroutine to completion on this pool thread's own event loop"""
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None:
+        loop = _thread_state.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coroutine)
+
+
+class AsyncToolMixin:
+    """
+    Await async tool handlers on the tool loop and keep SWAIG calls off the
+    server's event loop; must come before AgentBase in the bases
+    """
+
+    async def _handle_swaig_request(self, request, response):
+        if request.method != "POST":
+            return await super()._handle_swaig_request(request, response)
+        try:
+            # The body has to be read on the loop that owns the connection;
+            # the SDK handler then finds it cached
+            await self._read_body_with_limit(request)
+        except ValueError:
+            # Oversized: let the SDK produce its 413 here
+            return await super()._handle_swaig_request(request, response)
+        return await asyncio.get_running_loop().run_in_executor(
+            get_swaig_pool(), _run_on_thread_loop, super()._handle_swaig_request(request, response)
+        )
+
+    def define_continuation_tool(self) -> None:
+        """Register continue_tool_result, for agents with streaming (async generator) tools"""
+        define_continuation_tool(self)
+
+    def on_function_call(self, name: str, args: Dict[str, Any], raw_data: Optional[Dict[str, Any]] = None):
+        result = super().on_function_call(name, args, raw_data)
+        if inspect.isasyncgen(result):
+            return start_stream(name, result, raw_data, get_tool_loop())
+        if inspect.isawaitable(result):
+            try:
+                result = run_awaitable(result)
+            except Exception as e:
+                # Same shape as the SDK's error for a failing sync handler
+                return {"response": f"Error executing function '{name}': {str(e)}"}
+        return result
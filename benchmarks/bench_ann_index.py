@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+ANN index benchmark: recall@k vs latency against exact search
+
+Writes a synthetic corpus of --chunks unit-normalized embeddings to a
+memory-mapped file (the same layout as the knowledge store's
+embeddings.f32), clustered around --topics topic centres the way real
+document embeddings are, builds an IVFIndex over it and searches it with
+queries near random topics. For each nprobe it reports recall@k (the share
+of the exact top k the index also returns), p50/p99 latency and the speedup
+over exact search, plus the index build time and size.
+
+A 1M x 384 corpus needs about 1.5 GB of disk and page cache.
+
+Usage:
+    python benchmarks/bench_ann_index.py [--chunks 1000000] [--dims 384] [--queries 100] [--k 10]
+        [--nprobe 1 2 4 8 16 32 64 128] [--nlist N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from bench_utils import percentile
+
+import numpy as np
+
+from ann_index import IVFIndex, default_nlist
+
+BLOCK = 65536
+
+
+def normalize(vectors):
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def write_corpus(path: str, chunks: int, dims: int, topics: int, spread: float, seed: int):
+    rng = np.random.default_rng(seed)
+    centres = normalize(rng.standard_normal((topics, dims), dtype=np.float32))
+    corpus = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(chunks, dims))
+    for start in range(0, chunks, BLOCK):
+        size = min(BLOCK, chunks - start)
+        noise = rng.standard_normal((size, dims), dtype=np.float32) * (spread / np.sqrt(dims))
+        corpus[start:start + size] = normalize(centres[rng.integers(0, topics, size)] + noise)
+    corpus.flush()
+    del corpus
+    return np.load(path, mmap_mode="r"), centres
+
+
+def exact_top(corpus, query, k: int):
+    scores = corpus @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--dims", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=5000, help="topic clusters in the synthetic corpus")
+    parser.add_argument("--spread", type=float, default=0.75,
+                        help="noise around each topic; 0.75 puts chunks at cosine ~0.8 from their topic")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64, 128])
+    parser.add_argument("--nlist", type=int, default=None, help="IVF clusters (default about sqrt(chunks))")
+    parser.add_argument("--min-recall", type=float, default=0.9,
+                        help="exit 1 unless some nprobe reaches this recall faster than exact search")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        corpus, centres = write_corpus(os.path.join(tmp, "embeddings.npy"), args.chunks, args.dims,
+                                       args.topics, args.spread, 1)
+        generate_s = time.perf_counter() - started
+        rng = np.random.default_rng(2)
+        queries = normalize(centres[rng.integers(0, args.topics, args.queries)]
+                            + rng.standard_normal((args.queries, args.dims), dtype=np.float32)
+                            * (args.spread / np.sqrt(args.dims)))
+
+        index, build_ms = timed(lambda: IVFIndex.build(corpus, args.nlist or default_nlist(args.chunks)))
+        index.save(os.path.join(tmp, "ivf"))
+        index_mb = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp) if f.startswith("ivf")) / 2**20
+        # Page the corpus in once so exact search isn't charged for the first read
+        exact_top(corpus, queries[0], args.k)
+
+        truth, exact_ms = [], []
+        for query in queries:
+            top, ms = timed(lambda: exact_top(corpus, query, args.k))
+            truth.append(set(top.tolist()))
+            exact_ms.append(ms)
+        exact_ms.sort()
+
+        rows = []
+        for nprobe in args.nprobe:
+            recalls, latencies = [], []
+            for query, expected in zip(queries, truth):
+                (ids, _), ms = timed(lambda: index.search(query, args.k, nprobe))
+                recalls.append(len(expected & set(ids.tolist())) / args.k)
+                latencies.append(ms)
+            latencies.sort()
+            rows.append({
+                "nprobe": nprobe,
+                "recall": round(float(np.mean(recalls)), 4),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "speedup": round(percentile(exact_ms, 50) / max(percentile(latencies, 50), 1e-6), 1),
+            })
+        del corpus
+
+    summary = {
+        "chunks": args.chunks, "dims": args.dims, "nlist": index.nlist, "k": args.k,
+        "generate_s": round(generate_s, 1), "build_s": round(build_ms / 1000, 1), "index_mb": round(index_mb, 1),
+        "exact_p50_ms": round(percentile(exact_ms, 50), 3), "exact_p99_ms": round(percentile(exact_ms, 99), 3),
+        "results": rows,
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"{args.chunks} x {args.dims} ({args.topics} topics), nlist {index.nlist}, {args.queries} queries, "
+              f"recall@{args.k}")
+        print(f"index build {summary['build_s']}s, {summary['index_mb']} MB on disk "
+              f"(corpus generated in {summary['generate_s']}s)")
+        print(f"{'search':<12} {'recall':>7} {'p50 ms':>8} {'p99 ms':>8} {'speedup':>8}")
+        print(f"{'exact':<12} {1.0:>7.4f} {summary['exact_p50_ms']:>8} {summary['exact_p99_ms']:>8} {'1.0x':>8}")
+        for row in rows:
+            print(f"{'nprobe ' + str(row['nprobe']):<12} {row['recall']:>7.4f} {row['p50_ms']:>8} "
+                  f"{row['p99_ms']:>8} {str(row['speedup']) + 'x':>8}")
+
+    if not any(row["recall"] >= args.min_recall and row["speedup"] > 1 for row in rows):
+        print("FAIL")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Build optimizer latency benchmark
+
+Sweeps budgets from $800 to $6000 for every use case and a few preference
+sets, timing create_build_recommendation's solver path: first with cold
+memo tables (frontier per preference set computed on demand) and then warm.
+Fails (exit 1) if any p99 exceeds the voice-turn budget.
+
+Usage:
+    python benchmarks/bench_build_optimizer.py [--step 50] [--limit-ms 20]
+"""
+
+import argparse
+import sys
+import time
+
+from bench_utils import percentile
+
+from build_optimizer import USE_CASE_WEIGHTS, BuildOptimizer
+
+PREFERENCES = ["", "quiet", "AMD with RGB", "lots of storage, 4K"]
+
+
+def sweep(optimizer: BuildOptimizer, budgets, label: str):
+    samples = []
+    answered = 0
+    for use_case in USE_CASE_WEIGHTS:
+        for preferences in PREFERENCES:
+            for budget in budgets:
+                start = time.perf_counter()
+                text = optimizer.recommend_text(f"${budget:,}", use_case, preferences)
+                samples.append((time.perf_counter() - start) * 1000)
+                answered += text.startswith("Best")
+    samples.sort()
+    print(f"{label:<6} {len(samples):>7} calls  {answered:>6} in budget  "
+          f"p50 {percentile(samples, 50):.4f} ms  p99 {percentile(samples, 99):.4f} ms  "
+          f"max {samples[-1]:.3f} ms")
+    return percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--step", type=int, default=50)
+    parser.add_argument("--limit-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    optimizer = BuildOptimizer()
+    print(f"startup: {(time.perf_counter() - start) * 1000:.1f} ms, {len(optimizer.options)} compatible options")
+
+    budgets = range(800, 6001, args.step)
+    worst = max(sweep(optimizer, budgets, "cold"), sweep(optimizer, budgets, "warm"))
+    if worst > args.limit_ms:
+        print(f"FAIL: p99 {worst:.3f} ms exceeds {args.limit_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Call context store load benchmark
+
+Simulates --calls concurrent transfers across --threads threads: each call
+saves its context (triage side) and reads it back (specialist side). Reports
+put/get p50/p99 and throughput for the in-memory and SQLite backends, then
+checks the store stayed bounded: the in-memory store holds at most
+--max-calls entries and an expired SQLite store purges back to zero rows.
+
+Usage:
+    python benchmarks/bench_call_context.py [--calls 20000] [--threads 32] [--max-calls 5000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import percentile
+
+from call_context import MemoryContextStore, SQLiteContextStore
+
+
+def run_calls(store, calls: int, threads: int):
+    def one_call(index: int):
+        call_id = f"call-{index:08d}"
+        start = time.perf_counter()
+        store.put(call_id, {"user_name": f"Customer {index}",
+                            "summary": "Wants a quiet 1440p gaming build around $1,800",
+                            "transferred_to": "sales"})
+        saved = time.perf_counter()
+        context = store.get(call_id)
+        done = time.perf_counter()
+        return (saved - start) * 1000, (done - saved) * 1000, context is not None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one_call, range(calls)))
+    store.flush()
+    elapsed = time.perf_counter() - started
+
+    puts = sorted(r[0] for r in results)
+    gets = sorted(r[1] for r in results)
+    found = sum(r[2] for r in results)
+    return elapsed, puts, gets, found
+
+
+def report(label: str, calls: int, elapsed: float, puts, gets, found: int):
+    print(f"{label:<7} {calls / elapsed:>9.0f} calls/s  put p50 {percentile(puts, 50):.3f} ms "
+          f"p99 {percentile(puts, 99):.3f} ms  get p50 {percentile(gets, 50):.3f} ms "
+          f"p99 {percentile(gets, 99):.3f} ms  found {found}/{calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--max-calls", type=int, default=5000, help="in-memory store bound")
+    args = parser.parse_args()
+    ok = True
+
+    memory = MemoryContextStore(max_calls=args.max_calls)
+    elapsed, puts, gets, found = run_calls(memory, args.calls, args.threads)
+    report("memory", args.calls, elapsed, puts, gets, found)
+    entries = memory.stats()["entries"]
+    print(f"        entries held: {entries} (bound {args.max_calls})")
+    ok &= entries <= args.max_calls and found == args.calls
+
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite_store = SQLiteContextStore(os.path.join(directory, "context.db"), ttl=1.0)
+        elapsed, puts, gets, found = run_calls(sqlite_store, args.calls, args.threads)
+        report("sqlite", args.calls, elapsed, puts, gets, found)
+        stats = sqlite_store.stats()
+        print(f"        rows {stats['rows']}, {stats['batches']} batches "
+              f"({stats['rows_written'] / max(stats['batches'], 1):.0f} rows/commit)")
+        ok &= found == args.calls
+
+        time.sleep(1.1)
+        purged = sqlite_store.purge_expired()
+        rows = sqlite_store.stats()["rows"]
+        print(f"        after TTL: purged {purged}, rows left {rows}")
+        ok &= rows == 0
+        sqlite_store.close()
+
+    if not ok:
+        print("FAIL: lost contexts or unbounded growth")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
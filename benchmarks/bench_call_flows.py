@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Call flow load test for the three-agent server
+
+Boots create_pc_builder_app() in-process and drives it with a small stand-in
+for the SignalWire platform: it fetches SWML the way the platform does,
+calls SWAIG functions through the webhook URLs (and security tokens) in the
+returned document, applies set_global_data actions and follows SWML transfer
+actions to the next agent. Each simulated call replays a realistic flow:
+
+    SWML /  ->  transfer_to_specialist  ->  SWML /sales?transfer=true (or /support)
+            ->  two or three specialist tool calls
+
+Reports requests/sec and p50/p95/p99 per step. As a regression gate, save a
+baseline on a known-good tree and compare later runs against it; the run
+exits 1 if any step's p95 regresses past --tolerance, or if any request fails.
+
+Usage:
+    python benchmarks/bench_call_flows.py [--calls 300] [--concurrency 4]
+    python benchmarks/bench_call_flows.py --save-baseline baseline.json
+    python benchmarks/bench_call_flows.py --baseline baseline.json [--tolerance 25]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from bench_utils import percentile, start_client
+
+SALES_TOOLS = [
+    ("create_build_recommendation", {"budget": "$1,800", "use_case": "1440p gaming and some streaming",
+                                     "preferences": "quiet, white case"}),
+    ("check_component_compatibility", {"components": "i5-14600K, RTX 4070 Super, B760 board, 750W PSU, "
+                                                     "NH-D15, Lancool 216"}),
+    ("create_build_recommendation", {"budget": "$3,500", "use_case": "video editing workstation",
+                                     "preferences": "lots of storage"}),
+]
+SUPPORT_TOOLS = [
+    ("diagnose_hardware_issue", {"symptoms": "blue screen MEMORY_MANAGEMENT after XMP enabled",
+                                 "system_specs": "Ryzen 7 7800X3D, 32GB DDR5-6000, RTX 4070"}),
+    ("create_support_ticket", {"issue_description": "Random shutdowns under gaming load",
+                               "customer_info": "Jordan, jordan@example.com", "priority": "high"}),
+]
+FLOWS = [
+    ("sales", "Customer Alex Rivera wants a quiet 1440p gaming PC around $1,800.", SALES_TOOLS),
+    ("support", "Customer Sam Lee gets blue screens after enabling XMP on a new build.", SUPPORT_TOOLS),
+]
+
+
+class FlowError(Exception):
+    pass
+
+
+class SignalWireStandIn:
+    """Just enough of the platform to run a call through the agents"""
+
+    def __init__(self, client, timings):
+        self.client = client
+        self.timings = timings
+
+    def _post(self, step: str, url: str, payload: dict) -> dict:
+        start = time.perf_counter()
+        response = self.client.post(url, json=payload)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.timings.record(step, elapsed, ok=response.status_code == 200)
+        if response.status_code != 200:
+            raise FlowError(f"{step}: HTTP {response.status_code}")
+        return response.json()
+
+    def fetch_swml(self, url: str, call: dict) -> dict:
+        path = urlsplit(url)
+        target = path.path + (f"?{path.query}" if path.query else "")
+        document = self._post(f"swml {target}", target, {"call_id": call["call_id"], "call": call})
+        for verb in document["sections"]["main"]:
+            if "ai" in verb:
+                return verb["ai"]
+        raise FlowError(f"swml {target}: no AI verb")
+
+    def call_function(self, ai: dict, name: str, args: dict, call: dict, global_data: dict) -> dict:
+        function = next((f for f in ai["SWAIG"]["functions"] if f["function"] == name), None)
+        if function is None:
+            raise FlowError(f"swaig {name}: not offered by the agent")
+        url = urlsplit(function.get("web_hook_url") or ai["SWAIG"]["defaults"]["web_hook_url"])
+        result = self._post(f"swaig {name}", f"{url.path}?{url.query}", {
+            "function": name,
+            "call_id": call["call_id"],
+            "argument": {"parsed": [args], "raw": json.dumps(args)},
+            "global_data": global_data,
+            "meta_data": {},
+        })
+        if "error" in result or str(result.get("response", "")).startswith(("Error executing", "<coroutine")):
+            self.timings.record(f"swaig {name}", 0.0, ok=False, count=False)
+            raise FlowError(f"swaig {name}: {result}")
+        return result
+
+    def run_call(self, call_id: str, flow) -> None:
+        specialist, summary, tools = flow
+        call = {"call_id": call_id, "from": "+15551230000", "to": "+15559870000", "direction": "inbound"}
+        global_data = {}
+
+        ai = self.fetch_swml("/", call)
+        result = self.call_function(ai, "transfer_to_specialist", {
+            "specialist_type": specialist, "user_name": summary.split()[1], "summary": summary,
+        }, call, global_data)
+
+        destination = None
+        for action in result.get("action", []):
+            global_data.update(action.get("set_global_data", {}))
+            for verb in action.get("SWML", {}).get("sections", {}).get("main", []):
+                destination = verb.get("transfer", {}).get("dest", destination)
+        if destination is None:
+            raise FlowError("transfer_to_specialist: no transfer action")
+
+        ai = self.fetch_swml(destination, call)
+        global_data = ai.get("global_data", global_data)
+        for name, args in tools:
+            self.call_function(ai, name, args, call, global_data)
+
+
+class StepTimings:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.failures = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, step: str, ms: float, ok: bool = True, count: bool = True):
+        with self._lock:
+            if count:
+                self.samples[step].append(ms)
+            if not ok:
+                self.failures[step] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        steps = {}
+        for step, samples in self.samples.items():
+            ordered = sorted(samples)
+            steps[step] = {
+                "count": len(ordered),
+                "req_per_s": round(len(ordered) / elapsed, 1),
+                "p50_ms": round(percentile(ordered, 50), 3),
+                "p95_ms": round(percentile(ordered, 95), 3),
+                "p99_ms": round(percentile(ordered, 99), 3),
+                "failures": self.failures.get(step, 0),
+            }
+        return steps
+
+
+def compare(steps: dict, baseline: dict, tolerance: float, floor_ms: float) -> list:
+    """Steps whose p95 regressed more than tolerance percent (and floor_ms) over the baseline"""
+    regressions = []
+    for step, before in baseline.items():
+        after = steps.get(step)
+        if after is None:
+            regressions.append(f"{step}: missing from this run")
+            continue
+        limit = max(before["p95_ms"] * (1 + tolerance / 100), before["p95_ms"] + floor_ms)
+        if after["p95_ms"] > limit:
+            regressions.append(f"{step}: p95 {after['p95_ms']:.3f} ms > {limit:.3f} ms "
+                               f"(baseline {before['p95_ms']:.3f} ms)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=300, help="simulated calls to run")
+    parser.add_argument("--concurrency", type=int, default=4, help="calls in flight at once")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed calls first")
+    parser.add_argument("--save-baseline", metavar="FILE", help="write per-step results as a baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="fail if p95 regresses against this baseline")
+    parser.add_argument("--tolerance", type=float, default=25.0, help="allowed p95 regression, percent")
+    parser.add_argument("--floor-ms", type=float, default=0.5, help="ignore regressions smaller than this")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    # Keep tickets and call context out of the working directory
+    scratch = tempfile.mkdtemp(prefix="pc-builder-flows-")
+    os.environ.setdefault("TICKET_DB_PATH", os.path.join(scratch, "tickets.db"))
+
+    from pc_builder_service import create_pc_builder_app
+
+    server = create_pc_builder_app(knowledge_reload_interval=0)
+    client = start_client(server)
+
+    flows = itertools.cycle(FLOWS)
+    flow_lock = threading.Lock()
+    call_ids = itertools.count()
+
+    def one_call(timings):
+        with flow_lock:
+            flow = next(flows)
+            call_id = f"bench-call-{next(call_ids):06d}"
+        try:
+            SignalWireStandIn(client, timings).run_call(call_id, flow)
+            return True
+        except FlowError as e:
+            print(f"call {call_id} failed: {e}", file=sys.stderr)
+            return False
+
+    warmup = StepTimings()
+    for _ in range(args.warmup):
+        one_call(warmup)
+
+    timings = StepTimings()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        completed = list(pool.map(lambda _: one_call(timings), range(args.calls)))
+    elapsed = time.perf_counter() - start
+    steps = timings.summary(elapsed)
+
+    if args.json:
+        print(json.dumps({"calls": args.calls, "seconds": elapsed, "steps": steps}, indent=2))
+    else:
+        print(f"{args.calls} calls ({sum(completed)} completed) in {elapsed:.2f}s, "
+              f"{args.calls / elapsed:.1f} calls/s, concurrency {args.concurrency}")
+        print(f"{'step':<44} {'count':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fail':>5}")
+        for step, row in steps.items():
+            print(f"{step:<44} {row['count']:>6} {row['req_per_s']:>8} {row['p50_ms']:>8.3f} "
+                  f"{row['p95_ms']:>8.3f} {row['p99_ms']:>8.3f} {row['failures']:>5}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(steps, f, indent=2)
+        print(f"baseline written to {args.save_baseline}")
+
+    failed = not all(completed) or any(row["failures"] for row in steps.values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(steps, json.load(f), args.tolerance, args.floor_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(regressions)
+    if failed:
+        print("FAIL")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
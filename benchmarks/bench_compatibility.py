@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Compatibility checker throughput benchmark
+
+Generates random component lists from the catalog builds, their upgrades
+and the spec tables, then reports checks per second for pre-parsed parts
+and for free text (parse + check, as the SWAIG tool does).
+
+Usage:
+    python benchmarks/bench_compatibility.py [--lists 10000] [--rounds 20] [--seed 7]
+"""
+
+import argparse
+import random
+import time
+
+from bench_utils import percentile
+
+from build_catalog import (
+    CASE_SPECS, CHIPSET_SPECS, CompatibilityChecker, get_catalog, parse_component_list
+)
+
+EXTRA_PARTS = {
+    "cpu": ["Ryzen 7 7800X3D", "Ryzen 5 7600", "Ryzen 9 9950X", "i9-14900K", "i9 14900K", "Core i7 13700K",
+            "i5-13400", "Core Ultra 9 285K"],
+    "gpu": ["RTX 4080", "RTX 5090", "RX 7900 XTX", "RX 7800 XT", "RTX 4060 Ti"],
+    "ram": ["16GB DDR4 RAM", "32GB DDR5 6000MHz", "64GB DDR5 RAM", "128GB DDR4 RAM"],
+    "psu": ["550W PSU", "650W PSU", "850W PSU", "1000W PSU", "1300W PSU"],
+    "cooling": ["NH-D15", "Hyper 212", "AK620", "100mm AIO liquid cooler", "240mm AIO", "300mm AIO",
+                "360mm AIO", "420mm AIO"],
+    "motherboard": [f"{chipset.upper()} board" for chipset in CHIPSET_SPECS],
+    "case": [name.title() for name in CASE_SPECS],
+}
+
+
+def part_pool():
+    """Component descriptions per kind, from the catalog plus EXTRA_PARTS"""
+    pool = {kind: list(names) for kind, names in EXTRA_PARTS.items()}
+    for build in get_catalog().builds:
+        for kind, component in build.components.items():
+            pool.setdefault(kind, []).append(component.name)
+        for upgrade in build.upgrades:
+            if upgrade.component is not None:
+                pool.setdefault(upgrade.kind, []).append(upgrade.component.name)
+    return pool
+
+
+def generate_lists(count: int, seed: int):
+    rng = random.Random(seed)
+    pool = part_pool()
+    kinds = sorted(pool)
+    lists = []
+    for _ in range(count):
+        chosen = rng.sample(kinds, rng.randint(2, len(kinds)))
+        lists.append(", ".join(rng.choice(pool[kind]) for kind in chosen))
+    return lists
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--lists", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    checker = CompatibilityChecker()
+    texts = generate_lists(args.lists, args.seed)
+    parsed = [parse_component_list(text)[0] for text in texts]
+    incompatible = sum(1 for parts in parsed if not checker.check(parts).compatible)
+    print(f"{args.lists} generated lists, {incompatible} incompatible")
+
+    for label, run in (
+        ("check (pre-parsed)", lambda: [checker.check(parts) for parts in parsed]),
+        ("parse + check (text)", lambda: [checker.check_text(text) for text in texts]),
+    ):
+        rates = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            run()
+            rates.append(args.lists / (time.perf_counter() - start))
+        rates.sort()
+        median = percentile(rates, 50)
+        print(f"{label:<22} {median:>12,.0f} checks/s   {1e6 / median:>7.2f} us/check")
+
+
+if __name__ == "__main__":
+    main()
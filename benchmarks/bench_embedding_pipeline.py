@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Embedding pipeline throughput benchmark
+
+Builds a synthetic knowledge base (the real sections repeated with numbered
+headings) and force-rebuilds the store with 1, 2, 4, ... workers, reporting
+chunks/sec overall and per core. Fails (exit 1) unless every worker count
+writes byte-identical embeddings.
+
+The encoder is a deterministic CPU-bound stand-in (hashed token features
+pushed through a few dense layers) so the run needs no model download; pass
+--model to time a real sentence-transformers model instead.
+
+Usage:
+    python benchmarks/bench_embedding_pipeline.py [--copies 20] [--workers 1,2,4]
+                                                  [--batch-size 64] [--model NAME]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+
+import bench_utils
+
+from knowledge_indexer import KNOWLEDGE_SOURCES, ParallelEmbedder, load_sentence_transformer, update_index
+from knowledge_store import resolve_store_dir
+
+DIMENSIONS = 384
+
+
+def synthetic_encoder(model_name: str):
+    """Encoder factory for the stand-in model (module level so workers can load it)"""
+    import numpy as np
+
+    rng = np.random.default_rng(7)
+    layers = [rng.standard_normal((DIMENSIONS, DIMENSIONS)).astype(np.float32) / 20 for _ in range(6)]
+
+    def encode(texts):
+        out = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                digest = hashlib.blake2b(token.encode(), digest_size=4).digest()
+                out[row, int.from_bytes(digest, "little") % DIMENSIONS] += 1.0
+        for layer in layers:
+            out = np.tanh(out @ layer)
+        return out
+    return encode
+
+
+def write_sources(directory: str, copies: int):
+    sources = {}
+    for partition, filename in KNOWLEDGE_SOURCES.items():
+        with open(os.path.join(bench_utils.REPO_ROOT, filename), encoding="utf-8") as f:
+            text = f.read()
+        body = []
+        for copy in range(copies):
+            body.append(text.replace("\n## ", f"\n## [{copy}] ").replace("\n### ", f"\n### [{copy}] "))
+        path = os.path.join(directory, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(body))
+        sources[partition] = path
+    return sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--copies", type=int, default=20, help="times to repeat each knowledge base")
+    parser.add_argument("--workers", default=",".join(
+        str(n) for n in (1, 2, 4, 8, 16) if n <= (os.cpu_count() or 1)))
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--model", help="real sentence-transformers model instead of the stand-in")
+    args = parser.parse_args()
+
+    factory = load_sentence_transformer if args.model else synthetic_encoder
+    model = args.model or "synthetic"
+    digests = set()
+    with tempfile.TemporaryDirectory() as directory:
+        sources = write_sources(directory, args.copies)
+        store_dir = os.path.join(directory, "store")
+        print(f"{'workers':>7} {'chunks':>7} {'seconds':>8} {'chunks/s':>9} {'per core':>9}  embeddings sha256")
+        for workers in (int(n) for n in args.workers.split(",")):
+            embedder = ParallelEmbedder(model, workers=workers, batch_size=args.batch_size,
+                                        encoder_factory=factory)
+            update = update_index(sources, store_dir, model, embedder=embedder, force=True)
+            with open(os.path.join(resolve_store_dir(store_dir), "embeddings.f32"), "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            digests.add(digest)
+            print(f"{workers:>7} {update.embedded:>7} {update.seconds:>8.2f} "
+                  f"{update.embedded / update.seconds:>9.1f} {update.chunks_per_core_second:>9.1f}  {digest[:16]}")
+
+    if len(digests) != 1:
+        print("FAIL: embeddings differ between worker counts")
+        sys.exit(1)
+    print("OK: identical embeddings for every worker count")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Outbound HTTP client benchmark against a local ticketing/inventory stub
+
+Starts a stub back end (stdlib ThreadingHTTPServer, HTTP/1.1 keep-alive)
+answering GET /prices and POST /tickets after --latency-ms, with every
+--fail-every'th request answered 503. Then:
+
+1. --lookups concurrent price lookups from async code: blocking `requests`
+   calls vs the shared AsyncHTTPClient. Reports wall time, the worst event
+   loop stall and TCP connections opened.
+2. Retries: the same lookups with the stub failing every --fail-every'th
+   request; all must succeed.
+3. Idempotent POST retries: ticket submissions under the same failures must
+   each be filed exactly once.
+4. Timeouts: a request to a stalled endpoint must fail within its timeout.
+5. The tools end to end: create_support_ticket and create_build_recommendation
+   with TICKETING_API_URL and INVENTORY_API_URL pointing at the stub. The
+   ticket must be answered without waiting on the (slowed) stub, and filed
+   with it shortly after.
+
+Exits 1 if any check fails.
+
+Usage:
+    python benchmarks/bench_http_client.py [--lookups 50] [--latency-ms 50] [--fail-every 4] [--port 3941]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bench_utils import percentile
+
+import httpx
+import requests
+
+from http_client import AsyncHTTPClient
+
+
+class StubBackend(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops concurrent connects into 1 s SYN retries
+    request_queue_size = 128
+
+    def __init__(self, port: int, latency: float):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.latency = latency
+        self.fail_every = 0
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.tickets = {}
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            return bool(self.fail_every) and self.requests % self.fail_every == 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status: int, document) -> None:
+        body = json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/stall":
+            time.sleep(2.0)
+            self.reply(200, {})
+            return
+        time.sleep(self.server.latency)
+        if self.server.should_fail():
+            self.reply(503, {"error": "busy"})
+            return
+        parts = parse_qs(url.query).get("parts", [])
+        self.reply(200, {"prices": {name: {"price": 100 + 10 * i, "in_stock": i % 3 != 2}
+                                    for i, name in enumerate(parts)}})
+
+    def do_POST(self):
+        document = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.server.latency)
+        if self.server.should_fail():
+            self.reply(503, {"error": "busy"})
+            return
+        key = self.headers.get("Idempotency-Key") or document.get("ticket_id")
+        with self.server.lock:
+            reference = self.server.tickets.setdefault(key, f"RD-{len(self.server.tickets) + 1:05d}")
+        self.reply(201, {"reference": reference})
+
+
+async def measure_lag(stop: asyncio.Event) -> float:
+    """Worst delay of a 5 ms ticker on the running loop"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        worst = max(worst, time.perf_counter() - start - 0.005)
+    return worst * 1000
+
+
+async def lookups(fetch, count: int):
+    stop = asyncio.Event()
+    lag = asyncio.ensure_future(measure_lag(stop))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(fetch(i) for i in range(count)))
+    elapsed = (time.perf_counter() - start) * 1000
+    stop.set()
+    return elapsed, sorted(latencies), await lag
+
+
+async def run_client_checks(args, base: str, stub: StubBackend, failures: list):
+    client = AsyncHTTPClient(max_per_host=10, timeout=2.0, retries=3, backoff_base=0.02)
+    await client.open()  # as the server's warm-up does
+
+    def blocking(i):
+        async def fetch(_):
+            start = time.perf_counter()
+            requests.get(f"{base}/prices", params={"parts": f"part-{i}"}).raise_for_status()
+            return (time.perf_counter() - start) * 1000
+        return fetch(i)
+
+    async def pooled(i):
+        start = time.perf_counter()
+        (await client.get(f"{base}/prices", params={"parts": f"part-{i}"})).raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    print(f"{args.lookups} concurrent price lookups, stub latency {args.latency_ms:.0f} ms")
+    print(f"{'client':<22} {'wall ms':>9} {'p50 ms':>8} {'p99 ms':>8} {'loop stall ms':>14} {'connections':>12}")
+    for name, fetch in (("requests (blocking)", blocking), ("AsyncHTTPClient", pooled)):
+        opened = stub.connections
+        elapsed, latencies, lag = await lookups(fetch, args.lookups)
+        opened = stub.connections - opened
+        print(f"{name:<22} {elapsed:>9.1f} {percentile(latencies, 50):>8.1f} {percentile(latencies, 99):>8.1f} "
+              f"{lag:>14.1f} {opened:>12}")
+    if opened > client.max_per_host:
+        failures.append(f"opened {opened} connections, limit {client.max_per_host} per host")
+
+    stub.fail_every = args.fail_every
+    retried = client.retried
+    elapsed, latencies, _ = await lookups(pooled, args.lookups)
+    print(f"\nWith every {args.fail_every}th request failing (503): {args.lookups} lookups in {elapsed:.1f} ms, "
+          f"p99 {percentile(latencies, 99):.1f} ms, {client.retried - retried} retries")
+
+    class Ticket:
+        def __init__(self, i):
+            self.ticket_id = f"SUP-bench-{i}"
+
+        def to_dict(self):
+            return {"ticket_id": self.ticket_id}
+
+    from integrations import TicketingBackend
+    ticketing = TicketingBackend(base, client=client)
+    references = await asyncio.gather(*(ticketing.submit(Ticket(i)) for i in range(args.lookups)))
+    filed = len(stub.tickets)
+    print(f"Ticket POSTs under failures: {sum(r is not None for r in references)}/{args.lookups} filed, "
+          f"{filed} tickets at the back end")
+    if None in references or filed != args.lookups:
+        failures.append(f"ticket submissions: {references.count(None)} failed, {filed} filed for {args.lookups}")
+    stub.fail_every = 0
+
+    start = time.perf_counter()
+    try:
+        await client.get(f"{base}/stall", timeout=0.2, retries=0)
+        failures.append("stalled request did not time out")
+    except httpx.TimeoutException:
+        print(f"Stalled endpoint: timed out after {(time.perf_counter() - start) * 1000:.0f} ms (timeout 200 ms)")
+    print(f"client: {client.stats()}")
+    await client.aclose()
+
+
+def run_tool_checks(base: str, stub: StubBackend, failures: list):
+    os.environ["TICKETING_API_URL"] = base
+    os.environ["INVENTORY_API_URL"] = base
+    from pc_builder_service import create_pc_builder_app
+    from tool_streams import CONTINUATION_TOOL
+
+    latency = stub.latency
+
+    server = create_pc_builder_app(render_cache=False, knowledge_reload_interval=0)
+    support, sales = server.agents["/support"], server.agents["/sales"]
+    raw_data = {"call_id": "bench-http-tools"}
+    filed = len(stub.tickets)
+    stub.latency = 0.5
+    start = time.perf_counter()
+    ticket = support.on_function_call("create_support_ticket", {
+        "issue_description": "PC won't power on", "customer_info": "Ana", "priority": "high"}, raw_data)
+    answered = (time.perf_counter() - start) * 1000
+    while len(stub.tickets) == filed and time.perf_counter() - start < 5:
+        time.sleep(0.01)
+    print(f"\ncreate_support_ticket: answered in {answered:.0f} ms with the back end taking 500 ms, "
+          f"filed after {(time.perf_counter() - start) * 1000:.0f} ms")
+    stub.latency = latency
+    if "SUP-" not in ticket.response:
+        failures.append("create_support_ticket did not give the local ticket ID")
+    if answered > 250:
+        failures.append(f"create_support_ticket took {answered:.0f} ms; it waited on the ticketing back end")
+    if len(stub.tickets) == filed:
+        failures.append("create_support_ticket did not file the ticket with the back end")
+
+    args = {"budget": "$1800", "use_case": "gaming", "preferences": "1440p, quiet"}
+    result = sales.on_function_call("create_build_recommendation", args, raw_data)
+    text = result.response
+    if CONTINUATION_TOOL in text:
+        text += "\n" + sales.on_function_call(CONTINUATION_TOOL, {}, raw_data).response
+    live = [line for line in text.splitlines() if line.startswith("- ") and "stock" in line]
+    print(f"create_build_recommendation: {len(live)} parts with live prices, e.g. {live[0] if live else None}")
+    if not live:
+        failures.append("create_build_recommendation did not add live prices")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lookups", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--fail-every", type=int, default=4)
+    parser.add_argument("--port", type=int, default=3941)
+    args = parser.parse_args()
+
+    stub = StubBackend(args.port, args.latency_ms / 1000)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{args.port}"
+
+    failures = []
+    asyncio.run(run_client_checks(args, base, stub, failures))
+    run_tool_checks(base, stub, failures)
+    stub.shutdown()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
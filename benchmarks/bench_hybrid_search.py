@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Hybrid retrieval benchmark: hit rate and latency on support knowledge base queries
+
+Indexes the real knowledge bases into a scratch store (with its BM25
+index) and runs a labelled set of support queries - BSOD stop codes, part
+numbers and error strings as well as plain-language problems - through
+three retrieval modes:
+
+- vector: embed the query, cosine search
+- hybrid: embed the query, cosine fused with BM25
+- hybrid+exact: the exact-match fast path first, hybrid when it declines
+
+For each mode it reports hit@1 and hit@3 (the labelled section among the
+top results), per-query latency including embedding, and how many queries
+were embedded at all. The default encoder is the deterministic stand-in
+from bench_embedding_pipeline.py; pass --model to use a real
+sentence-transformers model, whose per-query cost the fast path saves.
+
+Usage:
+    python benchmarks/bench_hybrid_search.py [--repeat 50] [--model NAME]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from bench_utils import percentile
+from bench_embedding_pipeline import synthetic_encoder
+
+from knowledge_indexer import load_sentence_transformer, update_index
+from knowledge_store import KnowledgeStore
+from lexical_index import keyword_weight_for
+
+# (partition, query, a substring of the section that answers it)
+QUERIES = [
+    ("support", "DRIVER_IRQL_NOT_LESS_OR_EQUAL", "Common BSOD Codes"),
+    ("support", "MEMORY_MANAGEMENT blue screen", "Common BSOD Codes"),
+    ("support", "WHEA_UNCORRECTABLE_ERROR", "Common BSOD Codes"),
+    ("support", "SYSTEM_SERVICE_EXCEPTION after update", "Common BSOD Codes"),
+    ("support", "RAM running at 2133MHz", "Low FPS in Games"),
+    ("support", "OCCT AIDA64 stress test", "Stress Testing Tools"),
+    ("support", "Gen4 NVMe 5000 MB/s", "Slow SSD Performance"),
+    ("support", "computer won't power on at all", "Won't Power On"),
+    ("support", "fans spin but no display", "No Display"),
+    ("support", "PC randomly shuts off while gaming", "Randomly Shuts Off"),
+    ("support", "low fps in games", "Low FPS"),
+    ("support", "RGB lights not working", "RGB Lighting"),
+    ("support", "usb devices keep disconnecting", "USB Devices"),
+    ("support", "no sound from speakers", "No Sound"),
+    ("support", "windows activation problem", "Windows Activation"),
+    ("support", "SSD not detected", "SSD Not Detected"),
+    ("support", "ethernet not working", "Ethernet"),
+    ("support", "when should a component be sent for RMA", "RMA"),
+    ("sales", "RTX 4070", "RTX 4070"),
+    ("sales", "i5-14600K", "i5-14600K"),
+]
+
+MODES = ("vector", "hybrid", "hybrid+exact")
+
+
+def run_mode(store: KnowledgeStore, encode, mode: str, repeat: int):
+    hits1 = hits3 = embedded = 0
+    latencies = []
+    for _ in range(repeat):
+        for partition, query, expected in QUERIES:
+            start = time.perf_counter()
+            results = store.exact_match(partition, query, 3) if mode == "hybrid+exact" else None
+            if results is None:
+                embedded += 1
+                vector = encode([query])[0]
+                weight = keyword_weight_for(query) if mode != "vector" else 0.0
+                results = store.search(partition, vector, 3, query_text=query, keyword_weight=weight)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found = [expected in r["metadata"]["section"] or expected in r["content"] for r in results]
+            hits1 += bool(found[:1] and found[0])
+            hits3 += any(found)
+    latencies.sort()
+    total = repeat * len(QUERIES)
+    return {
+        "mode": mode,
+        "hit@1": hits1 / total,
+        "hit@3": hits3 / total,
+        "mean_ms": sum(latencies) / len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "embedded": embedded // repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=50, help="passes over the query set")
+    parser.add_argument("--model", help="real sentence-transformers model instead of the stand-in")
+    args = parser.parse_args()
+
+    encode = load_sentence_transformer(args.model) if args.model else synthetic_encoder("synthetic")
+    with tempfile.TemporaryDirectory() as tmp:
+        store_dir = os.path.join(tmp, "store")
+        update_index(store_dir=store_dir, model=args.model or "synthetic", embedder=encode, force=True)
+        store = KnowledgeStore.open(store_dir)
+        encode(["warm-up"])
+        rows = [run_mode(store, encode, mode, args.repeat) for mode in MODES]
+        store.close()
+
+    print(f"{len(QUERIES)} labelled queries x {args.repeat}, encoder: {args.model or 'synthetic stand-in'}")
+    print(f"{'mode':<13} {'hit@1':>6} {'hit@3':>6} {'mean ms':>8} {'p50 ms':>7} {'p99 ms':>7} {'embedded':>9}")
+    for row in rows:
+        print(f"{row['mode']:<13} {row['hit@1']:>6.2f} {row['hit@3']:>6.2f} {row['mean_ms']:>8.3f} "
+              f"{row['p50_ms']:>7.3f} {row['p99_ms']:>7.3f} {row['embedded']:>5}/{len(QUERIES)}")
+
+    vector, _, fast = rows
+    if fast["hit@3"] < vector["hit@3"]:
+        print("FAIL: hybrid retrieval found fewer answers than vector search")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
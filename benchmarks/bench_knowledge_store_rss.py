@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Knowledge store memory benchmark
+
+Builds a synthetic knowledge store, forks N worker processes that each open
+it and touch every page (as a search over the whole corpus would), then
+reports per-worker RSS and PSS. With the store memory-mapped, RSS counts the
+shared pages in every worker while PSS divides them between the workers, so
+total PSS stays roughly flat as the worker count grows.
+
+For comparison, --copy loads the embeddings into each worker's heap, which
+is what a per-process SQLite-backed engine does.
+
+Usage:
+    python benchmarks/bench_knowledge_store_rss.py [--chunks 50000] [--dims 768] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from bench_utils import rss_kb
+
+import numpy as np
+
+from knowledge_store import KnowledgeStore, write_knowledge_store
+
+
+def pss_kb() -> int:
+    """Proportional set size of this process in KiB (Linux only; 0 elsewhere)"""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def synthetic_chunks(count: int, dims: int, seed: int):
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        yield {
+            "content": f"Synthetic chunk {i} " + "lorem ipsum " * 40,
+            "embedding": rng.standard_normal(dims, dtype=np.float32).tobytes(),
+            "filename": "synthetic.md",
+            "section": f"Section {i // 50}",
+        }
+
+
+def run_worker(store_dir: str, copy: bool, ready_w: int, go_r: int, report_w: int) -> None:
+    store = KnowledgeStore.open(store_dir)
+    embeddings = np.array(store.embeddings) if copy else store.embeddings
+    # Touch everything a full scan would: every embedding row and every chunk text
+    query = np.ones(store.dimensions, dtype=np.float32)
+    float(embeddings @ query @ np.ones(store.count, dtype=np.float32))
+    sum(len(store.texts[i]) for i in range(store.count))
+    os.write(ready_w, b"r")
+    # Measure only once every worker has touched the store, so PSS is settled
+    os.read(go_r, 1)
+    os.write(report_w, f"{rss_kb()} {pss_kb()}\n".encode())
+    os._exit(0)
+
+
+def measure(store_dir: str, workers: int, copy: bool):
+    ready_r, ready_w = os.pipe()
+    go_r, go_w = os.pipe()
+    report_r, report_w = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(store_dir, copy, ready_w, go_r, report_w)
+        pids.append(pid)
+    for _ in range(workers):
+        os.read(ready_r, 1)
+    os.write(go_w, b"g" * workers)
+    reports = b""
+    while reports.count(b"\n") < workers:
+        reports += os.read(report_r, 4096)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    for fd in (ready_r, ready_w, go_r, go_w, report_r, report_w):
+        os.close(fd)
+    samples = [tuple(int(v) for v in line.split()) for line in reports.decode().splitlines()]
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--copy", action="store_true", help="load embeddings into each worker's heap")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_dir = os.path.join(tmp, "store")
+        half = args.chunks // 2
+        start = time.perf_counter()
+        write_knowledge_store(store_dir, {
+            "sales": synthetic_chunks(half, args.dims, 1),
+            "support": synthetic_chunks(args.chunks - half, args.dims, 2),
+        }, args.dims)
+        store_mb = sum(os.path.getsize(os.path.join(store_dir, f)) for f in os.listdir(store_dir)) / 1e6
+        print(f"store: {args.chunks} chunks x {args.dims} dims, {store_mb:.0f} MB, "
+              f"built in {time.perf_counter() - start:.1f}s ({'heap copy' if args.copy else 'mmap'})")
+        print(f"{'workers':>7} {'RSS/worker MB':>14} {'PSS/worker MB':>14} {'total PSS MB':>13}")
+        for workers in args.workers:
+            samples = measure(store_dir, workers, args.copy)
+            rss = sum(s[0] for s in samples) / len(samples) / 1024
+            pss = [s[1] / 1024 for s in samples]
+            print(f"{workers:>7} {rss:>14.0f} {sum(pss) / len(pss):>14.0f} {sum(pss):>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
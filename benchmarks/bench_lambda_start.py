@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Lambda cold-start vs warm-start timing harness
+
+Invokes pc_builder_service.lambda_handler locally with synthetic API Gateway
+style events. Each cold sample runs in a fresh interpreter (module import +
+first invocation, optionally with eager init as under provisioned
+concurrency); warm samples reuse one interpreter.
+
+Usage:
+    python benchmarks/bench_lambda_start.py [--cold-runs 3] [--warm-runs 200] [--eager]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from bench_utils import REPO_ROOT, percentile
+
+LAMBDA_ENV = {
+    "AWS_LAMBDA_FUNCTION_NAME": "pc-builder-bench",
+    "AWS_REGION": "us-east-1",
+    "SIGNALWIRE_LOG_MODE": "off",
+}
+
+EVENTS = [
+    {"path": "/sales", "httpMethod": "GET"},
+    {"path": "/support", "httpMethod": "GET"},
+    {
+        "path": "/support/swaig/create_support_ticket",
+        "httpMethod": "POST",
+        "body": json.dumps({"issue_description": "PC won't boot", "customer_info": "Bench", "priority": "high"}),
+    },
+]
+
+# Runs inside the fresh interpreter for each cold sample
+COLD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import pc_builder_service
+imported = time.perf_counter()
+event = json.loads(sys.argv[1])
+pc_builder_service.lambda_handler(event, None)
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1e3, "first_invoke_ms": (done - imported) * 1e3}))
+"""
+
+
+def cold_sample(event, eager: bool):
+    env = dict(os.environ, **LAMBDA_ENV)
+    if eager:
+        env["PC_BUILDER_EAGER_INIT"] = "true"
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_SCRIPT, json.dumps(event)],
+        cwd=REPO_ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--warm-runs", type=int, default=200)
+    parser.add_argument("--eager", action="store_true", help="Eager-init at import (provisioned concurrency)")
+    args = parser.parse_args()
+
+    print(f"cold starts ({'eager' if args.eager else 'lazy'} init):")
+    for i in range(args.cold_runs):
+        sample = cold_sample(EVENTS[i % len(EVENTS)], args.eager)
+        print(f"  import {sample['import_ms']:8.1f} ms   first invoke {sample['first_invoke_ms']:8.1f} ms")
+
+    os.environ.update(LAMBDA_ENV)
+    import pc_builder_service
+
+    pc_builder_service.lambda_handler(EVENTS[0], None)
+    print("warm invocations:")
+    for event in EVENTS:
+        samples = []
+        for _ in range(args.warm_runs):
+            start = time.perf_counter()
+            response = pc_builder_service.lambda_handler(event, None)
+            samples.append((time.perf_counter() - start) * 1e3)
+        samples.sort()
+        print(f"  {event['path']:<40} status {response['statusCode']}  "
+              f"p50 {percentile(samples, 50):7.2f} ms  p99 {percentile(samples, 99):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Latency instrumentation overhead benchmark
+
+Times the cheapest instrumented hot path - a cached SWML render - with the
+metrics sample rate at 0, the default and 1.0, interleaving the runs to
+cancel drift. Also reports the raw cost of a sampled and an unsampled timer.
+Fails (exit 1) if the default rate costs more than --limit percent.
+
+Usage:
+    python benchmarks/bench_metrics_overhead.py [--iterations 3000] [--rounds 5] [--limit 1.0]
+"""
+
+import argparse
+import sys
+import time
+
+from bench_utils import percentile
+
+from bench_swml_render import make_request
+
+from metrics import LatencyMetrics, metrics
+from pc_builder_service import create_pc_builder_app
+
+
+def timer_cost_ns(rate: float, iterations: int = 200000) -> float:
+    registry = LatencyMetrics(sample_rate=rate)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with registry.timer("bench", "label"):
+            pass
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def render_loop(agent, request, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        agent._render_swml(None, agent.on_swml_request(None, None, request))
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=float, default=1.0, help="max overhead %% at the default rate")
+    args = parser.parse_args()
+
+    default_rate = metrics.sample_rate
+    print(f"timer cost: unsampled {timer_cost_ns(0.0):.0f} ns, sampled {timer_cost_ns(1.0):.0f} ns")
+
+    server = create_pc_builder_app(knowledge_reload_interval=0)
+    agent = server.agents["/sales"]
+    request = make_request("/sales", "transfer=true")
+    rates = (0.0, default_rate, 1.0)
+    samples = {rate: [] for rate in rates}
+    for rate in rates:
+        metrics.sample_rate = rate
+        render_loop(agent, request, args.iterations // 10)  # warm
+    for _ in range(args.rounds):
+        for rate in rates:
+            metrics.sample_rate = rate
+            samples[rate].append(render_loop(agent, request, args.iterations))
+    metrics.sample_rate = default_rate
+
+    baseline = percentile(sorted(samples[0.0]), 50)
+    print(f"{'sample rate':>11} {'us/render':>10} {'overhead':>9}")
+    overhead = {}
+    for rate in rates:
+        value = percentile(sorted(samples[rate]), 50)
+        overhead[rate] = (value - baseline) / baseline * 100
+        print(f"{rate:>11g} {value:>10.2f} {overhead[rate]:>8.2f}%")
+
+    if overhead[default_rate] > args.limit:
+        print(f"FAIL: default sample rate costs more than {args.limit}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
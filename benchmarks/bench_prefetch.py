@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Speculative prefetch benchmark: the specialist's transferred SWML fetch
+
+For each simulated call, triage reports the destination early
+(prepare_specialist), the transfer context is saved, and the support
+agent's /support?transfer=true SWML is then fetched. The fetch latency is
+measured with and without the prefetch, against a cold render path
+(--no-render-cache) or the shared render cache. The benchmark also counts
+how many documents carry ${call_data.knowledge} from the prefetched search.
+The knowledge search is a stand-in taking --search-ms.
+
+Usage:
+    python benchmarks/bench_prefetch.py [--calls 200] [--search-ms 20] [--gap-ms 50] [--no-render-cache]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from bench_utils import percentile
+
+from call_context import get_context_store
+from pc_builder_service import create_pc_builder_app
+from prefetch import get_prefetcher
+from prefork import swml_request
+
+
+class SleepySearch:
+    """Knowledge stand-in: one canned result after a fixed delay"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def search(self, query: str, count=None):
+        time.sleep(self.delay)
+        return [{"content": "1. **Check Power Cable**: Ensure firmly connected at both ends",
+                 "metadata": {"section": "Won't Power On"}}]
+
+
+def run(triage, support, calls: int, prefetch: bool, gap: float):
+    latencies, grounded = [], 0
+    for i in range(calls):
+        call_id = f"bench-{prefetch}-{i}"
+        raw_data = {"call_id": call_id}
+        if prefetch:
+            triage.on_function_call("prepare_specialist",
+                                    {"specialist_type": "support", "draft_summary": "PC won't power on"}, raw_data)
+        get_context_store().put(call_id, {"user_name": "Ana", "summary": "Ana's PC won't power on"})
+        # Triage keeps talking (name, summary) before the transfer lands
+        time.sleep(gap)
+        start = time.perf_counter()
+        document = support._render_swml(
+            call_id, support.on_swml_request(raw_data, None, swml_request("/support", "transfer=true"))
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        ai = next(verb["ai"] for verb in json.loads(document)["sections"]["main"] if "ai" in verb)
+        grounded += "Check Power Cable" in ai.get("global_data", {}).get("call_data", {}).get("knowledge", "")
+    latencies.sort()
+    return latencies, grounded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--search-ms", type=float, default=20.0, help="latency of the knowledge search stand-in")
+    parser.add_argument("--gap-ms", type=float, default=50.0,
+                        help="time between prepare_specialist and the specialist's fetch")
+    parser.add_argument("--no-render-cache", action="store_true", help="render every document from scratch")
+    args = parser.parse_args()
+
+    server = create_pc_builder_app(render_cache=not args.no_render_cache, knowledge_reload_interval=0)
+    triage, support = server.agents[""], server.agents["/support"]
+    support.knowledge = SleepySearch(args.search_ms / 1000)
+    run(triage, support, 3, True, args.gap_ms / 1000)
+
+    print(f"/support?transfer=true x {args.calls}, render cache {'off' if args.no_render_cache else 'on'}, "
+          f"search {args.search_ms:.0f} ms, {args.gap_ms:.0f} ms before the fetch")
+    print(f"{'mode':<12} {'p50 ms':>8} {'p99 ms':>8} {'grounded':>9}")
+    rows = {}
+    for prefetch in (False, True):
+        latencies, grounded = run(triage, support, args.calls, prefetch, args.gap_ms / 1000)
+        rows[prefetch] = latencies
+        print(f"{'prefetched' if prefetch else 'cold':<12} {percentile(latencies, 50):>8.3f} "
+              f"{percentile(latencies, 99):>8.3f} {grounded:>5}/{args.calls}")
+    print(f"prefetcher: {get_prefetcher().stats()}")
+
+    if percentile(rows[True], 50) > percentile(rows[False], 50):
+        print("FAIL: prefetched fetches were slower")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
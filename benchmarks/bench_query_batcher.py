@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Query micro-batching benchmark: throughput vs added latency per window
+
+Runs --clients closed-loop client threads, each searching a synthetic
+knowledge store as fast as it gets answers, through a QueryBatcher for each
+window in --windows. The encoder stand-in has a fixed per-call cost plus a
+per-query cost (a transformer pays most of its price per forward pass, not
+per row), and each batch is searched with one KnowledgeStore.search_batch
+matrix multiply. Window 0 is the unbatched baseline: every query is encoded
+and searched on its own, with the clients' searches sharing the CPUs.
+Reports throughput, latency and its change against the baseline, and the
+mean batch size for each client count - the curve to tune
+QUERY_BATCH_WINDOW_MS against. A single client shows the window's pure cost
+(nothing to batch with); many clients show what batching buys under load.
+
+Usage:
+    python benchmarks/bench_query_batcher.py [--chunks 40000] [--dims 384] [--clients 1 16] [--seconds 3]
+        [--windows 0 0.5 1 2 5 10]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from bench_utils import percentile
+
+import numpy as np
+
+from knowledge_store import KnowledgeStore, write_knowledge_store
+from query_batcher import QueryBatcher
+
+
+def synthetic_chunks(count: int, dims: int, seed: int):
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        yield {"content": f"Support article {i}", "embedding": rng.standard_normal(dims, dtype=np.float32).tobytes(),
+               "filename": "synthetic.md", "section": f"Section {i // 50}"}
+
+
+class SyntheticEncoder:
+    """Embedding stand-in: a per-call pass over fixed weights plus a small per-query cost"""
+
+    def __init__(self, dims: int, layers: int = 6):
+        rng = np.random.default_rng(7)
+        self.weights = [rng.standard_normal((dims, dims), dtype=np.float32) / 20 for _ in range(layers)]
+        self.dims = dims
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def __call__(self, texts):
+        with self.lock:
+            self.calls += 1
+        seeds = [int.from_bytes(hashlib.sha256(t.encode()).digest()[:8], "little") for t in texts]
+        # 48 "token" rows per call cover the fixed cost, 16 more per query the marginal one
+        vectors = np.concatenate([
+            np.random.default_rng(seeds[0]).standard_normal((48, self.dims), dtype=np.float32),
+            *(np.random.default_rng(seed).standard_normal((16, self.dims), dtype=np.float32) for seed in seeds),
+        ])
+        for weights in self.weights:
+            vectors = np.tanh(vectors @ weights)
+        return np.stack([vectors[48 + 16 * i:64 + 16 * i].mean(axis=0) for i in range(len(texts))])
+
+
+def run_level(store: KnowledgeStore, window_ms: float, clients: int, seconds: float, count: int) -> dict:
+    encoder = SyntheticEncoder(store.dimensions)
+    batcher = QueryBatcher(encoder, window=window_ms / 1000) if window_ms > 0 else None
+    deadline = time.monotonic() + seconds
+    latencies = []
+    lock = threading.Lock()
+
+    def client(client_id: int):
+        local, i = [], 0
+        while time.monotonic() < deadline:
+            query = f"client {client_id} query {i}"
+            i += 1
+            start = time.perf_counter()
+            if batcher is None:
+                store.search("support", encoder([query])[0], count)
+            else:
+                batcher.submit(store, "support", query, count).result()
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stats = batcher.stats() if batcher else {"mean_batch": 1.0}
+    if batcher:
+        batcher.close()
+    latencies.sort()
+    return {
+        "window_ms": window_ms,
+        "queries": len(latencies),
+        "qps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_batch": stats["mean_batch"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=40000)
+    parser.add_argument("--dims", type=int, default=384)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 16], help="concurrent closed-loop clients")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration per window")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 0.5, 1, 2, 5, 10],
+                        help="batch windows in ms; 0 is the unbatched baseline")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "store")
+        write_knowledge_store(path, {"support": synthetic_chunks(args.chunks, args.dims, 1)}, args.dims)
+        store = KnowledgeStore.open(path)
+
+        # Batched results must match searching each query alone
+        encoder = SyntheticEncoder(args.dims)
+        queries = [f"check {i}" for i in range(8)]
+        batched = store.search_batch("support", encoder(queries), 5)
+        for query, results in zip(queries, batched):
+            single = store.search("support", encoder([query])[0], 5)
+            if [r["content"] for r in results] != [r["content"] for r in single]:
+                print(f"FAIL: batched results differ for '{query}'")
+                sys.exit(1)
+
+        rows = [dict(run_level(store, window, clients, args.seconds, 3), clients=clients)
+                for clients in args.clients for window in args.windows]
+        store.close()
+
+    if args.json:
+        print(json.dumps({"cpus": os.cpu_count(), "results": rows}, indent=2))
+        return
+    print(f"{args.chunks} x {args.dims}, {os.cpu_count()} CPUs, {args.seconds:g}s per window")
+    print(f"{'clients':>7} {'window ms':>9} {'queries/s':>10} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'added p50':>10} {'mean batch':>11}")
+    for clients in args.clients:
+        level = [row for row in rows if row["clients"] == clients]
+        base = next((row for row in level if row["window_ms"] == 0), level[0])
+        for row in level:
+            print(f"{clients:>7} {row['window_ms']:>9g} {row['qps']:>10} {row['qps'] / (base['qps'] or 1):>7.2f}x "
+                  f"{row['p50_ms']:>8} {row['p99_ms']:>8} {row['p50_ms'] - base['p50_ms']:>+10.2f} "
+                  f"{row['mean_batch']:>11}")
+
+
+if __name__ == "__main__":
+    main()
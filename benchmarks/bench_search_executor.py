@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Search executor benchmark: event loop lag, single-flight and backpressure
+
+Fires a burst of concurrent searches at an asyncio loop over a synthetic
+knowledge store (a hashed "embedding" step plus an exact search), with most
+of the burst repeating a handful of popular queries - the "PC won't turn on"
+pattern. Compares searching inline in the request coroutine (the loop is
+blocked for the whole search) with awaiting the shared SearchExecutor, while
+a ticker task measures how late the loop wakes it up. Reports request
+latency, loop lag and how many searches actually ran, then shows a burst
+against a small max_pending being shed with SearchBusy.
+
+Usage:
+    python benchmarks/bench_search_executor.py [--chunks 40000] [--dims 384] [--burst 200] [--distinct 8]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+from bench_utils import percentile
+
+import numpy as np
+
+from knowledge_store import KnowledgeStore, write_knowledge_store
+from search_executor import SearchBusy, SearchExecutor
+
+QUERIES = [
+    "PC won't turn on", "blue screen after XMP", "GPU fans spin but no display", "random shutdowns gaming",
+    "coil whine from graphics card", "DDR5 not detected", "CPU temps over 95C", "no POST after BIOS update",
+]
+
+
+def synthetic_chunks(count: int, dims: int, seed: int):
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        yield {"content": f"Support article {i}", "embedding": rng.standard_normal(dims, dtype=np.float32).tobytes(),
+               "filename": "synthetic.md", "section": f"Section {i // 50}"}
+
+
+class SyntheticSearch:
+    """Embedding stand-in (a few dense layers over a hashed seed) plus the store's exact search"""
+
+    def __init__(self, store: KnowledgeStore, layers: int = 6):
+        self.store = store
+        rng = np.random.default_rng(7)
+        self.weights = [rng.standard_normal((store.dimensions, store.dimensions), dtype=np.float32) / 20
+                        for _ in range(layers)]
+        self.computed = 0
+
+    def __call__(self, query: str):
+        self.computed += 1
+        seed = int.from_bytes(hashlib.sha256(query.encode()).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal((64, self.store.dimensions), dtype=np.float32)
+        for weights in self.weights:
+            vector = np.tanh(vector @ weights)
+        return self.store.search("support", vector.mean(axis=0), count=3)
+
+
+async def ticker(lags, stop: asyncio.Event, interval: float = 0.001):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append((loop.time() - expected) * 1000)
+
+
+async def burst(search, queries, executor=None):
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, stop))
+    await asyncio.sleep(0.01)
+
+    async def one(query):
+        if executor is None:
+            search(query)
+        else:
+            await executor.run_async(("bench", query), lambda: search(query), timeout=30.0)
+        # From the start of the burst, so time spent waiting for the loop counts
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(query) for query in queries))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return elapsed, sorted(latencies), sorted(lags)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chunks", type=int, default=40000)
+    parser.add_argument("--dims", type=int, default=384)
+    parser.add_argument("--burst", type=int, default=200, help="concurrent searches per burst")
+    parser.add_argument("--distinct", type=int, default=8, help="distinct queries in the burst")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "store")
+        write_knowledge_store(path, {"support": synthetic_chunks(args.chunks, args.dims, 1)}, args.dims)
+        store = KnowledgeStore.open(path)
+        popular = [QUERIES[i % len(QUERIES)] for i in range(args.distinct)]
+        # 3 in 4 requests repeat a popular query, 1 in 4 is unique
+        queries = [popular[i % len(popular)] if i % 4 else f"{popular[0]} variant {i}" for i in range(args.burst)]
+
+        print(f"{args.burst} concurrent searches ({len(set(queries))} distinct) over {args.chunks} x {args.dims}, "
+              f"{args.workers} search threads")
+        print(f"{'mode':<10} {'searches run':>12} {'total ms':>9} {'req p50':>8} {'req p99':>8} "
+              f"{'lag p99':>8} {'lag max':>8}")
+        rows = {}
+        for mode in ("inline", "executor"):
+            search = SyntheticSearch(store)
+            search("warm-up")
+            search.computed = 0
+            executor = SearchExecutor(workers=args.workers, max_pending=args.burst) if mode == "executor" else None
+            elapsed, latencies, lags = asyncio.run(burst(search, queries, executor))
+            rows[mode] = search.computed
+            print(f"{mode:<10} {search.computed:>12} {elapsed * 1000:>9.1f} {percentile(latencies, 50):>8.1f} "
+                  f"{percentile(latencies, 99):>8.1f} {percentile(lags, 99):>8.1f} {(lags or [0])[-1]:>8.1f}")
+            if executor is not None:
+                executor.shutdown()
+
+        # Backpressure: a burst of distinct queries against a small pending bound
+        search = SyntheticSearch(store)
+        executor = SearchExecutor(workers=args.workers, max_pending=16)
+        accepted, shed = [], 0
+        for i in range(args.burst):
+            try:
+                accepted.append(executor.submit(("shed", i), lambda i=i: search(f"distinct query {i}")))
+            except SearchBusy:
+                shed += 1
+        for future in accepted:
+            future.result()
+        executor.shutdown()
+        print(f"backpressure: max_pending 16, {args.burst} distinct searches -> {len(accepted)} run, {shed} shed")
+        store.close()
+
+    if rows["executor"] >= rows["inline"] or shed == 0:
+        print("FAIL")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
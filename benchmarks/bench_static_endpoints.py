@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Static endpoint benchmark: pre-serialized /info, /health, /ready and conditional SWML GETs
+
+Serves the app from uvicorn in this process and fetches each endpoint over
+one keep-alive connection, first plainly and then with If-None-Match set
+to the ETag from the first response. Reports p50/p99 latency and bytes per
+response for both. Also times building the /info response itself: encoding and
+serializing the dict per hit, as before, vs the pre-serialized bytes.
+
+Usage:
+    python benchmarks/bench_static_endpoints.py [--requests 500] [--port 3931]
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from bench_utils import percentile
+
+import requests
+import uvicorn
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from http_cache import INFO_CACHE_CONTROL, PreserializedJSON
+from pc_builder_service import create_pc_builder_app
+from prefork import swml_request
+
+ENDPOINTS = ["/info", "/health", "/ready", "/sales", "/support?transfer=true"]
+
+
+def timed_gets(session: requests.Session, url: str, count: int, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    latencies, size, statuses = [], 0, set()
+    for _ in range(count):
+        start = time.perf_counter()
+        response = session.get(url, headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        size = len(response.content)
+        statuses.add(response.status_code)
+    latencies.sort()
+    return latencies, size, statuses
+
+
+def handler_cost(payload, count: int):
+    """Microseconds per /info response: encoding the dict per hit (as FastAPI does) vs pre-serialized bytes"""
+    request = swml_request("/info", "")
+    start = time.perf_counter()
+    for _ in range(count):
+        JSONResponse(jsonable_encoder(payload))
+    rebuilt = (time.perf_counter() - start) / count * 1e6
+    document = PreserializedJSON(payload, cache_control=INFO_CACHE_CONTROL)
+    start = time.perf_counter()
+    for _ in range(count):
+        document.response(request)
+    preserialized = (time.perf_counter() - start) / count * 1e6
+    return rebuilt, preserialized
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--port", type=int, default=3931)
+    args = parser.parse_args()
+
+    server = create_pc_builder_app(port=args.port, knowledge_reload_interval=0)
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=args.port, log_level="error"))
+    threading.Thread(target=uvicorn_server.run, daemon=True).start()
+    base = f"http://127.0.0.1:{args.port}"
+    session = requests.Session()
+    session.auth = server.agents[""].get_basic_auth_credentials()
+    deadline = time.monotonic() + 30
+    while not uvicorn_server.started and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    print(f"{args.requests} GETs per endpoint over one keep-alive connection")
+    print(f"{'endpoint':<24} {'plain p50':>10} {'p99':>7} {'bytes':>6}   {'304 p50':>8} {'p99':>7} {'bytes':>6}")
+    failures = []
+    for path in ENDPOINTS:
+        etag = session.get(base + path).headers.get("ETag")
+        plain, plain_size, _ = timed_gets(session, base + path, args.requests)
+        conditional, conditional_size, statuses = timed_gets(session, base + path, args.requests, etag)
+        if statuses != {304}:
+            failures.append(f"{path}: conditional GET answered {sorted(statuses)}")
+        print(f"{path:<24} {percentile(plain, 50):>10.3f} {percentile(plain, 99):>7.3f} {plain_size:>6}   "
+              f"{percentile(conditional, 50):>8.3f} {percentile(conditional, 99):>7.3f} {conditional_size:>6}")
+
+    rebuilt, preserialized = handler_cost(session.get(base + "/info").json(), args.requests * 10)
+    print(f"\n/info handler: {rebuilt:.1f} us rebuilding and serializing, {preserialized:.1f} us pre-serialized")
+
+    uvicorn_server.should_exit = True
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
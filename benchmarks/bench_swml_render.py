@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+SWML render latency benchmark
+
+Compares p50/p99 SWML render time per route with and without the shared
+render cache, calling each agent's render path the same way the HTTP
+handler does.
+
+Usage:
+    python benchmarks/bench_swml_render.py [--iterations 500]
+"""
+
+import argparse
+import time
+
+from bench_utils import percentile
+
+from starlette.requests import Request
+
+from pc_builder_service import create_pc_builder_app
+
+ROUTES = [("/", ""), ("/sales", ""), ("/sales", "transfer=true"), ("/support", ""), ("/support", "transfer=true")]
+
+
+def make_request(path: str, query: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [],
+    })
+
+
+def measure(server, iterations: int):
+    results = {}
+    for path, query in ROUTES:
+        agent = server.agents[path.rstrip("/")]
+        request = make_request(path, query)
+        agent._render_swml(None, agent.on_swml_request(None, None, request))  # warm
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            agent._render_swml(None, agent.on_swml_request(None, None, request))
+            samples.append((time.perf_counter() - start) * 1e6)
+        samples.sort()
+        results[f"{path}?{query}" if query else path] = samples
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    uncached = measure(create_pc_builder_app(render_cache=False), args.iterations)
+    cached = measure(create_pc_builder_app(render_cache=True), args.iterations)
+
+    print(f"{'route':<24} {'uncached p50':>13} {'p99':>10} {'cached p50':>12} {'p99':>8}   (us)")
+    for route in uncached:
+        u, c = uncached[route], cached[route]
+        print(f"{route:<24} {percentile(u, 50):>13.0f} {percentile(u, 99):>10.0f} "
+              f"{percentile(c, 50):>12.1f} {percentile(c, 99):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+SWML soak benchmark
+
+Fires a large number of SWML fetches at /, /sales and /support (direct and
+transfer=true) through the FastAPI app and samples the tool table size of each
+agent plus process RSS along the way. Both should stay flat: tools are
+registered once at construction and never re-registered per request.
+
+Usage:
+    python benchmarks/bench_swml_soak.py [--requests 100000] [--samples 20]
+"""
+
+import argparse
+import time
+
+from bench_utils import rss_kb, start_client
+
+from pc_builder_service import create_pc_builder_app
+
+ROUTES = ["/", "/sales", "/sales?transfer=true", "/support", "/support?transfer=true"]
+
+
+def tool_table_sizes(server):
+    """Number of registered SWAIG functions per agent route"""
+    return {
+        route or "/": len(agent._tool_registry._swaig_functions)
+        for route, agent in server.agents.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=100000, help="Total SWML fetches to fire")
+    parser.add_argument("--samples", type=int, default=20, help="Number of tool-table/RSS samples")
+    args = parser.parse_args()
+
+    server = create_pc_builder_app()
+    client = start_client(server)
+
+    # Warm up every route once so lazily created state is in place
+    for route in ROUTES:
+        client.get(route).raise_for_status()
+
+    baseline_tools = tool_table_sizes(server)
+    baseline_rss = rss_kb()
+    sample_every = max(1, args.requests // args.samples)
+
+    print(f"{'requests':>10} {'req/s':>9} {'rss_kb':>10} {'rss_delta':>10}  tools")
+    start = time.perf_counter()
+    drifted = False
+    for i in range(1, args.requests + 1):
+        client.get(ROUTES[i % len(ROUTES)])
+        if i % sample_every == 0 or i == args.requests:
+            tools = tool_table_sizes(server)
+            rss = rss_kb()
+            elapsed = time.perf_counter() - start
+            print(f"{i:>10} {i / elapsed:>9.0f} {rss:>10} {rss - baseline_rss:>+10}  {tools}")
+            drifted = drifted or tools != baseline_tools
+
+    client.__exit__(None, None, None)
+    print()
+    print(f"tool tables {'CHANGED' if drifted else 'stable'}: {baseline_tools}")
+    return 1 if drifted else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Support ticket store concurrency benchmark
+
+Starts --processes worker processes, each creating --tickets tickets from
+--threads threads against one shared SQLite ticket database, then checks
+that every ticket ID handed out is unique and that every ticket was
+persisted. Reports tickets/sec, create() latency and priority-queue query
+latency. Exits 1 on any duplicate or lost ticket.
+
+Usage:
+    python benchmarks/bench_ticket_store.py [--processes 8] [--threads 8] [--tickets 5000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import percentile
+
+from support_tickets import PRIORITIES, TicketStore
+
+PRIORITY_TEXT = ["urgent", "high", "medium", "low", "critical - PC won't boot", "whenever"]
+
+
+def worker(path: str, threads: int, tickets: int, results):
+    store = TicketStore(path)
+
+    def create(index: int):
+        start = time.perf_counter()
+        ticket = store.create(
+            f"Issue {index}: system crashes under load",
+            f"Customer {os.getpid()}-{index}",
+            PRIORITY_TEXT[index % len(PRIORITY_TEXT)],
+        )
+        return ticket.ticket_id, (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        created = list(pool.map(create, range(tickets)))
+    store.close()
+    results.put(([ticket_id for ticket_id, _ in created], [ms for _, ms in created], store.batches))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--tickets", type=int, default=5000, help="tickets per process")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tickets.db")
+        TicketStore(path).close()  # create the schema before the workers race for it
+
+        results = multiprocessing.Queue()
+        started = time.perf_counter()
+        processes = [multiprocessing.Process(target=worker, args=(path, args.threads, args.tickets, results))
+                     for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        ids = [ticket_id for batch, _, _ in collected for ticket_id in batch]
+        latencies = sorted(ms for _, batch, _ in collected for ms in batch)
+        batches = sum(count for _, _, count in collected)
+        with sqlite3.connect(path) as db:
+            stored = db.execute("SELECT COUNT(*), COUNT(DISTINCT ticket_id) FROM tickets").fetchone()
+
+        store = TicketStore(path)
+        query_ms = []
+        for priority in PRIORITIES * 50:
+            start = time.perf_counter()
+            store.query(priority, limit=20)
+            query_ms.append((time.perf_counter() - start) * 1000)
+        query_ms.sort()
+        counts = store.counts()
+        store.close()
+
+    total = args.processes * args.tickets
+    duplicates = len(ids) - len(set(ids))
+    print(f"{total} tickets from {args.processes} processes x {args.threads} threads in {elapsed:.2f}s "
+          f"({total / elapsed:.0f} tickets/s, {total / max(batches, 1):.0f} per fsync batch)")
+    print(f"create p50 {percentile(latencies, 50):.3f} ms  p99 {percentile(latencies, 99):.3f} ms")
+    print(f"priority query (20 oldest) p50 {percentile(query_ms, 50):.3f} ms  "
+          f"p99 {percentile(query_ms, 99):.3f} ms  open: {counts}")
+    print(f"duplicates: {duplicates}  persisted: {stored[0]} ({stored[1]} distinct) of {total}")
+
+    if duplicates or stored[0] != total or stored[1] != total:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Streamed tool result benchmark: time to the first SWAIG response
+
+Calls the support agent's diagnose_hardware_issue through on_function_call,
+with a knowledge stand-in whose first search is instant and whose
+follow-up search (known issues for the customer's system) takes
+--follow-up-ms. With streaming, the SWAIG response goes back after the
+first diagnostic step and continue_tool_result fetches the rest. Without
+it, the same generator is drained to the end first, which is what
+returning one SwaigFunctionResult costs. Reports p50/p99 time to the first
+response and to the complete result.
+
+Usage:
+    python benchmarks/bench_tool_streams.py [--calls 50] [--follow-up-ms 150]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from bench_utils import percentile
+
+from async_tools import run_awaitable
+from pc_builder_service import create_pc_builder_app
+from tool_streams import CONTINUATION_TOOL, merge_pieces
+
+ARGS = {"symptoms": "PC won't power on", "system_specs": "Ryzen 7 7800X3D, RTX 4070"}
+SECTION = (
+    "#### System Won't Power On At All\n**Symptoms**: No lights, no fans, completely dead\n\n"
+    "**Diagnostic Steps**:\n1. **Check Power Cable**: Ensure firmly connected at both ends\n"
+    "2. **Test Wall Outlet**: Try different outlet or test with phone charger\n"
+)
+
+
+class SlowFollowUpKnowledge:
+    """Search stand-in: diagnostic steps at once, known issues after a delay"""
+
+    def __init__(self, follow_up: float):
+        self.follow_up = follow_up
+
+    async def search_async(self, query: str):
+        if "known issues" in query:
+            await asyncio.sleep(self.follow_up)
+            return [{"content": "RTX 4070: seat the 12VHPWR connector fully", "metadata": {"section": "GPU Power"}}]
+        return [{"content": SECTION, "metadata": {"section": "Won't Power On"}}]
+
+
+def timed_calls(agent, calls: int, streamed: bool):
+    first, complete = [], []
+    for i in range(calls):
+        raw_data = {"call_id": f"bench-{streamed}-{i}"}
+        start = time.perf_counter()
+        if streamed:
+            result = agent.on_function_call("diagnose_hardware_issue", ARGS, raw_data)
+            first.append((time.perf_counter() - start) * 1000)
+            if CONTINUATION_TOOL in result.response:
+                agent.on_function_call(CONTINUATION_TOOL, {}, raw_data)
+        else:
+            handler = agent._tool_registry._swaig_functions["diagnose_hardware_issue"].handler
+
+            async def drain():
+                return [piece async for piece in handler(ARGS, raw_data)]
+            merge_pieces(run_awaitable(drain()))
+            first.append((time.perf_counter() - start) * 1000)
+        complete.append((time.perf_counter() - start) * 1000)
+    return sorted(first), sorted(complete)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--follow-up-ms", type=float, default=150.0,
+                        help="latency of the follow-up search after the first step")
+    args = parser.parse_args()
+
+    server = create_pc_builder_app(render_cache=False, knowledge_reload_interval=0)
+    agent = server.agents["/support"]
+    agent.knowledge = SlowFollowUpKnowledge(args.follow_up_ms / 1000)
+    timed_calls(agent, 3, True)
+
+    rows = [("whole result", *timed_calls(agent, args.calls, False)),
+            ("streamed", *timed_calls(agent, args.calls, True))]
+    print(f"diagnose_hardware_issue x {args.calls}, follow-up search {args.follow_up_ms:.0f} ms")
+    print(f"{'mode':<14} {'first p50':>10} {'first p99':>10} {'all p50':>9} {'all p99':>9}")
+    for mode, first, complete in rows:
+        print(f"{mode:<14} {percentile(first, 50):>10.2f} {percentile(first, 99):>10.2f} "
+              f"{percentile(complete, 50):>9.2f} {percentile(complete, 99):>9.2f}")
+
+    whole, streamed = rows
+    if percentile(streamed[1], 50) >= percentile(whole[1], 50):
+        print("FAIL: streaming did not bring the first response forward")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Triage dynamic config benchmark
+
+The triage agent's dynamic config callback runs on every inbound call. This
+compares loading the transfer skill from scratch on each request (what the
+callback used to do) with attaching the skill prebuilt per (proxy base,
+auth), on fresh ephemeral copies of the agent the same way the SDK calls it,
+and checks both produce the same tool, hints and prompt.
+
+Usage:
+    python benchmarks/bench_triage_config.py [--iterations 2000]
+"""
+
+import argparse
+import sys
+import time
+
+from bench_utils import percentile
+
+from call_context import add_context_transfer_skill
+from pc_builder_service import TriageAgent
+
+
+def rebuild(agent, copy):
+    add_context_transfer_skill(copy, agent._transfer_skill_params(agent.get_full_url(include_auth=True)))
+
+
+def prepared(agent, copy):
+    agent.configure_transfer_tools({}, {}, {}, copy)
+
+
+def measure(agent, configure, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        copy = agent._create_ephemeral_copy()
+        start = time.perf_counter()
+        configure(agent, copy)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return sorted(samples)
+
+
+def configured(agent, configure):
+    copy = agent._create_ephemeral_copy()
+    configure(agent, copy)
+    function = copy._tool_registry._swaig_functions["transfer_to_specialist"]
+    return function.to_swaig("https://example.com"), copy.get_prompt(), copy._hints
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    agent = TriageAgent()
+    if configured(agent, rebuild) != configured(agent, prepared):
+        print("FAIL: prebuilt skill differs from a fresh load")
+        sys.exit(1)
+
+    for configure in (rebuild, prepared):
+        measure(agent, configure, args.iterations // 10)  # warm
+    results = {configure.__name__: measure(agent, configure, args.iterations) for configure in (rebuild, prepared)}
+
+    print(f"{'transfer skill':<16} {'p50 us':>8} {'p99 us':>8}")
+    for name, samples in results.items():
+        print(f"{name:<16} {percentile(samples, 50):>8.1f} {percentile(samples, 99):>8.1f}")
+    speedup = percentile(results["rebuild"], 50) / percentile(results["prepared"], 50)
+    print(f"speedup at p50: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Shared helpers for the PC Builder benchmark scripts
+
+Benchmarks are plain scripts run from the repository root, e.g.:
+    python benchmarks/bench_swml_soak.py --requests 100000
+"""
+
+import os
+import sys
+
+# Keep SDK request logging out of the timings unless explicitly requested
+os.environ.setdefault("SIGNALWIRE_LOG_MODE", "off")
+
+# Make the service modules importable when run as `python benchmarks/<script>.py`
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def rss_kb() -> int:
+    """Return the current resident set size of this process in KiB"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        # Not Linux - fall back to peak RSS, which is still useful for drift checks
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile over an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def start_client(server):
+    """Return a started TestClient for an AgentServer (runs startup hooks)"""
+    from fastapi.testclient import TestClient
+    client = TestClient(server.app)
+    client.__enter__()
+    return client
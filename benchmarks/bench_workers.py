@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Multi-worker scaling benchmark
+
+Starts pc_builder_service.py with --workers N for each N, waits for /ready,
+then drives it over HTTP from --clients load processes for --seconds. Each
+client replays the two hottest requests: the triage SWML fetch and a
+specialist SWAIG tool call (through the webhook URL and token from the
+document, so tokens minted by one worker are validated by another). Reports
+throughput, latency, scaling relative to one worker and the workers' total
+RSS and PSS (Linux), which shows how much of the warmed state is shared.
+
+The load generator runs on the same machine, so leave it some CPU: scaling
+flattens once the workers and clients together saturate the cores.
+
+Usage:
+    python benchmarks/bench_workers.py [--workers 1 2 4] [--seconds 10] [--clients 4] [--threads 4]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from bench_utils import REPO_ROOT, percentile
+
+import psutil
+import requests
+
+TOOL = ("check_component_compatibility", {"components": "i5-14600K, RTX 4070 Super, B760 board, 750W PSU"})
+
+
+def wait_ready(base: str, process: subprocess.Popen, timeout: float = 120.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            response = requests.get(f"{base}/ready", timeout=1)
+            if response.status_code == 200:
+                return response.json()
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server not ready in time")
+
+
+def tool_url(session: requests.Session, base: str, call_id: str) -> str:
+    document = session.post(f"{base}/sales", json={"call_id": call_id}).json()
+    ai = next(verb["ai"] for verb in document["sections"]["main"] if "ai" in verb)
+    function = next(f for f in ai["SWAIG"]["functions"] if f["function"] == TOOL[0])
+    url = urlsplit(function.get("web_hook_url") or ai["SWAIG"]["defaults"]["web_hook_url"])
+    return f"{base}{url.path}?{url.query}"
+
+
+def client(base: str, threads: int, seconds: float, client_id: int, results) -> None:
+    deadline = time.monotonic() + seconds
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def run(thread_id: int):
+        session = requests.Session()
+        call_id = f"bench-{client_id}-{thread_id}"
+        url = tool_url(session, base, call_id)
+        payload = {"function": TOOL[0], "call_id": call_id, "argument": {"parsed": [TOOL[1]]}}
+        local, failed = [], 0
+        while time.monotonic() < deadline:
+            for method, target, body in (("post", f"{base}/", {"call_id": call_id}), ("post", url, payload)):
+                start = time.perf_counter()
+                response = getattr(session, method)(target, json=body)
+                local.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200 or "error" in response.json():
+                    failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    pool = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put((latencies, errors[0]))
+
+
+def memory_kb(parent: psutil.Process, workers: int):
+    processes = parent.children(recursive=True) if workers > 1 else [parent]
+    rss = pss = 0
+    for process in processes:
+        info = process.memory_full_info()
+        rss += info.rss // 1024
+        pss += getattr(info, "pss", 0) // 1024
+    return len(processes), rss, pss
+
+
+def run_level(workers: int, args, port: int, scratch: str) -> dict:
+    env = dict(os.environ, SIGNALWIRE_LOG_MODE="off", TICKET_DB_PATH=os.path.join(scratch, "tickets.db"),
+               CONTEXT_DB_PATH=os.path.join(scratch, "context.db"), KNOWLEDGE_RELOAD_INTERVAL="0")
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "pc_builder_service.py"), "--workers", str(workers),
+         "--host", "127.0.0.1", "--port", str(port)],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base, server)
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=client, args=(base, args.threads, args.seconds, i, results))
+                   for i in range(args.clients)]
+        started = time.perf_counter()
+        for process in clients:
+            process.start()
+        collected = [results.get() for _ in clients]
+        for process in clients:
+            process.join()
+        elapsed = time.perf_counter() - started
+        processes, rss, pss = memory_kb(psutil.Process(server.pid), workers)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    latencies = sorted(ms for batch, _ in collected for ms in batch)
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in collected),
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "processes": processes,
+        "rss_mb": round(rss / 1024, 1),
+        "pss_mb": round(pss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=4, help="load generator processes")
+    parser.add_argument("--threads", type=int, default=4, help="connections per load generator")
+    parser.add_argument("--port", type=int, default=3190)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="pc-builder-workers-") as scratch:
+        for workers in args.workers:
+            rows.append(run_level(workers, args, args.port, scratch))
+
+    if args.json:
+        print(json.dumps({"cpus": os.cpu_count(), "results": rows}, indent=2))
+    else:
+        base = rows[0]["req_per_s"] or 1.0
+        print(f"{os.cpu_count()} CPUs, {args.clients} clients x {args.threads} connections, {args.seconds:g}s per level")
+        print(f"{'workers':>7} {'req/s':>8} {'scaling':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} "
+              f"{'RSS MB':>8} {'PSS MB':>8}")
+        for row in rows:
+            print(f"{row['workers']:>7} {row['req_per_s']:>8} {row['req_per_s'] / base:>7.2f}x {row['p50_ms']:>8} "
+                  f"{row['p99_ms']:>8} {row['errors']:>7} {row['rss_mb']:>8} {row['pss_mb']:>8}")
+    if any(row["errors"] for row in rows):
+        print("FAIL")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
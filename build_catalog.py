@@ -0,0 +1,733 @@
+#!/usr/bin/env python3
+"""
+Structured build catalog and compatibility engine for the Sales agent
+
+sales_knowledge_base.md is parsed once at startup into typed, __slots__-based
+records: the base builds with their components, price ranges and "+$N"
+upgrade options. Component specs that matter for compatibility (socket,
+memory generation, power draw, physical size) are not in the knowledge base,
+so they come from the spec tables below, matched by model name.
+
+CompatibilityChecker answers socket, memory generation, PSU headroom,
+cooling capacity and case clearance questions with a handful of attribute
+reads - no LLM or vector search involved.
+"""
+
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from signalwire_agents.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CATALOG_PATH = "sales_knowledge_base.md"
+
+# Continuous draw of board, memory, drives and fans on top of CPU and GPU
+BASE_SYSTEM_WATTS = 75
+# Keep sustained load at or below this fraction of PSU rating
+PSU_TARGET_LOAD = 0.7
+
+
+# ---------------------------------------------------------------------------
+# Spec tables
+# ---------------------------------------------------------------------------
+
+# (model pattern, socket, supported memory generations, TDP watts)
+CPU_SPECS = [
+    (r"threadripper pro 7\d{3}wx", "sTR5", ("DDR5",), 350),
+    (r"threadripper pro 5\d{3}wx", "sWRX8", ("DDR4",), 280),
+    (r"ryzen \d 9\d{3}x3d", "AM5", ("DDR5",), 120),
+    (r"ryzen 9 9950x|ryzen 9 9900x", "AM5", ("DDR5",), 170),
+    (r"ryzen \d 9\d{3}", "AM5", ("DDR5",), 65),
+    (r"ryzen \d 7\d{3}x3d", "AM5", ("DDR5",), 120),
+    (r"ryzen 9 7\d{3}x", "AM5", ("DDR5",), 170),
+    (r"ryzen \d 7\d{3}x", "AM5", ("DDR5",), 105),
+    (r"ryzen \d 7\d{3}", "AM5", ("DDR5",), 65),
+    (r"ryzen \d 5\d{3}x3d", "AM4", ("DDR4",), 105),
+    (r"ryzen \d 5\d{3}x", "AM4", ("DDR4",), 105),
+    (r"ryzen \d 5\d{3}", "AM4", ("DDR4",), 65),
+    (r"core ultra [579] 2\d{2}k", "LGA1851", ("DDR5",), 125),
+    (r"\bi[3579][- ]?1[234]\d{3}k", "LGA1700", ("DDR4", "DDR5"), 125),
+    (r"\bi[3579][- ]?1[234]\d{3}", "LGA1700", ("DDR4", "DDR5"), 65),
+]
+
+# (model pattern, board power watts, typical card length mm)
+GPU_SPECS = [
+    (r"rtx 5090", 575, 304),
+    (r"rtx 5080", 360, 304),
+    (r"rtx 5070 ti", 300, 300),
+    (r"rtx 5070", 250, 280),
+    (r"rtx 4090", 450, 336),
+    (r"rtx 4080", 320, 310),
+    (r"rtx 4070 ti", 285, 300),
+    (r"rtx 4070", 200, 270),
+    (r"rtx 4060 ti", 160, 245),
+    (r"rtx 4060", 115, 240),
+    (r"rtx a6000", 300, 267),
+    (r"rtx a5000", 230, 267),
+    (r"rtx a4000", 140, 241),
+    (r"rx 7900 xtx", 355, 287),
+    (r"rx 7900 xt", 315, 276),
+    (r"rx 7800 xt", 263, 267),
+    (r"rx 7700 xt", 245, 267),
+    (r"rx 7600", 165, 204),
+]
+
+# Motherboard chipset -> (socket, supported memory generations)
+CHIPSET_SPECS = {
+    "a520": ("AM4", ("DDR4",)), "b450": ("AM4", ("DDR4",)), "b550": ("AM4", ("DDR4",)),
+    "x570": ("AM4", ("DDR4",)), "a620": ("AM5", ("DDR5",)), "b650": ("AM5", ("DDR5",)),
+    "b650e": ("AM5", ("DDR5",)), "x670": ("AM5", ("DDR5",)), "x670e": ("AM5", ("DDR5",)),
+    "b850": ("AM5", ("DDR5",)), "x870": ("AM5", ("DDR5",)), "x870e": ("AM5", ("DDR5",)),
+    "h610": ("LGA1700", ("DDR4", "DDR5")), "b660": ("LGA1700", ("DDR4", "DDR5")),
+    "b760": ("LGA1700", ("DDR4", "DDR5")), "z690": ("LGA1700", ("DDR4", "DDR5")),
+    "z790": ("LGA1700", ("DDR4", "DDR5")), "z890": ("LGA1851", ("DDR5",)),
+    "b860": ("LGA1851", ("DDR5",)), "wrx80": ("sWRX8", ("DDR4",)), "wrx90": ("sTR5", ("DDR5",)),
+    "trx50": ("sTR5", ("DDR5",)),
+}
+
+# House case spec sheet: name -> (max GPU length, max air cooler height, max radiator) in mm
+CASE_SPECS = {
+    "pc builder pro airflow": (330, 160, 280),
+    "pc builder pro tg rgb": (360, 165, 360),
+    "pc builder pro ultra tower": (450, 185, 420),
+    "pc builder pro creator": (380, 170, 360),
+    "pc builder pro workstation": (450, 190, 480),
+}
+
+# Named air coolers: pattern -> (height mm, sustained cooling capacity watts)
+AIR_COOLER_SPECS = [
+    (r"wraith", 72, 95),
+    (r"nh-d15", 165, 250),
+    (r"nh-u12", 158, 180),
+    (r"hyper 212", 159, 180),
+    (r"ak620", 160, 260),
+    (r"peerless assassin", 155, 245),
+    (r"dark rock pro", 163, 270),
+]
+
+# Liquid cooling capacity by radiator size (mm -> watts)
+RADIATOR_CAPACITY = {120: 150, 240: 250, 280: 280, 360: 320, 420: 350}
+CUSTOM_LOOP_CAPACITY = 600
+
+_CPU_PATTERNS = [(re.compile(p), socket, mem, tdp) for p, socket, mem, tdp in CPU_SPECS]
+_GPU_PATTERNS = [(re.compile(p), power, length) for p, power, length in GPU_SPECS]
+_AIR_COOLER_PATTERNS = [(re.compile(p), height, capacity) for p, height, capacity in AIR_COOLER_SPECS]
+
+_CPU_NAME = re.compile(r"(threadripper pro \w+|ryzen \d \w+|core ultra [579] \w+|\bi[3579][- ]?\d\w+)", re.I)
+# "Core i7 13700K", "i7 13700K" and "i7-13700K" are the same part
+_INTEL_MODEL = re.compile(r"\b(i[3579])[- ]?(1[234]\d{3}\w*)", re.I)
+_GPU_NAME = re.compile(r"((?:rtx|gtx|rx) a?\d{4}(?: (?:ti|super|xtx|xt))*)", re.I)
+_MEMORY_CAPACITY = re.compile(r"(\d+)\s*gb\b", re.I)
+_MEMORY_GENERATION = re.compile(r"\b(ddr[345])\b", re.I)
+_MEMORY_SPEED = re.compile(r"(\d{4})\s*(?:mhz|mt/s)", re.I)
+# The capacity closest before the drive type: "32GB RAM 2TB SSD" is a 2TB drive
+_STORAGE = re.compile(r"(\d+)\s*(tb|gb)\b(?:(?!\d+\s*(?:tb|gb)\b)[^,])*?(nvme|ssd|hdd)", re.I)
+_WATTAGE = re.compile(r"(\d{3,4})\s*w\b", re.I)
+_RADIATOR = re.compile(r"(\d{3})\s*mm", re.I)
+# Board model suffixes follow the chipset: "B760M", "B650M-A", "Z790-PLUS", "X570S"
+_CHIPSET = re.compile(r"\b([abhxzwt]r?x?\d{2,3})(e?)(?:[ms]|-\w+|\b)", re.I)
+_CORES = re.compile(r"(\d+)-core", re.I)
+_VRAM = re.compile(r"(\d+)\s*gb", re.I)
+
+_PSU_WORDS = re.compile(r"\b(?:psu|power supply|80\s*\+|80 plus|gold|platinum|bronze|titanium)", re.I)
+
+# Free-text component separators ("a, b and c", "a + b", "a / b")
+_SEPARATORS = re.compile(r"\s*(?:,|;|\+|\band\b|\bwith\b|\n)\s*", re.I)
+
+
+# ---------------------------------------------------------------------------
+# Records
+# ---------------------------------------------------------------------------
+
+class Component:
+    """Base record; subclasses add the attributes their checks need"""
+
+    __slots__ = ("name",)
+    kind = "component"
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"{type(self).__name__}(name={self.name!r}, {fields})" if fields else f"{type(self).__name__}({self.name!r})"
+
+
+class Cpu(Component):
+    __slots__ = ("socket", "memory_generations", "tdp", "cores")
+    kind = "cpu"
+
+    def __init__(self, name: str, socket: str, memory_generations: Tuple[str, ...], tdp: int,
+                 cores: Optional[int] = None):
+        super().__init__(name)
+        self.socket = socket
+        self.memory_generations = memory_generations
+        self.tdp = tdp
+        self.cores = cores
+
+
+class Gpu(Component):
+    __slots__ = ("power", "length_mm", "vram_gb", "count")
+    kind = "gpu"
+
+    def __init__(self, name: str, power: int, length_mm: int, vram_gb: Optional[int] = None, count: int = 1):
+        super().__init__(name)
+        self.power = power
+        self.length_mm = length_mm
+        self.vram_gb = vram_gb
+        self.count = count
+
+
+class Memory(Component):
+    __slots__ = ("capacity_gb", "generation", "speed_mhz", "ecc")
+    kind = "ram"
+
+    def __init__(self, name: str, capacity_gb: Optional[int], generation: Optional[str],
+                 speed_mhz: Optional[int] = None, ecc: bool = False):
+        super().__init__(name)
+        self.capacity_gb = capacity_gb
+        self.generation = generation
+        self.speed_mhz = speed_mhz
+        self.ecc = ecc
+
+
+class Storage(Component):
+    __slots__ = ("capacity_gb", "interface")
+    kind = "storage"
+
+    def __init__(self, name: str, capacity_gb: int, interface: str):
+        super().__init__(name)
+        self.capacity_gb = capacity_gb
+        self.interface = interface
+
+
+class PowerSupply(Component):
+    __slots__ = ("wattage",)
+    kind = "psu"
+
+    def __init__(self, name: str, wattage: int):
+        super().__init__(name)
+        self.wattage = wattage
+
+
+class Case(Component):
+    __slots__ = ("max_gpu_length_mm", "max_cooler_height_mm", "max_radiator_mm")
+    kind = "case"
+
+    def __init__(self, name: str, max_gpu_length_mm: int, max_cooler_height_mm: int, max_radiator_mm: int):
+        super().__init__(name)
+        self.max_gpu_length_mm = max_gpu_length_mm
+        self.max_cooler_height_mm = max_cooler_height_mm
+        self.max_radiator_mm = max_radiator_mm
+
+
+class Cooler(Component):
+    __slots__ = ("cooler_type", "capacity_w", "height_mm", "radiator_mm")
+    kind = "cooling"
+
+    def __init__(self, name: str, cooler_type: str, capacity_w: int,
+                 height_mm: Optional[int] = None, radiator_mm: Optional[int] = None):
+        super().__init__(name)
+        self.cooler_type = cooler_type
+        self.capacity_w = capacity_w
+        self.height_mm = height_mm
+        self.radiator_mm = radiator_mm
+
+
+class Motherboard(Component):
+    __slots__ = ("socket", "memory_generations")
+    kind = "motherboard"
+
+    def __init__(self, name: str, socket: str, memory_generations: Tuple[str, ...]):
+        super().__init__(name)
+        self.socket = socket
+        self.memory_generations = memory_generations
+
+
+class Upgrade:
+    """One "+$N" upgrade option of a build"""
+
+    __slots__ = ("price", "description", "kind", "component", "replaces")
+
+    def __init__(self, price: int, description: str, kind: str,
+                 component: Optional[Component] = None, replaces: bool = True):
+        self.price = price
+        self.description = description
+        # Component kind the upgrade touches, or "extra" for cosmetic add-ons
+        self.kind = kind
+        self.component = component
+        # False when the component is added alongside the base one (e.g. a second drive)
+        self.replaces = replaces
+
+    def __repr__(self) -> str:
+        return f"Upgrade(+${self.price}: {self.description})"
+
+
+class Build:
+    """A base configuration from the catalog"""
+
+    __slots__ = ("name", "nickname", "category", "price_min", "price_max", "base_price",
+                 "perfect_for", "components", "upgrades")
+
+    def __init__(self, name: str, nickname: str, category: str, price_min: int, price_max: int,
+                 base_price: int, perfect_for: str, components: Dict[str, Component],
+                 upgrades: Tuple[Upgrade, ...]):
+        self.name = name
+        self.nickname = nickname
+        self.category = category
+        self.price_min = price_min
+        self.price_max = price_max
+        self.base_price = base_price
+        self.perfect_for = perfect_for
+        self.components = components
+        self.upgrades = upgrades
+
+    def __repr__(self) -> str:
+        return f"Build({self.name!r}, ${self.base_price})"
+
+
+# ---------------------------------------------------------------------------
+# Component parsing
+# ---------------------------------------------------------------------------
+
+def _money(text: str) -> int:
+    return int(text.replace("$", "").replace(",", ""))
+
+
+def _capacity_gb(amount: str, unit: str) -> int:
+    return int(amount) * (1000 if unit.lower() == "tb" else 1)
+
+
+def parse_cpu(text: str) -> Optional[Cpu]:
+    text = _INTEL_MODEL.sub(r"\1-\2", text)
+    lowered = text.lower()
+    for pattern, socket, memory_generations, tdp in _CPU_PATTERNS:
+        if pattern.search(lowered):
+            name_match = _CPU_NAME.search(text)
+            cores = _CORES.search(text)
+            return Cpu(name_match.group(1) if name_match else text.strip(), socket, memory_generations, tdp,
+                       int(cores.group(1)) if cores else None)
+    return None
+
+
+def parse_gpu(text: str) -> Optional[Gpu]:
+    lowered = text.lower()
+    for pattern, power, length in _GPU_PATTERNS:
+        if pattern.search(lowered):
+            name_match = _GPU_NAME.search(text)
+            vram = _VRAM.search(text)
+            count = 2 if re.search(r"\b(dual|2x)\b", lowered) else 1
+            return Gpu(name_match.group(1) if name_match else text.strip(), power, length,
+                       int(vram.group(1)) if vram else None, count)
+    return None
+
+
+def parse_memory(text: str, generation: Optional[str] = None) -> Optional[Memory]:
+    """RAM from "32GB DDR5 6000MHz", "DDR4 32GB" or "DDR4 RAM"; capacity is optional with a generation"""
+    lowered = text.lower()
+    capacity = _MEMORY_CAPACITY.search(text)
+    found_generation = _MEMORY_GENERATION.search(text)
+    if found_generation is None and (capacity is None or not re.search(r"\b(?:ram|memory)\b", lowered)):
+        return None
+    speed = _MEMORY_SPEED.search(text)
+    return Memory(text.strip(), int(capacity.group(1)) if capacity else None,
+                  (found_generation.group(1) if found_generation else generation or "").upper() or None,
+                  int(speed.group(1)) if speed else None, "ecc" in lowered)
+
+
+def parse_storage(text: str) -> Optional[Storage]:
+    match = _STORAGE.search(text)
+    if not match:
+        return None
+    amount, unit, interface = match.groups()
+    return Storage(text.strip(), _capacity_gb(amount, unit), interface.lower())
+
+
+def parse_psu(text: str) -> Optional[PowerSupply]:
+    match = _WATTAGE.search(text)
+    if not match:
+        return None
+    return PowerSupply(text.strip(), int(match.group(1)))
+
+
+def parse_case(text: str) -> Optional[Case]:
+    lowered = text.lower()
+    for name, (gpu_length, cooler_height, radiator) in CASE_SPECS.items():
+        start = lowered.find(name)
+        if start >= 0:
+            # Named from the case on: "RTX 4090 in PC Builder Pro Airflow case" -> "PC Builder Pro Airflow case"
+            return Case(text[start:].strip(), gpu_length, cooler_height, radiator)
+    return None
+
+
+def parse_cooler(text: str) -> Optional[Cooler]:
+    lowered = text.lower()
+    if "custom" in lowered and ("loop" in lowered or "water" in lowered):
+        return Cooler(text.strip(), "custom", CUSTOM_LOOP_CAPACITY)
+    radiator = _RADIATOR.search(lowered)
+    if radiator and ("aio" in lowered or "liquid" in lowered):
+        size = int(radiator.group(1))
+        capacity = RADIATOR_CAPACITY.get(size)
+        if capacity is None:
+            # Odd sizes rate as the next size down; under 120mm, as a 120
+            capacity = max((v for k, v in RADIATOR_CAPACITY.items() if k <= size),
+                           default=RADIATOR_CAPACITY[min(RADIATOR_CAPACITY)])
+        return Cooler(text.strip(), "aio", capacity, radiator_mm=size)
+    for pattern, height, capacity in _AIR_COOLER_PATTERNS:
+        if pattern.search(lowered):
+            return Cooler(text.strip(), "air", capacity, height_mm=height)
+    return None
+
+
+def parse_motherboard(text: str) -> Optional[Motherboard]:
+    for match in _CHIPSET.finditer(text):
+        chipset = match.group(1).lower()
+        spec = CHIPSET_SPECS.get(chipset + match.group(2).lower()) or CHIPSET_SPECS.get(chipset)
+        if spec is not None:
+            socket, memory_generations = spec
+            return Motherboard(text.strip(), socket, memory_generations)
+    return None
+
+
+# Knowledge base labels -> parser
+LABEL_PARSERS = {
+    "CPU": parse_cpu,
+    "GPU": parse_gpu,
+    "RAM": parse_memory,
+    "Storage": parse_storage,
+    "PSU": parse_psu,
+    "Case": parse_case,
+    "Cooling": parse_cooler,
+}
+
+# Every parser gets each free-text fragment; one fragment can name several parts
+_FREE_TEXT_PARSERS = (parse_cpu, parse_gpu, parse_motherboard, parse_cooler, parse_case,
+                      parse_psu, parse_memory, parse_storage)
+
+
+def identify_components(text: str) -> List[Component]:
+    """
+    Identify every component named in a free-text fragment
+
+    "RTX 4090 in PC Builder Pro Airflow case" is a GPU and a case. A wattage
+    next to another part ("Ryzen 9 7950X 170W") is that part's rating, not a
+    PSU, unless the fragment says it is one.
+    """
+    components = [component for component in (parser(text) for parser in _FREE_TEXT_PARSERS)
+                  if component is not None]
+    if len(components) > 1 and not _PSU_WORDS.search(text):
+        components = [component for component in components if component.kind != "psu"]
+    return components
+
+
+def identify_component(text: str) -> Optional[Component]:
+    """Identify a single component from free text ("RTX 4070", "750W PSU", ...)"""
+    components = identify_components(text)
+    return components[0] if components else None
+
+
+def parse_component_list(text: str) -> Tuple[List[Component], List[str]]:
+    """
+    Split a free-text component list and identify each part
+
+    Returns:
+        (components, fragments that were not recognized)
+    """
+    components = []
+    unknown = []
+    for fragment in _SEPARATORS.split(text):
+        if not fragment:
+            continue
+        found = identify_components(fragment)
+        if found:
+            components.extend(found)
+        else:
+            unknown.append(fragment)
+    return components, unknown
+
+
+# ---------------------------------------------------------------------------
+# Catalog
+# ---------------------------------------------------------------------------
+
+_BUILD_HEADING = re.compile(r'^####\s+(.+?)\s+-\s+"(.+?)"\s+\((\$[\d,]+)-(\$[\d,]+)\)\s*$')
+_CATEGORY_HEADING = re.compile(r"^###\s+(.+?)\s*$")
+_BASE_CONFIGURATION = re.compile(r"^\*\*Base Configuration \((\$[\d,]+)\)\*\*:")
+_PERFECT_FOR = re.compile(r"^\*\*Perfect for\*\*:\s*(.+)$")
+_LABELLED_ITEM = re.compile(r"^-\s+(\w+):\s*(.+)$")
+_UPGRADE_ITEM = re.compile(r"^-\s+\+(\$[\d,]+):\s*(.+)$")
+
+
+def _parse_upgrade(price: int, description: str, components: Dict[str, Component]) -> Upgrade:
+    """Work out which component an upgrade description touches"""
+    lowered = description.lower()
+    target = re.sub(r"^(upgrade to|add)\s+", "", description, flags=re.I)
+    replaces = not lowered.startswith("add") or "cool" in lowered
+
+    for kind, parser in (("cpu", parse_cpu), ("gpu", parse_gpu), ("cooling", parse_cooler)):
+        component = parser(target)
+        if component is not None:
+            if kind == "gpu" and component.count > 1:
+                replaces = True
+            return Upgrade(price, description, kind, component, replaces)
+
+    if "ram" in lowered:
+        base = components.get("ram")
+        component = parse_memory(target, base.generation if isinstance(base, Memory) else None)
+        if component is not None and isinstance(base, Memory):
+            component.speed_mhz = component.speed_mhz or base.speed_mhz
+        return Upgrade(price, description, "ram", component, True)
+
+    component = parse_storage(target)
+    if component is not None:
+        return Upgrade(price, description, "storage", component, replaces)
+
+    return Upgrade(price, description, "extra", None, False)
+
+
+class Catalog:
+    """Builds parsed from the sales knowledge base, indexed for lookup"""
+
+    __slots__ = ("builds", "by_name", "by_category")
+
+    def __init__(self, builds: List[Build]):
+        self.builds = tuple(builds)
+        self.by_name = {}
+        self.by_category: Dict[str, List[Build]] = {}
+        for build in builds:
+            self.by_name[build.name.lower()] = build
+            self.by_name[build.nickname.lower()] = build
+            self.by_category.setdefault(build.category, []).append(build)
+
+    @classmethod
+    def from_markdown(cls, text: str) -> "Catalog":
+        builds = []
+        category = ""
+        current = None
+        section = None
+
+        def finish():
+            if current is not None and current["components"]:
+                builds.append(Build(
+                    current["name"], current["nickname"], current["category"],
+                    current["price_min"], current["price_max"], current["base_price"],
+                    current["perfect_for"], current["components"], tuple(current["upgrades"])
+                ))
+
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            heading = _BUILD_HEADING.match(line)
+            if heading:
+                finish()
+                name, nickname, price_min, price_max = heading.groups()
+                current = {
+                    "name": name, "nickname": nickname, "category": category,
+                    "price_min": _money(price_min), "price_max": _money(price_max),
+                    "base_price": _money(price_min), "perfect_for": "",
+                    "components": {}, "upgrades": [],
+                }
+                section = None
+                continue
+            if line.startswith("#"):
+                finish()
+                current = None
+                category_heading = _CATEGORY_HEADING.match(line)
+                if category_heading:
+                    category = category_heading.group(1)
+                continue
+            if current is None:
+                continue
+
+            if line.startswith("**"):
+                base = _BASE_CONFIGURATION.match(line)
+                perfect_for = _PERFECT_FOR.match(line)
+                if base:
+                    current["base_price"] = _money(base.group(1))
+                    section = "base"
+                elif perfect_for:
+                    current["perfect_for"] = perfect_for.group(1)
+                elif line.startswith("**Upgrade Options**"):
+                    section = "upgrades"
+                else:
+                    section = None
+                continue
+
+            if section == "base":
+                item = _LABELLED_ITEM.match(line)
+                if item and item.group(1) in LABEL_PARSERS:
+                    component = LABEL_PARSERS[item.group(1)](item.group(2))
+                    if component is None:
+                        logger.warning("catalog_unknown_component", build=current["name"], text=item.group(2))
+                    else:
+                        current["components"][component.kind] = component
+            elif section == "upgrades":
+                item = _UPGRADE_ITEM.match(line)
+                if item:
+                    current["upgrades"].append(
+                        _parse_upgrade(_money(item.group(1)), item.group(2), current["components"])
+                    )
+        finish()
+        return cls(builds)
+
+    def find_build(self, name: str) -> Optional[Build]:
+        """Look a build up by name or nickname, case-insensitively"""
+        return self.by_name.get(name.lower().strip().strip('"'))
+
+
+_catalog: Optional[Catalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog(path: str = DEFAULT_CATALOG_PATH) -> Catalog:
+    """Return the process-wide catalog, parsing the knowledge base on first use"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = load_catalog(path)
+    return _catalog
+
+
+def reload_catalog(path: str = DEFAULT_CATALOG_PATH) -> Catalog:
+    """Re-parse the knowledge base and make the result the process-wide catalog"""
+    global _catalog
+    catalog = load_catalog(path)
+    with _catalog_lock:
+        _catalog = catalog
+    return catalog
+
+
+def load_catalog(path: str = DEFAULT_CATALOG_PATH) -> Catalog:
+    """Parse a catalog from disk (an empty catalog if the file is missing)"""
+    if not os.path.exists(path):
+        logger.warning("catalog_source_missing", path=path)
+        return Catalog([])
+    with open(path, encoding="utf-8") as f:
+        catalog = Catalog.from_markdown(f.read())
+    logger.info("catalog_loaded", path=path, builds=len(catalog.builds))
+    return catalog
+
+
+# ---------------------------------------------------------------------------
+# Compatibility
+# ---------------------------------------------------------------------------
+
+class CompatibilityReport:
+    """Outcome of a compatibility check"""
+
+    __slots__ = ("issues", "warnings", "estimated_load_w")
+
+    def __init__(self, issues: List[str], warnings: List[str], estimated_load_w: int):
+        self.issues = issues
+        self.warnings = warnings
+        self.estimated_load_w = estimated_load_w
+
+    @property
+    def compatible(self) -> bool:
+        return not self.issues
+
+    def summary(self, unchecked: Sequence[str] = ()) -> str:
+        """
+        Spoken-ready verdict
+
+        unchecked are the parts that couldn't be identified; with any of them
+        the parts that were checked can't be called compatible as a whole.
+        """
+        if not self.compatible:
+            lines = ["Not compatible:"]
+        elif unchecked:
+            lines = [f"No issues among the parts I could check{', with notes' if self.warnings else ''}:"]
+        elif self.warnings:
+            lines = ["Compatible, with notes:"]
+        else:
+            lines = ["Compatible: no issues found."]
+        lines.extend(f"- {issue}" for issue in self.issues)
+        lines.extend(f"- Note: {warning}" for warning in self.warnings)
+        if unchecked:
+            lines.append(f"Not checked (unrecognized): {', '.join(unchecked)}.")
+        if self.estimated_load_w:
+            lines.append(f"Estimated sustained load: {self.estimated_load_w}W.")
+        return "\n".join(lines)
+
+
+class CompatibilityChecker:
+    """
+    Rule-based compatibility checks over parsed components
+
+    Each rule reads a few precomputed attributes, so a full check costs
+    microseconds. Missing parts simply skip the rules that need them.
+    """
+
+    def check(self, components: Iterable[Component]) -> CompatibilityReport:
+        parts: Dict[str, Component] = {}
+        gpus: List[Gpu] = []
+        for component in components:
+            if isinstance(component, Gpu):
+                gpus.append(component)
+            else:
+                parts[component.kind] = component
+        cpu = parts.get("cpu")
+        board = parts.get("motherboard")
+        ram = parts.get("ram")
+        psu = parts.get("psu")
+        case = parts.get("case")
+        cooler = parts.get("cooling")
+        issues = []
+        warnings = []
+
+        # Socket
+        if cpu is not None and board is not None and cpu.socket != board.socket:
+            issues.append(f"{cpu.name} uses socket {cpu.socket} but {board.name} is {board.socket}")
+
+        # Memory generation
+        if ram is not None and ram.generation:
+            for part in (cpu, board):
+                if part is not None and ram.generation not in part.memory_generations:
+                    issues.append(
+                        f"{part.name} supports {'/'.join(part.memory_generations)}, not {ram.generation}"
+                    )
+
+        # Power
+        load = 0
+        if cpu is not None or gpus:
+            load = BASE_SYSTEM_WATTS + (cpu.tdp if cpu is not None else 0) + sum(g.power * g.count for g in gpus)
+        if psu is not None and load:
+            if psu.wattage < load:
+                issues.append(f"{psu.wattage}W PSU is below the estimated {load}W load")
+            elif psu.wattage * PSU_TARGET_LOAD < load:
+                recommended = -(-int(load / PSU_TARGET_LOAD) // 50) * 50
+                warnings.append(
+                    f"{psu.wattage}W PSU leaves little headroom for a {load}W load - {recommended}W or more recommended"
+                )
+
+        # Cooling capacity
+        if cpu is not None and cooler is not None and cooler.capacity_w < cpu.tdp:
+            warnings.append(f"{cooler.name} is rated for about {cooler.capacity_w}W; {cpu.name} can draw {cpu.tdp}W")
+
+        # Case clearance
+        if case is not None:
+            for gpu in gpus:
+                if gpu.length_mm > case.max_gpu_length_mm:
+                    issues.append(
+                        f"{gpu.name} (~{gpu.length_mm}mm) does not fit {case.name} (max {case.max_gpu_length_mm}mm)"
+                    )
+            if cooler is not None:
+                if cooler.height_mm and cooler.height_mm > case.max_cooler_height_mm:
+                    issues.append(
+                        f"{cooler.name} ({cooler.height_mm}mm) is too tall for {case.name} "
+                        f"(max {case.max_cooler_height_mm}mm)"
+                    )
+                if cooler.radiator_mm and cooler.radiator_mm > case.max_radiator_mm:
+                    issues.append(
+                        f"{cooler.radiator_mm}mm radiator does not fit {case.name} (max {case.max_radiator_mm}mm)"
+                    )
+
+        return CompatibilityReport(issues, warnings, load)
+
+    def check_text(self, text: str) -> Tuple[CompatibilityReport, List[Component], List[str]]:
+        """Parse a free-text component list and check it"""
+        components, unknown = parse_component_list(text)
+        return self.check(components), components, unknown
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Budget-constrained build optimizer for create_build_recommendation
+
+Every catalog build is expanded into its upgrade combinations (at most one
+upgrade per component, each combination checked for compatibility). For a
+use case and set of preferences the options are scored and reduced to a
+Pareto frontier over (price, score): each frontier point is the best option
+anything up to the next point's price can buy. A recommendation is then a
+binary search over the frontier, and the formatted result is memoized on
+(budget bucket, use case, preferences), where a budget bucket is the span
+between two frontier prices - every budget in it gets the same answer.
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from build_catalog import Build, Catalog, CompatibilityChecker, Component, Upgrade, get_catalog
+
+# Relative gaming performance (RTX 4060 = 100) and compute throughput per GPU
+GPU_PERFORMANCE = {
+    "rtx 4060": (100, 100),
+    "rtx 4060 ti": (120, 118),
+    "rtx 4070": (150, 150),
+    "rtx 4070 ti": (185, 190),
+    "rtx 4080": (230, 240),
+    "rtx 4090": (300, 330),
+    "rtx a5000": (160, 210),
+}
+
+# Relative single-thread (gaming) and multi-thread performance (Ryzen 5 5600 = 100)
+CPU_PERFORMANCE = {
+    "ryzen 5 5600": (100, 100),
+    "i5-14600k": (135, 180),
+    "i7-14700k": (145, 240),
+    "i9-14900k": (150, 275),
+    "ryzen 9 7950x": (145, 300),
+    "threadripper pro 5965wx": (110, 340),
+}
+
+# Weights per use case: gpu (gaming), gpu compute, cpu single, cpu multi, ram, storage
+USE_CASE_WEIGHTS = {
+    "esports": {"gpu": 0.45, "compute": 0.0, "cpu_single": 0.45, "cpu_multi": 0.0, "ram": 0.05, "storage": 0.05},
+    "gaming": {"gpu": 0.65, "compute": 0.0, "cpu_single": 0.2, "cpu_multi": 0.0, "ram": 0.08, "storage": 0.07},
+    "streaming": {"gpu": 0.45, "compute": 0.0, "cpu_single": 0.1, "cpu_multi": 0.3, "ram": 0.08, "storage": 0.07},
+    "creator": {"gpu": 0.0, "compute": 0.35, "cpu_single": 0.05, "cpu_multi": 0.35, "ram": 0.15, "storage": 0.1},
+    "workstation": {"gpu": 0.0, "compute": 0.3, "cpu_single": 0.0, "cpu_multi": 0.45, "ram": 0.2, "storage": 0.05},
+}
+
+# RAM beyond this many GB adds nothing for the use case
+USE_CASE_RAM_CAP = {"esports": 16, "gaming": 32, "streaming": 32, "creator": 128, "workstation": 256}
+
+# Keywords that pick the use case, checked in order
+USE_CASE_KEYWORDS = (
+    ("workstation", ("cad", "solidworks", "autocad", "ansys", "scientific", "machine learning", " ai",
+                     "tensorflow", "simulation", "workstation")),
+    ("creator", ("video", "edit", "photo", "render", "blender", "premiere", "davinci", "content", "3d")),
+    ("streaming", ("stream", "twitch", "youtube")),
+    ("esports", ("esport", "fortnite", "valorant", "cs:go", "csgo", "counter-strike", "league", "casual")),
+    ("gaming", ("gam", "aaa", "play", "vr", "4k", "1440p")),
+)
+
+# Preference keywords -> tag
+PREFERENCE_KEYWORDS = (
+    ("amd", ("amd", "ryzen", "threadripper")),
+    ("intel", ("intel", "core i")),
+    ("rgb", ("rgb", "lighting", "flashy")),
+    ("quiet", ("quiet", "silent", "noise")),
+    ("storage", ("storage", "space", "drive")),
+    ("high_res", ("4k", "1440", "high refresh", "vr")),
+)
+
+# Tags a negation ("no AMD", "without RGB") turns into an exclusion; "no noise"
+# still means quiet, so the other tags ignore negation
+NEGATABLE_TAGS = ("amd", "intel", "rgb")
+# Excluding one CPU brand leaves the other
+RIVAL_BRAND = {"amd": "intel", "intel": "amd"}
+# An excluded brand is kept as "no_<brand>" so it still constrains the search
+# when the rival is excluded too
+EXCLUDED_BRAND_TAGS = {brand: f"no_{brand}" for brand in RIVAL_BRAND}
+
+# Component kinds in the order a recommendation lists them
+KIND_LABELS = (("cpu", "CPU"), ("gpu", "GPU"), ("ram", "RAM"), ("storage", "Storage"),
+               ("psu", "PSU"), ("cooling", "Cooling"), ("case", "Case"))
+
+# A negation up to two words before a keyword, within the same clause
+_NEGATED = re.compile(r"\b(?:no|not|non|without|avoid|except|never|don't|dont|hate)(?:[\s-]+[\w']+){0,2}[\s-]*$")
+_BUDGET = re.compile(r"\$?\s*(\d[\d,]*(?:\.\d+)?)\s*(k\b)?", re.I)
+
+
+class BuildOption:
+    """A base build plus a set of upgrades, with its total price"""
+
+    __slots__ = ("build", "upgrades", "price", "components", "extras")
+
+    def __init__(self, build: Build, upgrades: Tuple[Upgrade, ...]):
+        self.build = build
+        self.upgrades = upgrades
+        self.price = build.base_price + sum(upgrade.price for upgrade in upgrades)
+        components: Dict[str, List[Component]] = {kind: [c] for kind, c in build.components.items()}
+        extras = []
+        for upgrade in upgrades:
+            if upgrade.component is None:
+                extras.append(upgrade.description)
+            elif upgrade.replaces:
+                components[upgrade.kind] = [upgrade.component]
+            else:
+                components.setdefault(upgrade.kind, []).append(upgrade.component)
+        self.components = components
+        self.extras = tuple(extras)
+
+    def parts(self) -> List[Component]:
+        return [component for group in self.components.values() for component in group]
+
+    def __repr__(self) -> str:
+        return f"BuildOption({self.build.nickname!r}, +{len(self.upgrades)} upgrades, ${self.price})"
+
+
+def parse_budget(text: str) -> Optional[int]:
+    """Largest dollar amount mentioned ("$1,500-2k" -> 2000), or None"""
+    amounts = []
+    for number, thousands in _BUDGET.findall(text):
+        value = float(number.replace(",", ""))
+        amounts.append(int(value * 1000 if thousands else value))
+    amounts = [amount for amount in amounts if amount >= 100]
+    return max(amounts) if amounts else None
+
+
+def parse_use_case(text: str) -> str:
+    lowered = f" {text.lower()}"
+    for use_case, keywords in USE_CASE_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return use_case
+    return "gaming"
+
+
+def _keyword_mentions(lowered: str, keywords: Tuple[str, ...]) -> Tuple[bool, bool]:
+    """(mentioned plainly, mentioned negated) for any of keywords"""
+    plain = negated = False
+    for keyword in keywords:
+        start = lowered.find(keyword)
+        while start >= 0:
+            if _NEGATED.search(lowered, 0, start):
+                negated = True
+            else:
+                plain = True
+            start = lowered.find(keyword, start + 1)
+    return plain, negated
+
+
+def parse_preferences(text: str) -> FrozenSet[str]:
+    lowered = (text or "").lower()
+    tags = set()
+    excluded = set()
+    for tag, keywords in PREFERENCE_KEYWORDS:
+        plain, negated = _keyword_mentions(lowered, keywords)
+        if negated and tag in NEGATABLE_TAGS:
+            excluded.add(tag)
+        elif plain or negated:
+            tags.add(tag)
+    if {"amd", "intel"} <= tags:
+        # "AMD or Intel" is no preference at all
+        tags -= {"amd", "intel"}
+    for brand in excluded & RIVAL_BRAND.keys():
+        # "No AMD" is a preference for Intel, unless Intel is excluded too
+        rival = RIVAL_BRAND[brand]
+        if rival not in excluded:
+            tags.add(rival)
+        tags.add(EXCLUDED_BRAND_TAGS[brand])
+    return frozenset(tags - excluded)
+
+
+def _lookup(table: Dict[str, Tuple[int, int]], name: str, default: Tuple[int, int]) -> Tuple[int, int]:
+    return table.get(name.lower(), default)
+
+
+def score_option(option: BuildOption, use_case: str, preferences: FrozenSet[str]) -> float:
+    """Weighted performance score of an option for a use case (higher is better)"""
+    weights = dict(USE_CASE_WEIGHTS[use_case])
+    if "high_res" in preferences and weights["gpu"]:
+        weights["gpu"] += 0.15
+    if "storage" in preferences:
+        weights["storage"] += 0.1
+
+    cpu = option.components["cpu"][0]
+    cpu_single, cpu_multi = _lookup(CPU_PERFORMANCE, cpu.name, (100, (cpu.cores or 6) * 100 // 6))
+    gpu_gaming = gpu_compute = 0
+    for gpu in option.components.get("gpu", []):
+        gaming, compute = _lookup(GPU_PERFORMANCE, gpu.name, (100, 100))
+        # Games don't scale across cards; rendering and compute do
+        gpu_gaming = max(gpu_gaming, gaming)
+        gpu_compute += compute * gpu.count
+    ram_gb = min(sum(m.capacity_gb or 0 for m in option.components.get("ram", [])), USE_CASE_RAM_CAP[use_case])
+    storage_tb = sum(s.capacity_gb for s in option.components.get("storage", [])) / 1000
+
+    score = (
+        weights["gpu"] * gpu_gaming
+        + weights["compute"] * gpu_compute
+        + weights["cpu_single"] * cpu_single
+        + weights["cpu_multi"] * cpu_multi
+        + weights["ram"] * ram_gb / 16 * 100
+        + weights["storage"] * min(storage_tb, 8) * 50
+    )
+
+    # Soft preferences nudge ties rather than outweigh performance
+    descriptions = " ".join(
+        [c.name for c in option.parts()] + list(option.extras) + [u.description for u in option.upgrades]
+    ).lower()
+    if "rgb" in preferences and "rgb" in descriptions:
+        score *= 1.05
+    if "quiet" in preferences and ("liquid" in descriptions or "aio" in descriptions
+                                   or "dampened" in descriptions or "loop" in descriptions):
+        score *= 1.05
+    if use_case == "workstation":
+        memory = option.components.get("ram", [])
+        if any(getattr(m, "ecc", False) for m in memory):
+            score *= 1.1
+    return score
+
+
+class BuildOptimizer:
+    """Recommend the best-scoring catalog build within a budget"""
+
+    def __init__(self, catalog: Optional[Catalog] = None, checker: Optional[CompatibilityChecker] = None):
+        self.catalog = catalog or get_catalog()
+        self.checker = checker or CompatibilityChecker()
+        self.options = self._expand_options()
+        self.frontier = lru_cache(maxsize=256)(self._frontier)
+        self._recommend = lru_cache(maxsize=4096)(self._recommend_bucket)
+        # Precompute the preference-free frontiers; others are built on first use
+        for use_case in USE_CASE_WEIGHTS:
+            self.frontier(use_case, frozenset())
+
+    def _expand_options(self) -> List[BuildOption]:
+        """All compatible upgrade combinations of every build, cheapest first"""
+        options = []
+        for build in self.catalog.builds:
+            for size in range(len(build.upgrades) + 1):
+                for upgrades in combinations(build.upgrades, size):
+                    replaced = [u.kind for u in upgrades if u.replaces and u.component is not None]
+                    if len(replaced) != len(set(replaced)):
+                        continue
+                    option = BuildOption(build, upgrades)
+                    if self.checker.check(option.parts()).compatible:
+                        options.append(option)
+        options.sort(key=lambda option: option.price)
+        return options
+
+    def _frontier(self, use_case: str, preferences: FrozenSet[str]) -> Tuple[Tuple[int, ...], Tuple[BuildOption, ...]]:
+        """
+        Pareto frontier for a use case: (prices, options) with strictly rising scores
+
+        Options are already sorted by price, so one pass keeps each option
+        that beats everything cheaper than it.
+        """
+        prices = []
+        frontier = []
+        best = float("-inf")
+        for option in self.options:
+            cpu_name = option.components["cpu"][0].name.lower()
+            brand = "intel" if cpu_name.startswith(("i3", "i5", "i7", "i9", "core")) else "amd"
+            if RIVAL_BRAND[brand] in preferences or EXCLUDED_BRAND_TAGS[brand] in preferences:
+                continue
+            score = score_option(option, use_case, preferences)
+            if score <= best:
+                continue
+            if prices and prices[-1] == option.price:
+                frontier[-1] = option
+            else:
+                prices.append(option.price)
+                frontier.append(option)
+            best = score
+        return tuple(prices), tuple(frontier)
+
+    def recommend(self, budget: int, use_case: str, preferences: FrozenSet[str] = frozenset()) -> Optional[BuildOption]:
+        """Best option costing at most budget, or None if nothing fits"""
+        prices, frontier = self.frontier(use_case, preferences)
+        bucket = bisect_right(prices, budget) - 1
+        return frontier[bucket] if bucket >= 0 else None
+
+    def recommend_for(self, budget: str, use_case: str, preferences: str) -> Optional[BuildOption]:
+        """recommend() from the tool's free-text arguments"""
+        amount = parse_budget(budget)
+        if amount is None:
+            return None
+        return self.recommend(amount, parse_use_case(f"{use_case} {preferences}"), parse_preferences(preferences))
+
+    def recommend_text(self, budget: str, use_case: str, preferences: str) -> str:
+        """Parse the tool's free-text arguments and return a spoken-ready recommendation"""
+        amount = parse_budget(budget)
+        if amount is None:
+            return ""
+        canonical_use_case = parse_use_case(f"{use_case} {preferences}")
+        tags = parse_preferences(preferences)
+        prices, _ = self.frontier(canonical_use_case, tags)
+        return self._recommend(bisect_right(prices, amount) - 1, canonical_use_case, tags)
+
+    def _recommend_bucket(self, bucket: int, use_case: str, preferences: FrozenSet[str]) -> str:
+        prices, frontier = self.frontier(use_case, preferences)
+        if bucket < 0:
+            if not frontier:
+                return "No catalog build matches these constraints: every build we offer has an AMD or Intel CPU."
+            cheapest = frontier[0]
+            return (
+                f"Our most affordable {use_case} option is the {cheapest.build.name} "
+                f"\"{cheapest.build.nickname}\" at ${cheapest.price:,}, which is above this budget."
+            )
+        return describe_option(frontier[bucket], use_case)
+
+
+def describe_option(option: BuildOption, use_case: str) -> str:
+    build = option.build
+    lines = [f"Best {use_case} build for this budget: {build.name} \"{build.nickname}\" - ${option.price:,} total."]
+    if option.upgrades:
+        upgrades = ", ".join(f"{u.description} (+${u.price:,})" for u in option.upgrades)
+        lines.append(f"Base ${build.base_price:,} with: {upgrades}.")
+    else:
+        lines.append("Base configuration, no upgrades.")
+    for kind, label in KIND_LABELS:
+        parts = option.components.get(kind)
+        if parts:
+            names = " + ".join(f"2x {p.name}" if getattr(p, "count", 1) > 1 else p.name for p in parts)
+            lines.append(f"- {label}: {names}")
+    if build.perfect_for:
+        lines.append(f"Perfect for: {build.perfect_for}.")
+    return "\n".join(lines)
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Call context store for transfers between the PC Builder agents
+
+The triage agent's transfer_to_specialist tool collects the customer's name
+and a summary. SignalWire keeps them in the triage AI session's global data,
+which does not follow the call into the specialist's new AI session - so the
+tool also records them here, keyed by call ID, and the specialist's SWML
+fetch (`/sales?transfer=true`, `/support?transfer=true`) puts them back as
+`call_data` global data, where `${call_data.user_name}` and
+`${call_data.summary}` resolve again.
+
+Two backends, chosen by the .env settings setup.py writes:
+
+- In memory (default): an LRU dict with per-entry expiry. Only works when
+  triage and the specialist are served by the same process.
+- SQLite (USE_DATABASE_CONTEXT=true): a WAL-mode database at CONTEXT_DB_PATH,
+  shared by every worker process. Writes are buffered and committed in
+  batches by a background thread; reads see buffered writes immediately.
+
+Either way entries expire CONTEXT_TTL_HOURS after they were written (default
+24) and the number held is bounded.
+"""
+
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from signalwire_agents.core.function_result import SwaigFunctionResult
+from signalwire_agents.core.logging_config import get_logger
+from signalwire_agents.core.swaig_function import SWAIGFunction
+from signalwire_agents.skills.swml_transfer.skill import SWMLTransferSkill
+
+from process_local import ProcessLocal
+from ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+DEFAULT_CONTEXT_DB_PATH = "pc_builder_context.db"
+DEFAULT_CONTEXT_TTL_HOURS = 24.0
+DEFAULT_MAX_CALLS = 10000
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+
+class MemoryContextStore:
+    """Per-process context store: LRU-bounded, entries expire after ttl seconds"""
+
+    def __init__(self, ttl: float = DEFAULT_CONTEXT_TTL_HOURS * 3600, max_calls: int = DEFAULT_MAX_CALLS):
+        self.ttl = ttl
+        self._entries = TTLCache(max_entries=max_calls, ttl=ttl)
+
+    def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        return self._entries.get(call_id)
+
+    def put(self, call_id: str, context: Dict[str, Any]) -> None:
+        self._entries.put(call_id, dict(context))
+
+    def delete(self, call_id: str) -> None:
+        self._entries.pop(call_id)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self._entries.stats()}
+
+
+class SQLiteContextStore:
+    """
+    Context store in a WAL-mode SQLite database shared across processes
+
+    put() only buffers; a background thread commits the buffer in one
+    transaction every flush_interval seconds or as soon as batch_size writes
+    are waiting. Writers that get more than max_pending ahead of the database
+    flush inline instead. Expired rows are purged every purge_interval seconds
+    using the index on expires_at; lookups go through the call_id primary key.
+    """
+
+    def __init__(self, path: str = DEFAULT_CONTEXT_DB_PATH,
+                 ttl: float = DEFAULT_CONTEXT_TTL_HOURS * 3600,
+                 batch_size: int = 256, flush_interval: float = 0.05,
+                 max_pending: int = 4096, purge_interval: float = 60.0):
+        self.path = path
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.purge_interval = purge_interval
+
+        # One connection, serialized by a lock: statements are all single-row
+        # lookups or one batched transaction, so contention stays short
+        self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS call_context ("
+            " call_id TEXT PRIMARY KEY,"
+            " context TEXT NOT NULL,"
+            " expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS call_context_expires ON call_context (expires_at)")
+        self._db_lock = threading.Lock()
+
+        self._pending: Dict[str, Tuple[Optional[str], float]] = {}
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._last_purge = 0.0
+        self.batches = 0
+        self.rows_written = 0
+        self.rows_purged = 0
+
+        self._thread = threading.Thread(target=self._run, name="call-context-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._pending_lock:
+            pending = self._pending.get(call_id)
+        if pending is not None:
+            context, expires_at = pending
+            return json.loads(context) if context is not None and expires_at > now else None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT context FROM call_context WHERE call_id = ? AND expires_at > ?", (call_id, now)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, call_id: str, context: Dict[str, Any]) -> None:
+        self._queue(call_id, json.dumps(context, separators=(",", ":")), time.time() + self.ttl)
+
+    def delete(self, call_id: str) -> None:
+        self._queue(call_id, None, 0.0)
+
+    def _queue(self, call_id: str, context: Optional[str], expires_at: float) -> None:
+        with self._pending_lock:
+            self._pending[call_id] = (context, expires_at)
+            backlog = len(self._pending)
+        if backlog >= self.max_pending:
+            # Writer thread has fallen behind; push back on the caller
+            self.flush()
+        elif backlog >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Commit every buffered write now"""
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        upserts = [(call_id, context, expires_at)
+                   for call_id, (context, expires_at) in batch.items() if context is not None]
+        deletes = [(call_id,) for call_id, (context, _) in batch.items() if context is None]
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO call_context (call_id, context, expires_at) VALUES (?, ?, ?)",
+                    upserts
+                )
+                self._db.executemany("DELETE FROM call_context WHERE call_id = ?", deletes)
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+        self.batches += 1
+        self.rows_written += len(batch)
+
+    def purge_expired(self) -> int:
+        """Delete expired rows; returns how many were removed"""
+        with self._db_lock:
+            removed = self._db.execute("DELETE FROM call_context WHERE expires_at <= ?", (time.time(),)).rowcount
+        self.rows_purged += removed
+        self._last_purge = time.monotonic()
+        return removed
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if time.monotonic() - self._last_purge >= self.purge_interval:
+                    self.purge_expired()
+            except sqlite3.Error as e:
+                logger.error("call_context_write_failed", path=self.path, error=str(e))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5.0)
+        try:
+            self.flush()
+        finally:
+            with self._db_lock:
+                self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._pending_lock:
+            pending = len(self._pending)
+        with self._db_lock:
+            rows = self._db.execute("SELECT COUNT(*) FROM call_context").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "rows": rows,
+            "pending": pending,
+            "batches": self.batches,
+            "rows_written": self.rows_written,
+            "rows_purged": self.rows_purged,
+        }
+
+
+def create_context_store():
+    """Build the context store the environment asks for"""
+    ttl = float(os.getenv("CONTEXT_TTL_HOURS", str(DEFAULT_CONTEXT_TTL_HOURS))) * 3600
+    if _env_flag("USE_DATABASE_CONTEXT"):
+        path = os.getenv("CONTEXT_DB_PATH", DEFAULT_CONTEXT_DB_PATH)
+        logger.info("call_context_store", backend="sqlite", path=path, ttl_hours=ttl / 3600)
+        return SQLiteContextStore(path, ttl=ttl)
+    return MemoryContextStore(ttl=ttl)
+
+
+# A forked worker can't use the parent's SQLite connection or writer thread
+_context_store = ProcessLocal(create_context_store)
+
+
+def get_context_store():
+    """Process-wide context store, created on first use"""
+    return _context_store.get()
+
+
+def close_context_store() -> None:
+    """Flush and close the context store if this process opened one"""
+    store = _context_store.pop()
+    if store is not None:
+        store.close()
+
+
+def request_call_id(request_data: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Call ID from a SWML fetch or SWAIG request body, as the SDK extracts it"""
+    if not request_data:
+        return None
+    return request_data.get("call_id") or (request_data.get("call") or {}).get("call_id")
+
+
+_transfer_listeners: List[Callable[[str, str, Dict[str, Any]], None]] = []
+
+
+def add_transfer_listener(callback: Callable[[str, str, Dict[str, Any]], None]) -> None:
+    """Call callback(call_id, url, call_data) whenever transfer_to_specialist sends a call to a URL"""
+    _transfer_listeners.append(callback)
+
+
+def _notify_transfer(call_id: str, url: str, call_data: Dict[str, Any]) -> None:
+    for callback in _transfer_listeners:
+        try:
+            callback(call_id, url, call_data)
+        except Exception as e:
+            logger.error("transfer_listener_failed", call_id=call_id, error=str(e))
+
+
+def _compile_pattern(pattern: str) -> "re.Pattern":
+    """Turn a swml_transfer pattern like '/sales/i' into a regex"""
+    match = re.fullmatch(r"/(.*)/([a-z]*)", pattern, re.S)
+    if not match:
+        return re.compile(pattern)
+    flags = re.IGNORECASE if "i" in match.group(2) else 0
+    return re.compile(match.group(1), flags)
+
+
+class ContextTransferSkill(SWMLTransferSkill):
+    """
+    swml_transfer whose transfer tool runs here instead of as a DataMap
+
+    Same parameters, prompt sections and results as the stock skill, but the
+    tool is a webhook so the required fields reach this process and can be
+    saved to the call context store before the transfer.
+    """
+
+    def setup(self) -> bool:
+        if not super().setup():
+            return False
+        self.patterns: List[Tuple["re.Pattern", Dict[str, Any]]] = [
+            (_compile_pattern(pattern), config) for pattern, config in self.transfers.items()
+        ]
+        return True
+
+    def register_tools(self) -> None:
+        parameters = {
+            self.parameter_name: {"type": "string", "description": self.parameter_description},
+        }
+        for field_name, field_description in self.required_fields.items():
+            parameters[field_name] = {"type": "string", "description": field_description}
+        self.define_tool(
+            name=self.tool_name,
+            description=self.description,
+            parameters=parameters,
+            handler=self._handle_transfer,
+            required=list(parameters),
+        )
+
+    def _handle_transfer(self, args: Dict[str, Any], raw_data: Dict[str, Any]) -> SwaigFunctionResult:
+        destination = str(args.get(self.parameter_name, ""))
+        call_data = {field_name: args.get(field_name, "") for field_name in self.required_fields}
+
+        for pattern, config in self.patterns:
+            if not pattern.search(destination):
+                continue
+            call_id = request_call_id(raw_data)
+            if call_id and call_data:
+                get_context_store().put(call_id, {**call_data, "transferred_to": destination})
+            result = SwaigFunctionResult(config["message"], post_process=config["post_process"])
+            if call_data:
+                result.update_global_data({"call_data": call_data})
+            if "url" in config:
+                if call_id:
+                    _notify_transfer(call_id, config["url"], call_data)
+                return result.swml_transfer(config["url"], config["return_message"], config.get("final", True))
+            return result.connect(config["address"], config.get("final", True), config.get("from_addr"))
+
+        result = SwaigFunctionResult(self.default_message, post_process=self.default_post_process)
+        if call_data:
+            result.update_global_data({"call_data": call_data})
+        return result
+
+
+def add_context_transfer_skill(agent, params: Dict[str, Any]) -> None:
+    """
+    Load ContextTransferSkill on an agent (the add_skill("swml_transfer") equivalent)
+
+    Raises:
+        ValueError: If the skill fails to load
+    """
+    success, error_message = agent.skill_manager.load_skill(
+        ContextTransferSkill.SKILL_NAME, ContextTransferSkill, params
+    )
+    if not success:
+        raise ValueError(f"Failed to load skill '{ContextTransferSkill.SKILL_NAME}': {error_message}")
+
+
+class _SkillRecorder:
+    """Stand-in agent that records what a skill registers instead of applying it"""
+
+    def __init__(self):
+        self.functions: List[SWAIGFunction] = []
+
+    def define_tool(self, **kwargs) -> None:
+        self.functions.append(SWAIGFunction(**kwargs))
+
+
+class PreparedTransferSkill:
+    """
+    A ContextTransferSkill built once, ready to attach to ephemeral agents
+
+    Building the skill (pattern compiles, tool schema, SWAIGFunction, hints and
+    prompt sections) depends only on its params, so for a given set of
+    transfer URLs it is done once and each request just attaches the result.
+    The attached handler is shared; it only reads the skill's configuration.
+    """
+
+    def __init__(self, params: Dict[str, Any]):
+        recorder = _SkillRecorder()
+        skill = ContextTransferSkill(recorder, dict(params))
+        if not skill.setup():
+            raise ValueError(f"Failed to setup skill '{ContextTransferSkill.SKILL_NAME}'")
+        skill.register_tools()
+        skill.agent = None  # the recorder isn't an agent; nothing reads it after registration
+
+        self.skill = skill
+        self.instance_key = skill.get_instance_key()
+        self.functions = recorder.functions
+        self.hints = skill.get_hints()
+        self.global_data = skill.get_global_data()
+        self.prompt_sections = skill.get_prompt_sections()
+
+    def attach(self, agent) -> None:
+        """Add the prebuilt tool, hints and prompt sections to an (ephemeral) agent"""
+        functions = agent._tool_registry._swaig_functions
+        for function in self.functions:
+            if function.name in functions:
+                raise ValueError(f"Tool with name '{function.name}' already exists")
+            functions[function.name] = function
+        if self.hints:
+            agent.add_hints(self.hints)
+        if self.global_data:
+            agent.update_global_data(self.global_data)
+        for section in self.prompt_sections:
+            agent.prompt_add_section(**section)
+        agent.skill_manager.loaded_skills[self.instance_key] = self.skill
+
+
+class TransferContextMixin:
+    """
+    Restore saved call context on a specialist agent's transferred SWML fetch
+
+    Must come before AgentBase (and CachedSWMLMixin) in the bases. Adds the
+    saved fields as call_data global data so ${call_data.*} in the prompt
+    resolve in the new AI session.
+    """
+
+    def on_swml_request(self, request_data=None, callback_path=None, request=None):
+        modifications = super().on_swml_request(request_data, callback_path, request)
+        if request is None or request.query_params.get("transfer") != "true":
+            return modifications
+        call_id = request_call_id(request_data)
+        context = get_context_store().get(call_id) if call_id else None
+        if not context:
+            return modifications
+        modifications = dict(modifications or {})
+        modifications["global_data"] = {"call_data": context}
+        return modifications
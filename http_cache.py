@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Pre-serialized responses with HTTP validators
+
+Metadata endpoints (/info, /health, /ready) are polled constantly by load
+balancers and health checks while their content almost never changes. Their
+JSON is serialized once into a PreserializedJSON, served as raw bytes with an
+ETag and Cache-Control, and a request whose If-None-Match carries the current
+ETag gets an empty 304.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+INFO_CACHE_CONTROL = "public, max-age=60"
+# Health and readiness must be re-checked on every poll; a 304 keeps that cheap
+STATUS_CACHE_CONTROL = "no-cache"
+
+
+def etag_for(body: bytes, weak: bool = False) -> str:
+    """Quoted entity tag for body (W/-prefixed when weak)"""
+    tag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+    return f"W/{tag}" if weak else tag
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """
+    Whether the request's If-None-Match matches etag
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match: W/ prefixes
+    are ignored on both sides, and "*" matches any current representation.
+    """
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+
+class PreserializedJSON:
+    """A JSON payload serialized once, then served as bytes with its ETag"""
+
+    __slots__ = ("body", "etag", "status_code", "cache_control")
+
+    def __init__(self, payload: Any, status_code: int = 200, cache_control: str = STATUS_CACHE_CONTROL):
+        self.body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.etag = etag_for(self.body)
+        self.status_code = status_code
+        self.cache_control = cache_control
+
+    def response(self, request: Request) -> Response:
+        """200 (or the payload's status) with the body, or 304 if the client's copy is current"""
+        if self.status_code == 200 and etag_matches(request, self.etag):
+            return not_modified(self.etag, self.cache_control)
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            media_type="application/json",
+            headers={"ETag": self.etag, "Cache-Control": self.cache_control},
+        )
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Shared async HTTP client for the tools' outbound back-end calls
+
+Tool handlers are `async def` and run on the tool loop (async_tools.py), so a
+blocking `requests` call inside one holds up every other tool on that loop
+for the whole round trip. AsyncHTTPClient wraps httpx.AsyncClient, which
+does the HTTP itself (keep-alive pooling, TLS, proxies from the environment,
+redirects), and adds this service's policy on top:
+
+- at most HTTP_MAX_CONNECTIONS connections (default 100), and at most
+  HTTP_MAX_PER_HOST requests in flight to one host (default 10); callers
+  over a limit wait for a slot, within their timeout. Idle connections are
+  dropped after HTTP_IDLE_TIMEOUT seconds (default 4, under uvicorn's and
+  most proxies' 5 second keep-alive)
+- a connect timeout (HTTP_CONNECT_TIMEOUT, default 2) and a per-attempt
+  deadline covering the wait for a slot and the whole exchange
+  (HTTP_TIMEOUT, default 5)
+- up to HTTP_RETRIES retries (default 2) with full-jitter exponential
+  backoff, honouring Retry-After. Timeouts, dropped connections and 429,
+  502, 503 and 504 answers are retried for idempotent methods, or for
+  requests that carry an idempotency key. A connection that could not be
+  opened is retried for any method, since nothing was sent. Anything else
+  (a malformed response, an invalid header) is not retried.
+- each call is timed as the "outbound_http" metrics stage, labelled by host
+
+    from http_client import get_http_client
+
+    response = await get_http_client().get("http://inventory.internal/prices", params={"parts": "RTX 4070"})
+    prices = response.raise_for_status().json()
+
+Failures raise httpx's exceptions (httpx.HTTPError and subclasses). An
+httpx.AsyncClient belongs to the event loop it was first used on, so one is
+kept per loop; the AsyncHTTPClient itself is per process, like the tool loop.
+"""
+
+import asyncio
+import os
+import random
+import ssl
+import weakref
+from typing import Any, Dict, Mapping, Optional
+
+import httpx
+from signalwire_agents.core.logging_config import get_logger
+
+from metrics import metrics
+from process_local import ProcessLocal
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_PER_HOST = 10
+DEFAULT_CONNECT_TIMEOUT = 2.0
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_RETRIES = 2
+DEFAULT_IDLE_TIMEOUT = 4.0
+BACKOFF_BASE = 0.1
+BACKOFF_MAX = 2.0
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+USER_AGENT = "pc-builder-pro/1.0"
+
+# Nothing was sent: safe to retry for any method
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+# Failed mid-exchange: safe to retry only when the request is idempotent
+_RETRYABLE_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+
+class _LoopState:
+    """One event loop's httpx client and per-host slots"""
+
+    def __init__(self, client: httpx.AsyncClient, max_per_host: int):
+        self.client = client
+        self.max_per_host = max_per_host
+        self.hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def host(self, host: str) -> asyncio.Semaphore:
+        semaphore = self.hosts.get(host)
+        if semaphore is None:
+            semaphore = self.hosts[host] = asyncio.Semaphore(self.max_per_host)
+        return semaphore
+
+
+class AsyncHTTPClient:
+    """httpx with per-host limits, a per-attempt deadline and jittered retries"""
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS, max_per_host: int = DEFAULT_MAX_PER_HOST,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 backoff_base: float = BACKOFF_BASE, backoff_max: float = BACKOFF_MAX,
+                 headers: Optional[Mapping[str, str]] = None):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self.retries = retries
+        self.idle_timeout = idle_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.headers = {"User-Agent": USER_AGENT, "Accept": "application/json", **(headers or {})}
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+
+    def _loop_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            if self._ssl_context is None:
+                # Loading the CA bundle takes tens of milliseconds; do it once, not per loop
+                self._ssl_context = httpx.create_ssl_context()
+            client = httpx.AsyncClient(
+                verify=self._ssl_context,
+                headers=self.headers,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections,
+                                    keepalive_expiry=self.idle_timeout),
+                follow_redirects=True,
+            )
+            state = self._loops[loop] = _LoopState(client, self.max_per_host)
+        return state
+
+    async def open(self) -> None:
+        """Create the running loop's httpx client ahead of its first request"""
+        self._loop_state()
+
+    async def request(self, method: str, url: str, *, params: Optional[Mapping[str, Any]] = None,
+                      json: Any = None, data: Optional[bytes] = None,
+                      headers: Optional[Mapping[str, str]] = None, timeout: Optional[float] = None,
+                      retries: Optional[int] = None, idempotency_key: Optional[str] = None) -> httpx.Response:
+        """
+        Send a request and read the whole response
+
+        Args:
+            params: Query parameters appended to url
+            json: Body to send as JSON (or data for raw bytes)
+            timeout: Seconds per attempt, including the wait for a slot
+            retries: Retries after the first attempt (default the client's)
+            idempotency_key: Sent as the Idempotency-Key header; makes any
+                method safe to retry after a partial exchange
+
+        Returns:
+            The response, whatever its status; see raise_for_status()
+
+        Raises:
+            httpx.HTTPError: When the last attempt failed, or on an error
+                that isn't worth retrying
+        """
+        method = method.upper()
+        request_headers = dict(headers or {})
+        if idempotency_key is not None:
+            request_headers["Idempotency-Key"] = idempotency_key
+        idempotent = idempotency_key is not None or method in IDEMPOTENT_METHODS
+        retries = self.retries if retries is None else retries
+        timeout = self.timeout if timeout is None else timeout
+        state = self._loop_state()
+        host = httpx.URL(url).host
+
+        self.requests += 1
+        attempt = 0
+        with metrics.timer("outbound_http", host):
+            while True:
+                attempt += 1
+                try:
+                    response = await asyncio.wait_for(
+                        self._send(state, host, method, url, params, json, data, request_headers), timeout
+                    )
+                except asyncio.TimeoutError:
+                    error: httpx.HTTPError = httpx.TimeoutException(f"{method} {url} took over {timeout}s")
+                except _RETRYABLE_ERRORS as e:
+                    error = e
+                except httpx.HTTPError:
+                    self.failed += 1
+                    raise
+                else:
+                    if response.status_code not in RETRY_STATUSES or not idempotent or attempt > retries:
+                        return response
+                    delay = self._retry_after(response.headers) or self._backoff(attempt)
+                    logger.warning("http_retry", method=method, url=url, attempt=attempt,
+                                   status=response.status_code, delay_ms=round(delay * 1000))
+                    self.retried += 1
+                    await asyncio.sleep(delay)
+                    continue
+
+                if attempt > retries or not (idempotent or isinstance(error, _CONNECT_ERRORS)):
+                    self.failed += 1
+                    raise error
+                delay = self._backoff(attempt)
+                logger.warning("http_retry", method=method, url=url, attempt=attempt, error=repr(error),
+                               delay_ms=round(delay * 1000))
+                self.retried += 1
+                await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @staticmethod
+    async def _send(state: _LoopState, host: str, method: str, url: str, params, json, data,
+                    headers: Dict[str, str]) -> httpx.Response:
+        async with state.host(host):
+            return await state.client.request(method, url, params=params, json=json, content=data, headers=headers)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform over [0, min(max, base * 2^(attempt - 1))]"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _retry_after(self, headers: httpx.Headers) -> Optional[float]:
+        try:
+            return min(self.backoff_max, max(0.0, float(headers["retry-after"])))
+        except (KeyError, ValueError):
+            return None  # absent, or an HTTP date: back off as usual
+
+    async def aclose(self) -> None:
+        """Close the running loop's httpx client and its connections"""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+_client = ProcessLocal(lambda: AsyncHTTPClient(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", str(DEFAULT_MAX_CONNECTIONS))),
+    max_per_host=int(os.getenv("HTTP_MAX_PER_HOST", str(DEFAULT_MAX_PER_HOST))),
+    connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", str(DEFAULT_CONNECT_TIMEOUT))),
+    timeout=float(os.getenv("HTTP_TIMEOUT", str(DEFAULT_TIMEOUT))),
+    retries=int(os.getenv("HTTP_RETRIES", str(DEFAULT_RETRIES))),
+    idle_timeout=float(os.getenv("HTTP_IDLE_TIMEOUT", str(DEFAULT_IDLE_TIMEOUT))),
+))
+
+
+def get_http_client() -> AsyncHTTPClient:
+    """Process-wide client, created on first use with limits and timeouts from HTTP_* variables"""
+    return _client.get()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Ticketing and inventory back ends the tools call, over the shared async HTTP client
+
+Both are optional and off unless their base URL is set:
+
+- TICKETING_API_URL: create_support_ticket still opens the ticket in the
+  local ticket store (support_tickets.py) and answers with its ID, then
+  POSTs it to {TICKETING_API_URL}/tickets in the background. The ticket ID
+  is sent as the Idempotency-Key, so the POST is retried like a GET and a
+  retry can't open a duplicate.
+- INVENTORY_API_URL: create_build_recommendation adds live prices and
+  stock for the recommended parts from
+  GET {INVENTORY_API_URL}/prices?parts=<name>&parts=<name>...
+
+TICKETING_API_TOKEN and INVENTORY_API_TOKEN, when set, are sent as bearer
+tokens. A back end that fails or times out (TOOL_BACKEND_TIMEOUT, default 3
+seconds per attempt) only costs the live prices in the recommendation, or
+a logged warning for a ticket; the tools still answer from local data.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+from signalwire_agents.core.logging_config import get_logger
+
+from http_client import AsyncHTTPClient, get_http_client
+
+logger = get_logger(__name__)
+
+DEFAULT_BACKEND_TIMEOUT = 3.0
+
+# Submissions in flight; the loop only keeps weak references to its tasks
+_submissions: Set[asyncio.Task] = set()
+
+
+def _backend_timeout() -> float:
+    return float(os.getenv("TOOL_BACKEND_TIMEOUT", str(DEFAULT_BACKEND_TIMEOUT)))
+
+
+class _Backend:
+    def __init__(self, base_url: str, token: Optional[str] = None, client: Optional[AsyncHTTPClient] = None):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self._client = client
+
+    @property
+    def client(self) -> AsyncHTTPClient:
+        return self._client or get_http_client()
+
+
+class TicketingBackend(_Backend):
+    """The external ticketing system"""
+
+    async def submit(self, ticket) -> Optional[str]:
+        """
+        File a ticket from the local store with the ticketing system
+
+        Returns:
+            The ticketing system's reference for it, or None if it couldn't be filed
+        """
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/tickets",
+                json=ticket.to_dict(),
+                headers=self.headers,
+                idempotency_key=ticket.ticket_id,
+                timeout=_backend_timeout(),
+            )
+            document = response.raise_for_status().json()
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning("ticketing_submit_failed", ticket_id=ticket.ticket_id, error=str(e))
+            return None
+        reference = document.get("reference") or document.get("id")
+        logger.info("ticketing_submitted", ticket_id=ticket.ticket_id, reference=reference)
+        return reference
+
+    def submit_in_background(self, ticket) -> asyncio.Task:
+        """
+        Start submit() on the running loop without waiting for it
+
+        The caller already has the local ticket ID to give out, so the
+        ticketing system's retries and timeouts don't hold up the answer. A
+        failed submission is logged; the ticket stays in the local store.
+        """
+        task = asyncio.get_running_loop().create_task(self.submit(ticket))
+        _submissions.add(task)
+        task.add_done_callback(_submissions.discard)
+        return task
+
+
+class InventoryBackend(_Backend):
+    """The inventory and pricing service"""
+
+    async def prices(self, part_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Live price and stock per part name
+
+        Returns:
+            {name: {"price": ..., "in_stock": ...}} for the parts the service
+            knows; empty if it couldn't be reached
+        """
+        if not part_names:
+            return {}
+        try:
+            response = await self.client.get(
+                f"{self.base_url}/prices",
+                params={"parts": part_names},
+                headers=self.headers,
+                timeout=_backend_timeout(),
+            )
+            return response.raise_for_status().json().get("prices", {})
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning("inventory_lookup_failed", parts=len(part_names), error=str(e))
+            return {}
+
+
+def format_live_prices(prices: Dict[str, Dict[str, Any]]) -> str:
+    """One spoken-ready line per part: live price and whether it's in stock"""
+    lines = []
+    for name, entry in prices.items():
+        price = entry.get("price")
+        stock = "in stock" if entry.get("in_stock") else "currently out of stock"
+        lines.append(f"- {name}: ${price:,.0f}, {stock}" if isinstance(price, (int, float)) else f"- {name}: {stock}")
+    return "\n".join(lines)
+
+
+def get_ticketing() -> Optional[TicketingBackend]:
+    """The ticketing back end from TICKETING_API_URL, or None when it isn't configured"""
+    url = os.getenv("TICKETING_API_URL")
+    return TicketingBackend(url, os.getenv("TICKETING_API_TOKEN")) if url else None
+
+
+def get_inventory() -> Optional[InventoryBackend]:
+    """The inventory back end from INVENTORY_API_URL, or None when it isn't configured"""
+    url = os.getenv("INVENTORY_API_URL")
+    return InventoryBackend(url, os.getenv("INVENTORY_API_TOKEN")) if url else None
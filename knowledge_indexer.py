@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Section-level incremental indexer for the PC Builder knowledge bases
+
+Splits each knowledge base markdown file into one chunk per ##/###/####
+section and hashes it. Chunks whose hash is already in the current
+knowledge store keep their embedding; only new or edited sections are
+embedded. The result is written as a fresh store and swapped in atomically,
+and running agents pick it up through KnowledgeStoreWatcher.
+
+Changed sections are embedded in fixed-size batches across a process pool
+and streamed to the store writer in source order. Batch boundaries depend
+only on the batch size and each worker runs single-threaded, so the output
+is identical whatever the worker count.
+
+Usage:
+    python knowledge_indexer.py [--force] [--model MODEL] [--store-dir DIR]
+                                [--workers N] [--batch-size N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from signalwire_agents.core.logging_config import get_logger
+
+from knowledge_store import (
+    DEFAULT_STORE_DIR, KnowledgeStore, read_manifest, write_knowledge_store, source_info
+)
+
+logger = get_logger(__name__)
+
+# Partition -> knowledge base markdown it is indexed from
+KNOWLEDGE_SOURCES = {
+    "sales": "sales_knowledge_base.md",
+    "support": "support_knowledge_base.md",
+}
+
+DEFAULT_EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+DEFAULT_EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "0")) or os.cpu_count() or 1
+DEFAULT_EMBEDDING_BATCH_SIZE = 64
+
+# Headings that start a chunk; "#" is the document title and stays in the path only
+_HEADING = re.compile(r"^(#{1,4})\s+(.+?)\s*$")
+
+Embedder = Callable[[Sequence[str]], Any]
+
+
+def chunk_markdown(text: str, filename: str) -> List[Dict[str, Any]]:
+    """
+    Split markdown into one chunk per ##/###/#### section
+
+    Each chunk's content is its heading path followed by its body, so a
+    section keeps its context ("Gaming Systems > Entry Gaming Build ...").
+    Sections with no body (a heading directly followed by a subheading)
+    produce no chunk of their own.
+    """
+    chunks = []
+    path: List[str] = []
+    body: List[str] = []
+    start_line = 1
+
+    def flush(end_line: int):
+        content = "\n".join(body).strip()
+        if content and len(path) > 1:
+            section = " > ".join(part for part in path[1:] if part)
+            chunks.append({
+                "filename": filename,
+                "section": section,
+                "content": f"{section}\n\n{content}",
+                "start_line": start_line,
+                "end_line": end_line,
+            })
+
+    for number, line in enumerate(text.splitlines(), 1):
+        heading = _HEADING.match(line)
+        if heading:
+            flush(number - 1)
+            level = len(heading.group(1))
+            path = path[:level - 1] + [""] * max(0, level - 1 - len(path)) + [heading.group(2)]
+            body = []
+            start_line = number
+        else:
+            body.append(line)
+    flush(len(text.splitlines()))
+    return chunks
+
+
+def chunk_hash(chunk: Dict[str, Any], model: str) -> str:
+    """Content hash of a chunk; includes the model so a model change re-embeds everything"""
+    digest = hashlib.sha256()
+    for part in (model, chunk["section"], chunk["content"]):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+def load_sentence_transformer(model_name: str) -> Callable[[Sequence[str]], Any]:
+    """Default encoder factory: a sentence-transformers model's encode()"""
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name)
+
+    def encode(texts: Sequence[str]):
+        return model.encode(list(texts), batch_size=len(texts), show_progress_bar=False,
+                            convert_to_numpy=True)
+    return encode
+
+
+# Encoder loaded once per pool worker by _init_embedding_worker
+_worker_encoder: Optional[Callable[[Sequence[str]], Any]] = None
+
+
+def _init_embedding_worker(encoder_factory, model_name: str) -> None:
+    global _worker_encoder
+    # One thread per worker: the pool provides the parallelism, and a fixed
+    # thread count keeps floating point reductions reproducible
+    os.environ["OMP_NUM_THREADS"] = "1"
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+    _worker_encoder = encoder_factory(model_name)
+
+
+def _embed_in_worker(texts: List[str]):
+    import numpy as np
+    return np.asarray(_worker_encoder(texts), dtype=np.float32)
+
+
+class ParallelEmbedder:
+    """
+    Batched embedding across a process pool, yielding vectors in input order
+
+    Jobs of fewer than two batches run in-process (no pool start-up or
+    per-worker model load); larger ones always go through the pool, even
+    with one worker, so results never depend on the worker count.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL,
+                 workers: int = DEFAULT_EMBEDDING_WORKERS,
+                 batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE,
+                 encoder_factory: Callable[[str], Callable] = load_sentence_transformer):
+        self.model_name = model_name
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.encoder_factory = encoder_factory
+        self._local_encoder = None
+
+    def stream(self, texts: Sequence[str]) -> Iterator[Any]:
+        batches = [list(texts[i:i + self.batch_size]) for i in range(0, len(texts), self.batch_size)]
+        if len(batches) < 2:
+            yield from self._stream_local(batches)
+        else:
+            yield from self._stream_pool(batches)
+
+    def __call__(self, texts: Sequence[str]):
+        import numpy as np
+        return np.asarray(list(self.stream(texts)), dtype=np.float32)
+
+    def _stream_local(self, batches: List[List[str]]) -> Iterator[Any]:
+        import numpy as np
+        if batches and self._local_encoder is None:
+            self._local_encoder = self.encoder_factory(self.model_name)
+        for batch in batches:
+            yield from np.asarray(self._local_encoder(batch), dtype=np.float32)
+
+    def _stream_pool(self, batches: List[List[str]]) -> Iterator[Any]:
+        # Keep a couple of batches queued per worker; results are consumed in
+        # submission order, so output order matches input order
+        queued = iter(batches)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_embedding_worker,
+                                 initargs=(self.encoder_factory, self.model_name)) as pool:
+            in_flight = deque(pool.submit(_embed_in_worker, batch)
+                              for batch in (next(queued) for _ in range(min(len(batches), self.workers * 2))))
+            while in_flight:
+                vectors = in_flight.popleft().result()
+                batch = next(queued, None)
+                if batch is not None:
+                    in_flight.append(pool.submit(_embed_in_worker, batch))
+                yield from vectors
+
+
+class IndexUpdate:
+    """What an incremental index run did"""
+
+    __slots__ = ("reused", "embedded", "removed", "seconds", "changed", "workers")
+
+    def __init__(self, reused: int, embedded: int, removed: int, seconds: float, changed: bool,
+                 workers: int = 1):
+        self.reused = reused
+        self.embedded = embedded
+        self.removed = removed
+        self.seconds = seconds
+        self.changed = changed
+        self.workers = workers
+
+    @property
+    def chunks_per_core_second(self) -> float:
+        cores = min(self.workers, os.cpu_count() or 1)
+        return self.embedded / self.seconds / cores if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (f"IndexUpdate(reused={self.reused}, embedded={self.embedded}, "
+                f"removed={self.removed}, seconds={self.seconds:.2f})")
+
+
+def _existing_chunks(store_dir: str, model: str) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """
+    Read the current store's chunk hashes
+
+    Returns:
+        (hash -> embedding row, partition -> hashes in store order); both
+        empty if there is no store built with model
+    """
+    manifest = read_manifest(store_dir)
+    if manifest is None or manifest.get("embedding_model") != model:
+        return {}, {}
+    try:
+        store = KnowledgeStore.open(store_dir)
+    except (OSError, ValueError):
+        return {}, {}
+    embeddings = {}
+    layout: Dict[str, List[str]] = {}
+    for index in range(store.count):
+        metadata = json.loads(store.metadata[index])
+        chunk_id = metadata.get("hash")
+        if chunk_id:
+            embeddings[chunk_id] = store.embeddings[index]
+            layout.setdefault(metadata.get("partition"), []).append(chunk_id)
+    return embeddings, layout
+
+
+def update_index(sources: Optional[Dict[str, str]] = None, store_dir: str = DEFAULT_STORE_DIR,
+                 model: str = DEFAULT_EMBEDDING_MODEL, embedder: Optional[Embedder] = None,
+                 force: bool = False) -> IndexUpdate:
+    """
+    Bring the knowledge store up to date with the markdown sources
+
+    Args:
+        sources: Partition -> markdown file (defaults to KNOWLEDGE_SOURCES)
+        store_dir: Knowledge store directory
+        model: Embedding model name recorded in the store and used for queries
+        embedder: A ParallelEmbedder, or any callable mapping a list of texts
+            to an (n, dims) array; defaults to ParallelEmbedder(model)
+        force: Re-embed every chunk even if unchanged
+
+    Returns:
+        IndexUpdate with counts of reused, embedded and removed chunks
+    """
+    import numpy as np
+
+    started = time.perf_counter()
+    sources = sources or KNOWLEDGE_SOURCES
+    embedder = embedder or ParallelEmbedder(model)
+    existing, existing_layout = ({}, {}) if force else _existing_chunks(store_dir, model)
+
+    partitions: Dict[str, List[Dict[str, Any]]] = {}
+    pending: List[Dict[str, Any]] = []
+    for name, source in sources.items():
+        with open(source, encoding="utf-8") as f:
+            chunks = chunk_markdown(f.read(), os.path.basename(source))
+        for chunk in chunks:
+            chunk["hash"] = chunk_hash(chunk, model)
+            embedding = existing.get(chunk["hash"])
+            if embedding is None:
+                pending.append(chunk)
+            else:
+                chunk["embedding"] = embedding
+        partitions[name] = chunks
+
+    layout = {name: [chunk["hash"] for chunk in chunks] for name, chunks in partitions.items()}
+    current_hashes = {chunk_id for hashes in layout.values() for chunk_id in hashes}
+    removed = len(set(existing) - current_hashes)
+    reused = sum(len(hashes) for hashes in layout.values()) - len(pending)
+    # Moved or reordered sections need a new store even when nothing was embedded
+    changed = force or layout != existing_layout
+    if changed:
+        texts = [chunk["content"] for chunk in pending]
+        if hasattr(embedder, "stream"):
+            vectors = embedder.stream(texts)
+        else:
+            vectors = iter(np.asarray(embedder(texts), dtype=np.float32)) if texts else iter(())
+        dimensions, vectors = _embedding_dimensions(partitions, vectors)
+
+        def stream_partition(chunks):
+            # Embeddings arrive in pending order, which is source order
+            for chunk in chunks:
+                if "embedding" not in chunk:
+                    chunk["embedding"] = next(vectors)
+                yield chunk
+                # The writer has copied it out; don't keep every vector alive
+                del chunk["embedding"]
+
+        write_knowledge_store(
+            store_dir, {name: stream_partition(chunks) for name, chunks in partitions.items()}, dimensions,
+            sources={name: source_info(source) for name, source in sources.items()},
+            embedding_model=model, builder="markdown"
+        )
+    update = IndexUpdate(reused, len(pending), removed, time.perf_counter() - started, changed,
+                         getattr(embedder, "workers", 1))
+    logger.info("knowledge_index_updated", store=store_dir, reused=reused, embedded=len(pending),
+                removed=removed, swapped=changed)
+    return update
+
+
+def _embedding_dimensions(partitions: Dict[str, List[Dict[str, Any]]],
+                          vectors: Iterator[Any]) -> Tuple[int, Iterator[Any]]:
+    """Embedding size from a reused chunk, or by peeking at the first new vector"""
+    for chunks in partitions.values():
+        for chunk in chunks:
+            if "embedding" in chunk:
+                return len(chunk["embedding"]), vectors
+    first = next(vectors, None)
+    if first is None:
+        return 0, vectors
+    return len(first), chain([first], vectors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally (re)index the knowledge bases")
+    parser.add_argument("--store-dir", default=DEFAULT_STORE_DIR)
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--force", action="store_true", help="re-embed every section")
+    parser.add_argument("--workers", type=int, default=DEFAULT_EMBEDDING_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_EMBEDDING_BATCH_SIZE)
+    args = parser.parse_args()
+
+    missing = [source for source in KNOWLEDGE_SOURCES.values() if not os.path.exists(source)]
+    if missing:
+        print(f"Missing knowledge base files: {', '.join(missing)}")
+        sys.exit(1)
+
+    embedder = ParallelEmbedder(args.model, workers=args.workers, batch_size=args.batch_size)
+    update = update_index(store_dir=args.store_dir, model=args.model, embedder=embedder, force=args.force)
+    print(f"{update.embedded} sections embedded, {update.reused} reused, {update.removed} removed "
+          f"in {update.seconds:.2f}s" + ("" if update.changed else " (store already up to date)"))
+    if update.embedded:
+        print(f"{update.chunks_per_core_second:.1f} chunks/sec per core ({update.workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
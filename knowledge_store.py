@@ -0,0 +1,1376 @@
+#!/usr/bin/env python3
+"""
+Shared, memory-mapped knowledge store for the PC Builder agents
+
+The sales and support `.swsearch` indexes are exported into one combined store
+directory, partitioned by agent. Embeddings (unit-normalized float32), chunk
+text and chunk metadata are flat files that every process maps read-only, so N
+uvicorn workers share one physical copy through the page cache instead of each
+holding its own.
+
+Store layout (KNOWLEDGE_STORE_DIR, default ``knowledge_store/``): each write
+is a new version directory, and CURRENT names the one readers open. A write
+swaps CURRENT with one os.replace, so a reader sees the old version or the
+new one and never a missing store. In each ``v-<...>/``:
+    manifest.json      - dimensions, chunk count, partitions and their sources
+    embeddings.f32     - N x D float32 matrix, rows grouped by partition
+    text.bin           - UTF-8 chunk content, concatenated
+    text.idx           - N + 1 uint64 offsets into text.bin
+    meta.bin           - UTF-8 JSON metadata per chunk (filename, section, tags)
+    meta.idx           - N + 1 uint64 offsets into meta.bin
+    lexicon.json, postings.u32, postings_tf.u16, doclen.u32
+                       - BM25 inverted index over the chunks (lexical_index.py)
+    ivf-<partition>-<nlist>.*.npy
+                       - optional IVF index for a partition (ann_index.py),
+                         written the first time a skill with ann="ivf" uses it
+"""
+
+import asyncio
+import json
+import mmap
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import weakref
+from array import array
+from concurrent.futures import Future
+from functools import partial
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+from signalwire_agents.core.function_result import SwaigFunctionResult
+from signalwire_agents.core.logging_config import get_logger
+from signalwire_agents.skills.native_vector_search.skill import NativeVectorSearchSkill
+
+from ann_index import DEFAULT_NPROBE, IVFIndex, load_or_build
+from lexical_index import LexicalIndex, LexicalIndexWriter, keyword_weight_for, query_identifiers, tokenize
+from metrics import metrics
+from query_batcher import get_query_batcher
+from search_executor import SearchBusy, SearchTimeout, get_search_executor
+from ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+STORE_FORMAT_VERSION = 1
+
+# Agent partitions and the .swsearch index each one is exported from
+KNOWLEDGE_PARTITIONS = {
+    "sales": "sales_knowledge.swsearch",
+    "support": "support_knowledge.swsearch",
+}
+
+DEFAULT_STORE_DIR = os.getenv("KNOWLEDGE_STORE_DIR", "knowledge_store")
+
+# File in the store directory naming its current version directory
+CURRENT_POINTER = "CURRENT"
+_VERSION_PREFIX = "v-"
+# Retired versions are kept this long: a concurrent writer may be about to point at its own
+_VERSION_GRACE_S = 60
+
+# Per-chunk metadata kept in the store when the writer supplies it
+_OPTIONAL_CHUNK_METADATA = ("hash", "start_line", "end_line")
+
+# Thousands separators, so "$2,000" and "$2000" share a cache entry
+_THOUSANDS_SEPARATOR = re.compile(r"(?<=\d),(?=\d{3}\b)")
+# Anything that is not a word character, "$" or a decimal point inside a number
+_QUERY_NOISE = re.compile(r"[^\w$.]+|\.(?!\d)")
+
+
+class _StringTable:
+    """Read-only view of strings stored as one UTF-8 blob plus an offsets table"""
+
+    def __init__(self, blob: mmap.mmap, offsets: memoryview):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+
+def _map_file(path: str) -> Optional[mmap.mmap]:
+    """Map a file read-only; empty files cannot be mapped and return None"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class KnowledgeStore:
+    """
+    A memory-mapped, agent-partitioned chunk store
+
+    Open with KnowledgeStore.open(path). Nothing is copied into the Python heap:
+    embeddings are a numpy view over the mapped file and chunk text is decoded
+    on access.
+    """
+
+    def __init__(self, path: str, manifest: Dict[str, Any]):
+        import numpy as np
+
+        self.path = path
+        self.manifest = manifest
+        self.dimensions = int(manifest["dimensions"])
+        self.count = int(manifest["count"])
+        self.partitions: Dict[str, Tuple[int, int]] = {
+            name: (info["start"], info["end"]) for name, info in manifest["partitions"].items()
+        }
+
+        self._maps: List[mmap.mmap] = []
+        embeddings_map = self._map("embeddings.f32")
+        if embeddings_map is None:
+            self.embeddings = np.zeros((0, self.dimensions), dtype=np.float32)
+        else:
+            self.embeddings = np.frombuffer(embeddings_map, dtype=np.float32).reshape(self.count, self.dimensions)
+        self.texts = self._table("text")
+        self.metadata = self._table("meta")
+        self.lexical = LexicalIndex.open(path, self._map)
+        self._ann_indexes: Dict[Tuple[str, Optional[int]], IVFIndex] = {}
+        self._ann_pending = set()
+        self._ann_building: Dict[Tuple[str, Optional[int]], threading.Lock] = {}
+        self._ann_lock = threading.Lock()
+        self._tag_masks: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_STORE_DIR) -> "KnowledgeStore":
+        # Resolved once, so every file comes from the same version
+        version_dir = resolve_store_dir(path)
+        with open(os.path.join(version_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported knowledge store version {manifest.get('version')} in {version_dir}")
+        return cls(version_dir, manifest)
+
+    def _map(self, filename: str) -> Optional[mmap.mmap]:
+        mapped = _map_file(os.path.join(self.path, filename))
+        if mapped is not None:
+            self._maps.append(mapped)
+        return mapped
+
+    def _table(self, name: str) -> _StringTable:
+        blob = self._map(f"{name}.bin") or b""
+        offsets_map = self._map(f"{name}.idx")
+        offsets = memoryview(offsets_map).cast("Q") if offsets_map is not None else memoryview(array("Q", [0]))
+        return _StringTable(blob, offsets)
+
+    def chunk(self, index: int, score: float = 0.0) -> Dict[str, Any]:
+        """Return one chunk in the result format used by the SDK search engine"""
+        metadata = json.loads(self.metadata[index])
+        return {
+            "id": index,
+            "content": self.texts[index],
+            "score": score,
+            "metadata": metadata,
+            "tags": metadata.get("tags", []),
+            "search_type": "vector",
+        }
+
+    def tag_mask(self, partition: str, tags: Optional[Sequence[str]]):
+        """
+        Which of the partition's chunks carry any of tags, as a boolean array
+        over its rows; None for no tags (no filter)
+        """
+        import numpy as np
+
+        if not tags:
+            return None
+        key = (partition, tuple(sorted(tags)))
+        mask = self._tag_masks.get(key)
+        if mask is None:
+            start, end = self.partitions.get(partition, (0, 0))
+            wanted = set(tags)
+            mask = np.fromiter(
+                (not wanted.isdisjoint(json.loads(self.metadata[i]).get("tags", [])) for i in range(start, end)),
+                dtype=bool, count=end - start,
+            )
+            self._tag_masks[key] = mask
+        return mask
+
+    @staticmethod
+    def _overfetch(candidates: int, mask) -> int:
+        """ANN candidates to fetch so that, on average, twice candidates of them pass mask"""
+        if mask is None:
+            return candidates
+        matching = int(mask.sum())
+        return min(len(mask), -(-2 * candidates * len(mask) // max(matching, 1)))
+
+    def _masked_top(self, start: int, query, mask, candidates: int, rows=None, scores=None) -> Tuple:
+        """
+        The top candidates among the rows mask allows: from an ANN shortlist
+        (rows, scores) when enough of it passes mask, else by exact search
+        """
+        import numpy as np
+
+        if rows is not None:
+            allowed = mask[rows]
+            if allowed.sum() >= min(candidates, int(mask.sum())):
+                return rows[allowed], scores[allowed]
+        allowed_rows = np.flatnonzero(mask)
+        allowed_scores = self.embeddings[start + allowed_rows] @ query
+        top = self._top(allowed_scores, candidates)
+        return allowed_rows[top], allowed_scores[top]
+
+    def search(self, partition: str, query_vector, count: int = 3,
+               similarity_threshold: float = 0.0, index: Optional[IVFIndex] = None,
+               nprobe: int = DEFAULT_NPROBE, query_text: Optional[str] = None,
+               keyword_weight: float = 0.0, tags: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Cosine search over one partition, optionally fused with BM25
+
+        Args:
+            partition: Partition name (e.g. "sales")
+            query_vector: Query embedding (any float sequence of the store's dimensions)
+            count: Number of results to return
+            similarity_threshold: Minimum score to include
+            index: The partition's ANN index (from ann_index()); exact search if None
+            nprobe: Clusters the ANN index scores per query
+            query_text: The query, for BM25 fusion
+            keyword_weight: BM25 share of the fused score; 0 (or no query_text
+                or lexical index) searches by cosine alone
+            tags: Only return chunks carrying at least one of these tags; the
+                filter is applied before the results are cut to count
+
+        Returns:
+            Results ordered by descending score
+        """
+        import numpy as np
+
+        start, end = self.partitions.get(partition, (0, 0))
+        mask = self.tag_mask(partition, tags)
+        if end <= start or count <= 0 or mask is not None and not mask.any():
+            return []
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0:
+            return []
+        query = query / norm
+        candidates = self._candidates(count, query_text, keyword_weight)
+        if index is not None:
+            rows, scores = index.search(query, self._overfetch(candidates, mask), nprobe)
+            if mask is not None:
+                rows, scores = self._masked_top(start, query, mask, candidates, rows, scores)
+        elif mask is not None:
+            rows, scores = self._masked_top(start, query, mask, candidates)
+        else:
+            all_scores = self.embeddings[start:end] @ query
+            rows = self._top(all_scores, candidates)
+            scores = all_scores[rows]
+        return self._ranked(start, end, query, rows, scores, count, similarity_threshold, query_text, keyword_weight,
+                            mask)
+
+    def search_batch(self, partition: str, query_vectors, count: int = 3,
+                     similarity_threshold: float = 0.0, index: Optional[IVFIndex] = None,
+                     nprobe: int = DEFAULT_NPROBE, query_texts: Optional[List[str]] = None,
+                     keyword_weights: Optional[List[float]] = None,
+                     tags: Optional[List[Optional[Sequence[str]]]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Cosine search for several queries with one matrix multiply
+
+        The partition's embeddings (or, with an ANN index, its centroids) are
+        streamed through once for the whole batch instead of once per query.
+
+        Args:
+            partition: Partition name (e.g. "sales")
+            query_vectors: B x D query embeddings
+            count: Number of results per query
+            similarity_threshold: Minimum score to include
+            index: The partition's ANN index (from ann_index()); exact search if None
+            nprobe: Clusters the ANN index scores per query
+            query_texts: The B queries, for BM25 fusion
+            keyword_weights: Each query's BM25 share of the fused score, as for search()
+            tags: Each query's tag filter, as for search()
+
+        Returns:
+            One result list per query, each ordered by descending score
+        """
+        import numpy as np
+
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        queries = queries.reshape(len(queries), -1)
+        start, end = self.partitions.get(partition, (0, 0))
+        if end <= start or count <= 0 or not len(queries):
+            return [[] for _ in range(len(queries))]
+        texts = query_texts or [None] * len(queries)
+        weights = keyword_weights or [0.0] * len(queries)
+        masks = [self.tag_mask(partition, query_tags) for query_tags in tags or [None] * len(queries)]
+        candidates = self._candidates(count, query_texts and query_texts[0], max(weights))
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0.0, 1.0, norms)
+        if index is not None:
+            found = index.search_batch(queries, max(self._overfetch(candidates, mask) for mask in masks), nprobe)
+            found = [
+                (rows, scores) if mask is None else self._masked_top(start, query, mask, candidates, rows, scores)
+                for query, (rows, scores), mask in zip(queries, found, masks)
+            ]
+        else:
+            found = []
+            for row_scores, mask in zip(queries @ self.embeddings[start:end].T, masks):
+                if mask is None:
+                    rows = self._top(row_scores, candidates)
+                else:
+                    rows = np.flatnonzero(mask)[self._top(row_scores[mask], candidates)]
+                found.append((rows, row_scores[rows]))
+        return [
+            self._ranked(start, end, query, rows, scores, count, similarity_threshold, text, weight, mask)
+            if norm else []
+            for query, (rows, scores), text, weight, norm, mask
+            in zip(queries, found, texts, weights, norms[:, 0], masks)
+        ]
+
+    def exact_match(self, partition: str, query: str, count: int = 3,
+                    max_other_terms: int = 2) -> Optional[List[Dict[str, Any]]]:
+        """
+        Answer an identifier query ("WHEA_UNCORRECTABLE_ERROR", "RTX 4070 price") without embedding it
+
+        Applies when the query has at least one identifier (a token with a
+        digit, or a stop-code style compound), at most max_other_terms other
+        words, and some chunk contains every identifier. Those chunks are
+        ranked by BM25 over the whole query.
+
+        Returns:
+            Results scored by BM25 relative to the best (1.0), or None if the
+            query needs a vector search
+        """
+        import numpy as np
+
+        start, end = self.partitions.get(partition, (0, 0))
+        if self.lexical is None or end <= start or count <= 0:
+            return None
+        identifiers, others = query_identifiers(query)
+        if not identifiers or others > max_other_terms:
+            return None
+        matched = self.lexical.containing_all(start, end, identifiers)
+        if matched is None or not len(matched):
+            return None
+        ids, bm25 = self.lexical.scores(start, end, tokenize(query))
+        scores = bm25[np.searchsorted(ids, matched)]
+        top = self._top(scores, count)
+        best = float(scores[top[0]]) or 1.0
+        return [
+            dict(self.chunk(int(matched[i]), float(scores[i]) / best), search_type="exact")
+            for i in top
+        ]
+
+    def _candidates(self, count: int, query_text: Optional[str], keyword_weight: float) -> int:
+        # Fusion re-ranks a wider vector shortlist
+        return count * 4 if self.lexical is not None and query_text and keyword_weight > 0 else count
+
+    @staticmethod
+    def _top(scores, count: int):
+        """Indexes of the count highest scores, best first"""
+        import numpy as np
+
+        count = min(count, len(scores))
+        if count <= 0:
+            return np.zeros(0, dtype=np.int64)
+        top = np.argpartition(-scores, count - 1)[:count]
+        return top[np.argsort(-scores[top])]
+
+    def _ranked(self, start: int, end: int, query, rows, scores, count: int, similarity_threshold: float,
+                query_text: Optional[str], keyword_weight: float, mask=None) -> List[Dict[str, Any]]:
+        """
+        Results for vector hits (partition-relative rows), fused with BM25 when
+        asked to; only rows mask allows, when given
+        """
+        import numpy as np
+
+        if mask is not None:
+            allowed = mask[rows]
+            rows, scores = rows[allowed], scores[allowed]
+        if self.lexical is None or not query_text or keyword_weight <= 0:
+            return self._results(start, rows[:count], scores[:count], similarity_threshold)
+        lexical_ids, bm25 = self.lexical.scores(start, end, tokenize(query_text))
+        if mask is not None:
+            allowed = mask[lexical_ids - start]
+            lexical_ids, bm25 = lexical_ids[allowed], bm25[allowed]
+        if not len(lexical_ids):
+            return self._results(start, rows[:count], scores[:count], similarity_threshold)
+        keyword_top = self._top(bm25, len(rows))
+        # Union of both shortlists, as global chunk ids
+        ids = np.union1d(np.asarray(rows, dtype=np.int64) + start, lexical_ids[keyword_top].astype(np.int64))
+        cosine = self.embeddings[ids] @ query
+        keyword = np.zeros(len(ids), dtype=np.float32)
+        position = np.searchsorted(lexical_ids, ids)
+        found = (position < len(lexical_ids)) & (lexical_ids[np.minimum(position, len(lexical_ids) - 1)] == ids)
+        keyword[found] = bm25[position[found]] / float(bm25.max())
+        fused = (1.0 - keyword_weight) * cosine + keyword_weight * keyword
+        top = self._top(fused, count)
+        return [
+            dict(result, search_type="hybrid")
+            for result in self._results(0, ids[top], fused[top], similarity_threshold)
+        ]
+
+    def _results(self, start: int, rows, scores, similarity_threshold: float) -> List[Dict[str, Any]]:
+        return [
+            self.chunk(start + int(row), float(score))
+            for row, score in zip(rows, scores)
+            if score >= similarity_threshold
+        ]
+
+    def ann_index(self, partition: str, nlist: Optional[int] = None, wait: bool = True) -> Optional[IVFIndex]:
+        """
+        The partition's IVF index, loaded from the store directory or built on first use
+
+        Args:
+            wait: If False and the index isn't ready, start loading or building
+                it in the background and return None (search exactly meanwhile)
+
+        Returns:
+            The index, or None if the partition is empty or (wait=False) not ready yet
+        """
+        key = (partition, nlist)
+        index = self._ann_indexes.get(key)
+        if index is not None or not wait and key in self._ann_pending:
+            return index
+        start, end = self.partitions.get(partition, (0, 0))
+        if end <= start:
+            return None
+        if not wait:
+            with self._ann_lock:
+                if key not in self._ann_pending:
+                    self._ann_pending.add(key)
+                    threading.Thread(target=self._build_ann_index, args=(partition, nlist), daemon=True,
+                                     name=f"ann-build-{partition}").start()
+            return None
+        with self._ann_lock:
+            self._ann_pending.add(key)
+            building = self._ann_building.setdefault(key, threading.Lock())
+        with building:
+            index = self._ann_indexes.get(key)
+            if index is None:
+                index = self._ann_indexes[key] = load_or_build(self.path, partition, self.embeddings[start:end], nlist)
+        return index
+
+    def _build_ann_index(self, partition: str, nlist: Optional[int]) -> None:
+        try:
+            self.ann_index(partition, nlist)
+        except Exception as e:
+            # Searches of this partition stay exact
+            logger.error("ann_index_build_failed", partition=partition, error=str(e))
+
+    def prefault(self) -> int:
+        """
+        Read one byte of every mapped page so the first searches don't take page faults
+
+        The pages land in the page cache, which every process mapping the store
+        shares. Returns the number of bytes mapped.
+        """
+        import numpy as np
+
+        total = 0
+        for mapped in self._maps:
+            pages = np.frombuffer(mapped, dtype=np.uint8)[::mmap.PAGESIZE]
+            int(pages.sum())
+            total += len(mapped)
+        return total
+
+    def close(self) -> None:
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                # Still referenced by a live numpy view; the mapping goes with it
+                pass
+        self._maps = []
+
+
+def write_knowledge_store(path: str, partitions: Dict[str, Iterable[Dict[str, Any]]],
+                          dimensions: int, sources: Optional[Dict[str, Dict[str, Any]]] = None,
+                          embedding_model: Optional[str] = None,
+                          builder: str = "swsearch") -> Dict[str, Any]:
+    """
+    Write a new version of a knowledge store and atomically make it current
+
+    Args:
+        path: Store directory
+        partitions: Partition name -> iterable of chunks, each a dict with
+            "content", "embedding" (float32 bytes or float sequence) and
+            optional "filename", "section", "tags", "hash", "start_line", "end_line"
+        dimensions: Embedding dimensions
+        sources: Optional per-partition source info recorded in the manifest
+        embedding_model: Model the embeddings came from (for query embedding)
+        builder: What produced the store ("swsearch" export or "markdown" indexer)
+
+    Returns:
+        The written manifest
+    """
+    import numpy as np
+
+    path = os.path.abspath(path)
+    os.makedirs(path, exist_ok=True)
+    staging = os.path.join(path, f".tmp-{os.getpid()}-{threading.get_ident()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    manifest_partitions = {}
+    count = 0
+    lexical = LexicalIndexWriter()
+    with open(os.path.join(staging, "embeddings.f32"), "wb") as emb_f, \
+            open(os.path.join(staging, "text.bin"), "wb") as text_f, \
+            open(os.path.join(staging, "meta.bin"), "wb") as meta_f:
+        text_offsets = array("Q", [0])
+        meta_offsets = array("Q", [0])
+        for name, chunks in partitions.items():
+            start = count
+            for chunk in chunks:
+                embedding = chunk["embedding"]
+                if isinstance(embedding, (bytes, bytearray, memoryview)):
+                    vector = np.frombuffer(embedding, dtype=np.float32)
+                else:
+                    vector = np.asarray(embedding, dtype=np.float32)
+                if vector.shape != (dimensions,):
+                    logger.warning("knowledge_store_skipped_chunk", partition=name,
+                                   section=chunk.get("section"), dimensions=vector.shape)
+                    continue
+                norm = float(np.linalg.norm(vector))
+                emb_f.write((vector / norm if norm else vector).astype(np.float32).tobytes())
+
+                section = chunk.get("section") or ""
+                content = chunk["content"]
+                lexical.add(count, content if content.startswith(section) else f"{section}\n{content}")
+                text = content.encode("utf-8")
+                text_f.write(text)
+                text_offsets.append(text_offsets[-1] + len(text))
+
+                meta = {
+                    "filename": chunk.get("filename", ""),
+                    "section": chunk.get("section") or "",
+                    "tags": chunk.get("tags") or [],
+                    "partition": name,
+                }
+                for key in _OPTIONAL_CHUNK_METADATA:
+                    if chunk.get(key) is not None:
+                        meta[key] = chunk[key]
+                meta = json.dumps(meta).encode("utf-8")
+                meta_f.write(meta)
+                meta_offsets.append(meta_offsets[-1] + len(meta))
+                count += 1
+            manifest_partitions[name] = dict((sources or {}).get(name, {}), start=start, end=count)
+
+    terms = lexical.write(staging)
+    with open(os.path.join(staging, "text.idx"), "wb") as f:
+        text_offsets.tofile(f)
+    with open(os.path.join(staging, "meta.idx"), "wb") as f:
+        meta_offsets.tofile(f)
+
+    manifest = {
+        "version": STORE_FORMAT_VERSION,
+        "dimensions": dimensions,
+        "count": count,
+        "embedding_model": embedding_model,
+        "builder": builder,
+        "partitions": manifest_partitions,
+        "lexical": {"terms": terms},
+    }
+    with open(os.path.join(staging, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    _publish_version(staging, path)
+    logger.info("knowledge_store_written", path=path, chunks=count, partitions=list(manifest_partitions))
+    return manifest
+
+
+def _current_version(path: str) -> Optional[str]:
+    try:
+        with open(os.path.join(path, CURRENT_POINTER)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def resolve_store_dir(path: str) -> str:
+    """The directory holding the store's current version (path itself for a store from before versioning)"""
+    version = _current_version(path)
+    return os.path.join(path, version) if version else path
+
+
+def _publish_version(staging: str, path: str) -> None:
+    """
+    Make the finished staging directory the store's current version
+
+    It is renamed to a unique version directory and CURRENT is replaced to
+    name it, so concurrent writers never collide: the last replace wins.
+    """
+    version = f"{_VERSION_PREFIX}{time.time_ns()}-{os.getpid()}-{threading.get_ident()}"
+    os.rename(staging, os.path.join(path, version))
+    previous = _current_version(path)
+    pointer = os.path.join(path, f".{CURRENT_POINTER}-{os.getpid()}-{threading.get_ident()}")
+    with open(pointer, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer, os.path.join(path, CURRENT_POINTER))
+    _retire_versions(path, keep={version, previous})
+
+
+def _retire_versions(path: str, keep) -> None:
+    """
+    Delete old versions, keeping the current and previous ones
+
+    Processes that already mapped a retired version keep their mappings; its
+    files are unlinked, not truncated, so in-flight searches stay valid.
+    Files of a store from before versioning are removed the same way.
+    """
+    cutoff = time.time_ns() - int(_VERSION_GRACE_S * 1e9)
+    for entry in os.scandir(path):
+        if entry.name in keep or entry.name == CURRENT_POINTER or entry.name.startswith("."):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            stamp = entry.name[len(_VERSION_PREFIX):].split("-", 1)[0]
+            if entry.name.startswith(_VERSION_PREFIX) and stamp.isdigit() and int(stamp) < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def source_info(index_file: str) -> Dict[str, Any]:
+    stat = os.stat(index_file)
+    return {"source": index_file, "source_mtime": stat.st_mtime, "source_size": stat.st_size}
+
+
+def read_swsearch_chunks(index_file: str) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Read every embedded chunk and the config table from a .swsearch index
+
+    Returns:
+        (chunks, config) with chunks in index order
+    """
+    conn = sqlite3.connect(f"file:{index_file}?mode=ro", uri=True)
+    try:
+        config = dict(conn.execute("SELECT key, value FROM config").fetchall())
+        rows = conn.execute(
+            "SELECT content, embedding, filename, section, tags FROM chunks "
+            "WHERE embedding IS NOT NULL AND length(embedding) > 0 ORDER BY id"
+        ).fetchall()
+    finally:
+        conn.close()
+    chunks = [
+        {
+            "content": content,
+            "embedding": embedding,
+            "filename": filename,
+            "section": section,
+            "tags": json.loads(tags) if tags else [],
+        }
+        for content, embedding, filename, section, tags in rows
+    ]
+    return chunks, config
+
+
+def read_manifest(path: str) -> Optional[Dict[str, Any]]:
+    """The store's current manifest, or None if there is no readable store at path"""
+    try:
+        with open(os.path.join(resolve_store_dir(path), "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_is_current(path: str, index_files: Dict[str, str]) -> bool:
+    """Whether the store at path was built from the current versions of index_files"""
+    manifest = read_manifest(path)
+    if manifest is None or manifest.get("version") != STORE_FORMAT_VERSION or "lexical" not in manifest:
+        return False
+    partitions = manifest.get("partitions", {})
+    if set(partitions) != set(index_files):
+        return False
+    for name, index_file in index_files.items():
+        recorded = partitions[name]
+        current = source_info(index_file)
+        if (recorded.get("source") != current["source"]
+                or recorded.get("source_mtime") != current["source_mtime"]
+                or recorded.get("source_size") != current["source_size"]):
+            return False
+    return True
+
+
+def build_knowledge_store(path: str = DEFAULT_STORE_DIR,
+                          index_files: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Export .swsearch indexes into a combined store at path
+
+    Args:
+        path: Store directory
+        index_files: Partition name -> .swsearch file (defaults to KNOWLEDGE_PARTITIONS,
+            skipping indexes that have not been built)
+
+    Returns:
+        The written manifest, or None if there was nothing to export
+    """
+    if index_files is None:
+        index_files = {name: f for name, f in KNOWLEDGE_PARTITIONS.items() if os.path.exists(f)}
+    if not index_files:
+        return None
+
+    partitions = {}
+    dimensions = None
+    embedding_model = None
+    for name, index_file in index_files.items():
+        chunks, config = read_swsearch_chunks(index_file)
+        partitions[name] = chunks
+        file_dimensions = int(config.get("embedding_dimensions", 0)) or (
+            len(chunks[0]["embedding"]) // 4 if chunks else 0
+        )
+        if dimensions is None:
+            dimensions, embedding_model = file_dimensions, config.get("embedding_model")
+        elif file_dimensions and file_dimensions != dimensions:
+            raise ValueError(
+                f"{index_file} has {file_dimensions}-dim embeddings but the store uses {dimensions}; "
+                "rebuild both indexes with the same model"
+            )
+
+    sources = {name: source_info(index_file) for name, index_file in index_files.items()}
+    return write_knowledge_store(path, partitions, dimensions or 0, sources, embedding_model)
+
+
+_store: Optional[KnowledgeStore] = None
+_store_lock = threading.Lock()
+# Bumped on every reload so cached search results from an older store are never served
+_store_generation = 0
+_reload_listeners: List[weakref.WeakMethod] = []
+
+
+def get_knowledge_store(path: str = DEFAULT_STORE_DIR) -> Optional[KnowledgeStore]:
+    """
+    Return the process-wide knowledge store, (re)building it if its sources changed
+
+    A store written by the markdown indexer (knowledge_indexer.py) is used as
+    is; one exported from .swsearch indexes is re-exported when they change.
+    Returns None when there is neither, in which case the search skills fall
+    back to their own per-agent index.
+    """
+    global _store
+    if _store is not None:
+        return _store
+    with _store_lock:
+        if _store is not None:
+            return _store
+        manifest = read_manifest(path)
+        index_files = {name: f for name, f in KNOWLEDGE_PARTITIONS.items() if os.path.exists(f)}
+        try:
+            built_from_markdown = manifest is not None and manifest.get("builder") == "markdown"
+            if index_files and not built_from_markdown:
+                if not store_is_current(path, index_files):
+                    build_knowledge_store(path, index_files)
+            elif manifest is None:
+                return None
+            _store = KnowledgeStore.open(path)
+        except (ImportError, OSError, ValueError, sqlite3.Error) as e:
+            logger.warning("knowledge_store_unavailable", path=path, error=str(e))
+            return None
+    return _store
+
+
+def knowledge_store_generation() -> int:
+    return _store_generation
+
+
+def add_reload_listener(callback) -> None:
+    """
+    Call callback(store) after every reload_knowledge_store()
+
+    Only a weak reference to the bound method is kept, so registering an
+    agent's method does not keep the agent alive. Registering the same
+    method again has no effect.
+    """
+    listener = weakref.WeakMethod(callback)
+    if listener not in _reload_listeners:
+        _reload_listeners.append(listener)
+
+
+def remove_reload_listener(callback) -> None:
+    """Stop calling callback on reloads; a no-op if it isn't registered"""
+    listener = weakref.WeakMethod(callback)
+    if listener in _reload_listeners:
+        _reload_listeners.remove(listener)
+
+
+def reload_knowledge_store(path: str = DEFAULT_STORE_DIR) -> Optional[KnowledgeStore]:
+    """
+    Re-open the store at path and make it the process-wide store
+
+    The old mapping is left to the garbage collector rather than closed, so
+    searches already running against it finish normally.
+    """
+    global _store, _store_generation
+    try:
+        store = KnowledgeStore.open(path)
+    except (ImportError, OSError, ValueError) as e:
+        logger.warning("knowledge_store_reload_failed", path=path, error=str(e))
+        return None
+    with _store_lock:
+        _store = store
+        _store_generation += 1
+    logger.info("knowledge_store_reloaded", path=path, chunks=store.count, generation=_store_generation)
+
+    for listener in list(_reload_listeners):
+        callback = listener()
+        if callback is None:
+            _reload_listeners.remove(listener)
+            continue
+        try:
+            callback(store)
+        except Exception as e:
+            logger.error("knowledge_store_reload_listener_failed", error=str(e))
+    return store
+
+
+class KnowledgeStoreWatcher:
+    """
+    Poll a store's manifest and reload the store when it is swapped
+
+    Each worker process runs its own watcher, so every worker picks up a
+    rebuilt store within one interval without a restart.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_DIR, interval: float = 5.0):
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._signature = self._manifest_signature()
+
+    def _manifest_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(os.path.join(resolve_store_dir(self.path), "manifest.json"))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def poll(self) -> bool:
+        """Reload if the manifest changed since the last poll; returns True on reload"""
+        signature = self._manifest_signature()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        return reload_knowledge_store(self.path) is not None
+
+    def start(self) -> "KnowledgeStoreWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="knowledge-store-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+
+class SharedStoreSearchEngine:
+    """
+    Adapter exposing one KnowledgeStore partition through the SDK SearchEngine interface
+
+    The native_vector_search skill only calls search(), get_stats() and reads config.
+    Results fuse cosine with BM25 (keyword_weight, or picked per query when
+    None) when the store has a lexical index. With ann="ivf", partitions of at least ann_min_chunks are searched through
+    the store's IVF index instead of exactly.
+    """
+
+    def __init__(self, store: KnowledgeStore, partition: str, ann: str = "exact",
+                 nprobe: int = DEFAULT_NPROBE, nlist: Optional[int] = None, ann_min_chunks: int = 0):
+        self._store = store
+        self.partition = partition
+        self.ann = ann
+        self.nprobe = nprobe
+        self.nlist = nlist
+        self.ann_min_chunks = ann_min_chunks
+        self.config = {
+            "embedding_model": store.manifest.get("embedding_model"),
+            "embedding_dimensions": str(store.dimensions),
+        }
+
+    @property
+    def store(self) -> KnowledgeStore:
+        # Follow hot reloads of the process-wide store
+        return _store if _store is not None else self._store
+
+    @property
+    def generation(self) -> int:
+        return _store_generation
+
+    def ann_index(self, store: KnowledgeStore, wait: bool = False) -> Optional[IVFIndex]:
+        """
+        The IVF index to search store with, or None for exact search
+
+        Searches don't wait for an index that is still being built; they run
+        exactly until it's ready. The pre-fork warm-up builds it with wait=True.
+        """
+        if self.ann != "ivf":
+            return None
+        start, end = store.partitions.get(self.partition, (0, 0))
+        if end - start < self.ann_min_chunks:
+            return None
+        return store.ann_index(self.partition, self.nlist, wait)
+
+    def search(self, query_vector, enhanced_text: str, count: int = 3,
+               similarity_threshold: float = 0.0, tags: Optional[List[str]] = None,
+               keyword_weight: Optional[float] = None,
+               original_query: Optional[str] = None) -> List[Dict[str, Any]]:
+        if query_vector is None or len(query_vector) == 0:
+            return []
+        store = self.store
+        query_text = original_query or enhanced_text
+        if keyword_weight is None:
+            keyword_weight = keyword_weight_for(query_text)
+        return store.search(self.partition, query_vector, count, similarity_threshold,
+                            self.ann_index(store), self.nprobe, query_text, keyword_weight, tags)
+
+    def get_stats(self) -> Dict[str, Any]:
+        start, end = self.store.partitions.get(self.partition, (0, 0))
+        return {"total_chunks": end - start, "partition": self.partition, "shared_store": self.store.path}
+
+
+class SharedIndexVectorSearchSkill(NativeVectorSearchSkill):
+    """
+    native_vector_search backed by the shared knowledge store
+
+    Takes the same parameters as native_vector_search plus "partition". When
+    the store has that partition, searches run against the shared mapping;
+    otherwise the skill behaves exactly like native_vector_search.
+    """
+
+    @classmethod
+    def get_parameter_schema(cls) -> Dict[str, Dict[str, Any]]:
+        schema = super().get_parameter_schema()
+        schema.update({
+            "cache_size": {
+                "type": "integer",
+                "description": "Maximum cached query results for in-process searches",
+                "default": 512,
+                "required": False
+            },
+            "cache_ttl": {
+                "type": "number",
+                "description": "Seconds a cached query result stays valid",
+                "default": 300.0,
+                "required": False
+            },
+            "ann": {
+                "type": "string",
+                "description": "Shared store search: 'exact' or 'ivf' (approximate, for large partitions)",
+                "default": "exact",
+                "enum": ["exact", "ivf"],
+                "required": False
+            },
+            "ann_min_chunks": {
+                "type": "integer",
+                "description": "Smallest partition searched through the IVF index; smaller ones stay exact",
+                "default": 50000,
+                "required": False
+            },
+            "ann_nlist": {
+                "type": "integer",
+                "description": "IVF clusters (default about sqrt of the partition size)",
+                "required": False
+            },
+            "ann_nprobe": {
+                "type": "integer",
+                "description": "IVF clusters scored per query; higher is slower with better recall",
+                "default": DEFAULT_NPROBE,
+                "required": False
+            },
+            "exact_match": {
+                "type": "boolean",
+                "description": "Answer identifier queries (stop codes, part numbers) from the BM25 index without embedding",
+                "default": True,
+                "required": False
+            },
+            "lazy_load": {
+                "type": "boolean",
+                "description": "Import the search dependencies and open the index on first search or warm-up, not at setup",
+                "default": True,
+                "required": False
+            },
+            "partition": {
+                "type": "string",
+                "description": "Knowledge store partition to search (e.g. 'sales')",
+                "required": False
+            },
+            "search_timeout": {
+                "type": "number",
+                "description": "Seconds to wait for an in-process search (default SEARCH_TIMEOUT or 2)",
+                "required": False
+            },
+            "store_dir": {
+                "type": "string",
+                "description": "Knowledge store directory",
+                "default": DEFAULT_STORE_DIR,
+                "required": False
+            }
+        })
+        return schema
+
+    def setup(self) -> bool:
+        self.result_cache = TTLCache(
+            max_entries=self.params.get("cache_size", 512),
+            ttl=self.params.get("cache_ttl", 300.0)
+        )
+        self._load_lock = threading.Lock()
+        if self.params.get("lazy_load", True) and not self.params.get("remote_url") \
+                and not self.params.get("build_index"):
+            # Local search over an existing index: the heavy part waits for load()
+            self._configure_local()
+            self._loaded = False
+            self._attach_partition()
+            return True
+        if not super().setup():
+            return False
+        self._loaded = True
+        if not self.use_remote and self.search_available:
+            # Query preprocessing still needs the SDK search extras
+            self._attach_partition()
+        return True
+
+    def _configure_local(self) -> None:
+        """The parameters native_vector_search's setup() reads for a local index, without its imports"""
+        self.tool_name = self.params.get('tool_name', 'search_knowledge')
+        self.backend = self.params.get('backend', 'sqlite')
+        self.connection_string = self.params.get('connection_string')
+        self.collection_name = self.params.get('collection_name')
+        self.index_file = self.params.get('index_file')
+        self.build_index = False
+        self.source_dir = self.params.get('source_dir')
+        self.count = self.params.get('count', 5)
+        self.similarity_threshold = self.params.get('similarity_threshold', 0.0)
+        self.tags = self.params.get('tags', [])
+        self.no_results_message = self.params.get('no_results_message', "No information found for '{query}'")
+        self.response_prefix = self.params.get('response_prefix', '')
+        self.response_postfix = self.params.get('response_postfix', '')
+        self.max_content_length = self.params.get('max_content_length', 32768)
+        self.response_format_callback = self.params.get('response_format_callback')
+        self.keyword_weight = self.params.get('keyword_weight')
+        self.model_name = self.params.get('model_name', 'mini')
+        self.remote_url = self.remote_base_url = self.remote_auth = None
+        self.index_name = self.params.get('index_name', 'default')
+        self.use_remote = False
+        nlp_backend = self.params.get('nlp_backend')
+        self.index_nlp_backend = nlp_backend or self.params.get('index_nlp_backend', 'nltk')
+        self.query_nlp_backend = nlp_backend or self.params.get('query_nlp_backend', 'nltk')
+        if self.query_nlp_backend not in ('basic', 'nltk', 'spacy'):
+            self.query_nlp_backend = 'basic'
+        # Unknown until load() has tried the imports
+        self.search_available = False
+        self.search_engine = None
+
+    def _attach_partition(self) -> None:
+        partition = self.params.get("partition")
+        if not partition:
+            return
+        store = get_knowledge_store(self.params.get("store_dir", DEFAULT_STORE_DIR))
+        if store is None or partition not in store.partitions:
+            self.logger.info(f"Shared knowledge store has no '{partition}' partition; using {self.index_file}")
+            return
+        self.search_engine = self._shared_engine(store, partition)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> bool:
+        """
+        Import the search dependencies and open the index, once
+
+        With lazy_load (the default), setup() only reads parameters and maps
+        the shared store partition. The SDK search module (numpy,
+        scikit-learn, sentence-transformers, NLTK and its data) is imported
+        here instead, by the first search or by the server's warm-up. A skill
+        without a shared partition opens its .swsearch index here too.
+
+        Returns:
+            Whether search is available
+        """
+        if self._loaded:
+            return self.search_available
+        with self._load_lock:
+            if self._loaded:
+                return self.search_available
+            with metrics.timer("search_skill_load", self._partition_label):
+                shared = self.search_engine
+                if isinstance(shared, SharedStoreSearchEngine):
+                    try:
+                        from signalwire_agents.search import SearchEngine  # noqa: F401
+                        from signalwire_agents.search.query_processor import preprocess_query  # noqa: F401
+                        self.search_available = True
+                    except ImportError as e:
+                        self.search_available = False
+                        self.import_error = str(e)
+                        self.search_engine = None
+                        self.logger.warning(f"Search dependencies not available: {e}")
+                else:
+                    # The SDK's own local setup: imports, then the .swsearch index
+                    NativeVectorSearchSkill.setup(self)
+            self._loaded = True
+        return self.search_available
+
+    def attach_store(self, store: KnowledgeStore) -> bool:
+        """
+        Serve this skill's partition from store (used after a hot reload)
+
+        Returns:
+            True if the store has the partition and is now in use
+        """
+        partition = self.params.get("partition")
+        if not partition or partition not in store.partitions or (self._loaded and not self.search_available):
+            return False
+        if not isinstance(self.search_engine, SharedStoreSearchEngine):
+            self.search_engine = self._shared_engine(store, partition)
+        return True
+
+    def _shared_engine(self, store: KnowledgeStore, partition: str) -> SharedStoreSearchEngine:
+        return SharedStoreSearchEngine(
+            store, partition,
+            ann=self.params.get("ann", "exact"),
+            nprobe=self.params.get("ann_nprobe", DEFAULT_NPROBE),
+            nlist=self.params.get("ann_nlist"),
+            ann_min_chunks=self.params.get("ann_min_chunks", 50000),
+        )
+
+    def _search_key(self, query: str, count: int) -> Optional[Tuple]:
+        """Cache and single-flight key for a query; None if there is nothing to search"""
+        if not self.load() or self.use_remote or self.search_engine is None:
+            return None
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        return (self._partition_label, normalized, count, getattr(self.search_engine, "generation", 0))
+
+    @property
+    def _partition_label(self) -> str:
+        return self.params.get("partition") or self.params.get("tool_name", "search")
+
+    def search(self, query: str, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Search the knowledge base in-process, for tools that ground their own answers
+
+        Results are cached on the normalized query, so repeated phrasings skip
+        both query embedding and the search itself. Identifier queries ("RTX
+        4070", a BSOD stop code) found verbatim in the partition are answered
+        from the BM25 index without embedding. Other misses run on the shared
+        search executor, joining an identical search already in flight, and
+        shared store searches are micro-batched with other calls' queries.
+
+        Returns:
+            Results in search engine format; empty if search is unavailable,
+            the executor is saturated or the search times out
+        """
+        count = count or self.count
+        key = self._search_key(query, count)
+        if key is None:
+            return []
+        results = self.result_cache.get(key)
+        if results is None:
+            results = self._exact_match(query, count, key)
+        if results is not None:
+            return results
+        fn, direct = self._search_task(query, count, key)
+        try:
+            return get_search_executor().run(key, fn, self.params.get("search_timeout"), direct)
+        except (SearchBusy, SearchTimeout) as e:
+            self.logger.warning(f"In-process knowledge search skipped for '{query}': {e}")
+            return []
+
+    async def search_async(self, query: str, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """search() for async tools: waits for the executor without blocking the event loop"""
+        if not self._loaded:
+            await asyncio.get_running_loop().run_in_executor(None, self.load)
+        count = count or self.count
+        key = self._search_key(query, count)
+        if key is None:
+            return []
+        results = self.result_cache.get(key)
+        if results is None:
+            results = self._exact_match(query, count, key)
+        if results is not None:
+            return results
+        fn, direct = self._search_task(query, count, key)
+        try:
+            return await get_search_executor().run_async(key, fn, self.params.get("search_timeout"), direct)
+        except (SearchBusy, SearchTimeout) as e:
+            self.logger.warning(f"In-process knowledge search skipped for '{query}': {e}")
+            return []
+
+    def _exact_match(self, query: str, count: int, key: Optional[Tuple] = None) -> Optional[List[Dict[str, Any]]]:
+        """Exact-match fast path results (cached under key), or None when the query needs embedding"""
+        if not self.params.get("exact_match", True) or not isinstance(self.search_engine, SharedStoreSearchEngine):
+            return None
+        engine = self.search_engine
+        with metrics.timer("keyword_search", engine.partition):
+            results = engine.store.exact_match(engine.partition, query, count)
+        if results is not None:
+            results = [r for r in results if not self.tags or any(tag in r["tags"] for tag in self.tags)]
+        if not results:
+            # No hit, or none with this skill's tags: the normal search may still find something
+            return None
+        if key is not None:
+            self.result_cache.put(key, results)
+        return results
+
+    def _search_task(self, query: str, count: int, key: Tuple):
+        """The executor work for a miss: batched for the shared store, a pool task otherwise"""
+        if isinstance(self.search_engine, SharedStoreSearchEngine):
+            batcher = get_query_batcher(self.search_engine.config.get('embedding_model'))
+            if batcher is not None:
+                return partial(self._search_batched, batcher, query, count, key), True
+        return partial(self._search_uncached, query, count, key), False
+
+    def _search_batched(self, batcher, query: str, count: int, key: Tuple) -> Future:
+        """Queue the query on the batcher; the returned Future caches its result like _search_uncached"""
+        from signalwire_agents.search.query_processor import preprocess_query
+
+        def expand(text: str) -> str:
+            return preprocess_query(
+                text,
+                language='en',
+                vector=False,
+                query_nlp_backend=self.query_nlp_backend,
+                preserve_original=True,
+                max_synonyms=2
+            )['enhanced_text']
+
+        done: Future = Future()
+
+        def finish(batched: Future) -> None:
+            try:
+                results = batched.result()
+            except Exception as e:
+                self.logger.error(f"In-process knowledge search failed for '{query}': {e}")
+                done.set_result([])
+                return
+            self.result_cache.put(key, results)
+            done.set_result(results)
+
+        engine = self.search_engine
+        store = engine.store
+        keyword_weight = self.keyword_weight if self.keyword_weight is not None else keyword_weight_for(query)
+        batcher.submit(store, engine.partition, query, count, self.similarity_threshold, self.tags, expand,
+                       engine.ann_index(store), engine.nprobe, keyword_weight).add_done_callback(finish)
+        return done
+
+    def _search_uncached(self, query: str, count: int, key: Tuple) -> List[Dict[str, Any]]:
+        """Embed the query and search; runs on the search executor"""
+        partition = self._partition_label
+        try:
+            from signalwire_agents.search.query_processor import preprocess_query
+
+            with metrics.timer("query_embedding", partition):
+                enhanced = preprocess_query(
+                    query,
+                    language='en',
+                    vector=True,
+                    query_nlp_backend=self.query_nlp_backend,
+                    model_name=self.search_engine.config.get('embedding_model'),
+                    preserve_original=True,
+                    max_synonyms=2
+                )
+            with metrics.timer("vector_search", partition):
+                results = self.search_engine.search(
+                    query_vector=enhanced.get('vector', []),
+                    enhanced_text=enhanced['enhanced_text'],
+                    count=count,
+                    similarity_threshold=self.similarity_threshold,
+                    tags=self.tags,
+                    keyword_weight=self.keyword_weight,
+                    original_query=query
+                )
+        except Exception as e:
+            # Tools fall back to their ungrounded answer; don't cache the failure
+            self.logger.error(f"In-process knowledge search failed for '{query}': {e}")
+            return []
+        self.result_cache.put(key, results)
+        return results
+
+    def _search_handler(self, args, raw_data):
+        """The skill's own search tool, run on the search executor like search()"""
+        query = str(args.get("query", "")).strip()
+        if not query or not self.load() or self.use_remote or self.search_engine is None:
+            return super()._search_handler(args, raw_data)
+        key = ("tool", self._partition_label, query, args.get("count", self.count),
+               getattr(self.search_engine, "generation", 0))
+        if not self.response_format_callback:
+            results = self._exact_match(query, args.get("count", self.count))
+            if results:
+                return SwaigFunctionResult(self._format_tool_results(query, results))
+        try:
+            return get_search_executor().run(key, partial(super()._search_handler, args, raw_data),
+                                             self.params.get("search_timeout"))
+        except (SearchBusy, SearchTimeout) as e:
+            self.logger.warning(f"Knowledge search tool skipped for '{query}': {e}")
+            return SwaigFunctionResult(
+                "Our knowledge base is busy right now. Let me help from what I know, and we can look it up again in a moment."
+            )
+
+    def _format_tool_results(self, query: str, results: List[Dict[str, Any]]) -> str:
+        """The search tool's response text, laid out as native_vector_search formats it"""
+        per_result_limit = max(500, (self.max_content_length - len(results) * 300 - len(self.response_prefix)
+                                     - len(self.response_postfix) - 100) // len(results))
+        parts = [self.response_prefix] if self.response_prefix else []
+        parts.append(f"Found {len(results)} relevant results for '{query}':\n")
+        for i, result in enumerate(results, 1):
+            metadata = result["metadata"]
+            content = result["content"]
+            if len(content) > per_result_limit:
+                content = content[:per_result_limit] + "..."
+            header = f"**Result {i}** (from {metadata['filename']}"
+            if metadata.get("section"):
+                header += f", section: {metadata['section']}"
+            if result.get("tags"):
+                header += f", tags: {', '.join(result['tags'])}"
+            parts.append(f"{header}, relevance: {result['score']:.2f})\n{content}\n")
+        if self.response_postfix:
+            parts.append(self.response_postfix)
+        return "\n".join(parts)
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a query for caching ("Won't  BOOT!" -> "won t boot")"""
+    query = _THOUSANDS_SEPARATOR.sub("", query.lower())
+    return " ".join(_QUERY_NOISE.sub(" ", query).split())
+
+
+def format_knowledge_results(results: List[Dict[str, Any]], max_chars: int = 600) -> str:
+    """Render search results as compact, attributed text for a SWAIG response"""
+    parts = []
+    for result in results:
+        section = result["metadata"].get("section") or result["metadata"].get("filename", "")
+        content = " ".join(result["content"].split())
+        if len(content) > max_chars:
+            content = content[:max_chars].rsplit(" ", 1)[0] + "..."
+        parts.append(f"[{section}] {content}")
+    return "\n".join(parts)
+
+
+def add_shared_search_skill(agent, params: Dict[str, Any]) -> SharedIndexVectorSearchSkill:
+    """
+    Load SharedIndexVectorSearchSkill on an agent (the add_skill equivalent)
+
+    The SDK re-creates skills on per-request ephemeral copies from the loaded
+    instance's class, so those copies keep using the shared store too.
+
+    Returns:
+        The loaded skill, whose search() tools can call directly
+
+    Raises:
+        ValueError: If the skill fails to load
+    """
+    success, error_message = agent.skill_manager.load_skill(
+        SharedIndexVectorSearchSkill.SKILL_NAME, SharedIndexVectorSearchSkill, params
+    )
+    if not success:
+        raise ValueError(f"Failed to load skill '{SharedIndexVectorSearchSkill.SKILL_NAME}': {error_message}")
+    if hasattr(agent, "invalidate_render_cache"):
+        agent.invalidate_render_cache()
+    tool_name = params.get("tool_name")
+    for skill in agent.skill_manager.loaded_skills.values():
+        if isinstance(skill, SharedIndexVectorSearchSkill) and skill.params.get("tool_name") == tool_name:
+            return skill
+    raise ValueError(f"Skill '{SharedIndexVectorSearchSkill.SKILL_NAME}' loaded but not registered")
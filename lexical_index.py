@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+BM25 inverted index for the shared knowledge store
+
+Support queries are often exact tokens - BSOD stop codes
+(DRIVER_IRQL_NOT_LESS_OR_EQUAL), part numbers (i5-14600K, RTX 4070), error
+strings - that an embedding blurs into "something about drivers". The store
+writer builds this index next to the embeddings, and searches use it twice:
+
+- Fused ranking: vector and BM25 candidates are merged and ranked on
+  (1 - w) * cosine + w * BM25 / best BM25, with the keyword weight w from
+  the skill's keyword_weight or picked per query (higher when the query
+  carries identifiers).
+- Exact-match fast path: a query that is mostly identifiers, all present in
+  the partition, is answered from the chunks containing every one of them,
+  ranked by BM25, without embedding the query at all.
+
+Files (in the store directory):
+    lexicon.json       - term -> [first posting, posting count]
+    postings.u32       - chunk ids per term, ascending (global store ids)
+    postings_tf.u16    - term frequency for each posting
+    doclen.u32         - tokens per chunk
+"""
+
+import json
+import os
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+K1 = 1.2
+B = 0.75
+
+# Automatic keyword weights (a skill's keyword_weight param overrides them)
+DEFAULT_KEYWORD_WEIGHT = 0.2
+IDENTIFIER_KEYWORD_WEIGHT = 0.5
+
+# Compound tokens stay whole (i5-14600k, driver_irql_not_less_or_equal,
+# 0x0000007e, 3.5) and are also indexed by their parts
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+_PART = re.compile(r"[-_.]")
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in is it its me my no not of on or our
+so that the their then there these this to up was what when where which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased index terms for text: words, whole compounds and their parts, minus stop words"""
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        if _PART.search(token):
+            terms.append(token)
+            terms.extend(part for part in _PART.split(token) if part and part not in STOP_WORDS)
+        elif token not in STOP_WORDS:
+            terms.append(token)
+    return terms
+
+
+def is_identifier(token: str) -> bool:
+    """Tokens an embedding handles poorly: anything with a digit, and compounds like stop codes"""
+    return any(c.isdigit() for c in token) or ("_" in token and len(token) > 6)
+
+
+def query_identifiers(query: str) -> Tuple[List[str], int]:
+    """
+    A query's identifier tokens and how many other (non stop word) words it has
+
+    "RTX 4070 price" -> (["4070"], 2); compounds count once, not by their parts.
+    """
+    identifiers, others = [], 0
+    for token in _TOKEN.findall(query.lower()):
+        if is_identifier(token):
+            identifiers.append(token)
+        elif token not in STOP_WORDS:
+            others += 1
+    return identifiers, others
+
+
+def keyword_weight_for(query: str) -> float:
+    """Automatic BM25 share of the fused score: higher for queries carrying identifiers"""
+    identifiers, _ = query_identifiers(query)
+    return IDENTIFIER_KEYWORD_WEIGHT if identifiers else DEFAULT_KEYWORD_WEIGHT
+
+
+class LexicalIndexWriter:
+    """Accumulates postings while the store writer streams chunks, then writes the files"""
+
+    def __init__(self):
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.doclen = array("I")
+
+    def add(self, doc_id: int, text: str) -> None:
+        counts: Dict[str, int] = {}
+        terms = tokenize(text)
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            ids, tfs = self.postings.setdefault(term, (array("I"), array("H")))
+            ids.append(doc_id)
+            tfs.append(min(tf, 0xFFFF))
+        self.doclen.append(len(terms))
+
+    def write(self, directory: str) -> int:
+        """Write the index files; returns the number of terms"""
+        lexicon = {}
+        position = 0
+        with open(os.path.join(directory, "postings.u32"), "wb") as ids_f, \
+                open(os.path.join(directory, "postings_tf.u16"), "wb") as tf_f:
+            for term in sorted(self.postings):
+                ids, tfs = self.postings[term]
+                ids.tofile(ids_f)
+                tfs.tofile(tf_f)
+                lexicon[term] = [position, len(ids)]
+                position += len(ids)
+        with open(os.path.join(directory, "doclen.u32"), "wb") as f:
+            self.doclen.tofile(f)
+        with open(os.path.join(directory, "lexicon.json"), "w") as f:
+            json.dump(lexicon, f, separators=(",", ":"))
+        return len(lexicon)
+
+
+class LexicalIndex:
+    """
+    Read side of the BM25 index over a store's mapped files
+
+    Scores are computed per partition (document frequencies and average
+    length within the partition's chunk range), so sales and support terms
+    don't skew each other.
+    """
+
+    def __init__(self, lexicon: Dict[str, List[int]], ids, tfs, doclen):
+        self.lexicon = lexicon
+        self.ids = ids
+        self.tfs = tfs
+        self.doclen = doclen
+        self._avgdl: Dict[Tuple[int, int], float] = {}
+
+    @classmethod
+    def open(cls, directory: str, map_file) -> Optional["LexicalIndex"]:
+        """
+        Open the index in directory, mapping its arrays with map_file(name)
+
+        Returns:
+            The index, or None if the store was written without one
+        """
+        import numpy as np
+
+        try:
+            with open(os.path.join(directory, "lexicon.json")) as f:
+                lexicon = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        def mapped(name: str, dtype):
+            data = map_file(name)
+            return np.frombuffer(data, dtype=dtype) if data is not None else np.zeros(0, dtype=dtype)
+        return cls(lexicon, mapped("postings.u32", np.uint32), mapped("postings_tf.u16", np.uint16),
+                   mapped("doclen.u32", np.uint32))
+
+    def _postings(self, term: str, start: int, end: int):
+        """(chunk ids, term frequencies) of term within [start, end)"""
+        import numpy as np
+
+        entry = self.lexicon.get(term)
+        if entry is None:
+            return None
+        first, count = entry
+        ids = self.ids[first:first + count]
+        lo, hi = np.searchsorted(ids, start), np.searchsorted(ids, end)
+        if lo == hi:
+            return None
+        return ids[lo:hi], self.tfs[first + lo:first + hi]
+
+    def _average_length(self, start: int, end: int) -> float:
+        avgdl = self._avgdl.get((start, end))
+        if avgdl is None:
+            avgdl = self._avgdl[(start, end)] = max(float(self.doclen[start:end].mean()), 1.0)
+        return avgdl
+
+    def scores(self, start: int, end: int, terms: Iterable[str]):
+        """
+        BM25 of every chunk in [start, end) matching any of terms
+
+        Returns:
+            (ascending chunk ids, scores)
+        """
+        import numpy as np
+
+        total = end - start
+        avgdl = self._average_length(start, end)
+        found_ids, found_scores = [], []
+        for term in set(terms):
+            postings = self._postings(term, start, end)
+            if postings is None:
+                continue
+            ids, tfs = postings
+            idf = np.log(1.0 + (total - len(ids) + 0.5) / (len(ids) + 0.5))
+            tf = tfs.astype(np.float32)
+            norm = K1 * (1.0 - B + B * self.doclen[ids] / avgdl)
+            found_ids.append(ids)
+            found_scores.append(idf * tf * (K1 + 1.0) / (tf + norm))
+        if not found_ids:
+            return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.float32)
+        ids, inverse = np.unique(np.concatenate(found_ids), return_inverse=True)
+        return ids, np.bincount(inverse, weights=np.concatenate(found_scores)).astype(np.float32)
+
+    def containing_all(self, start: int, end: int, terms: Iterable[str]):
+        """
+        Chunk ids in [start, end) that contain every one of terms
+
+        Returns:
+            Ascending chunk ids, or None if some term appears nowhere in the range
+        """
+        import numpy as np
+
+        matched = None
+        for term in set(terms):
+            postings = self._postings(term, start, end)
+            if postings is None:
+                return None
+            matched = postings[0] if matched is None else np.intersect1d(matched, postings[0], assume_unique=True)
+        return matched
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Sampled latency histograms for the PC Builder agents
+
+Timings are grouped by stage (swml_render, dynamic_config, pom_render,
+swaig_tool, query_embedding, vector_search, keyword_search, outbound_http) and
+a label within (route, tool name, knowledge partition or host). Each histogram has fixed
+log-spaced millisecond buckets, so recording is a bisect and an increment
+and memory does not grow with traffic.
+
+Only a fraction of operations is timed (METRICS_SAMPLE_RATE, default 0.1):
+an unsampled operation costs one random() call. Counts in the output are
+sampled counts; divide by the sample rate for totals.
+
+    from metrics import metrics
+
+    with metrics.timer("vector_search", "sales"):
+        ...
+"""
+
+import inspect
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Bucket upper bounds in milliseconds; the last bucket is +Inf
+DEFAULT_BUCKETS_MS = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0,
+    100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds)"""
+
+    __slots__ = ("bounds", "counts", "count", "total_ms", "max_ms", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float) -> None:
+        index = bisect_left(self.bounds, ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket"""
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            max_ms = self.max_ms
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else max_ms
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, max_ms)
+            seen += bucket_count
+        return max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 4) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.50), 4),
+            "p95_ms": round(self.quantile(0.95), 4),
+            "p99_ms": round(self.quantile(0.99), 4),
+            "max_ms": round(self.max_ms, 4),
+        }
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe((time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class LatencyMetrics:
+    """Registry of sampled latency histograms keyed by (stage, label)"""
+
+    def __init__(self, sample_rate: float = 0.1, bounds: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.sample_rate = sample_rate
+        self.bounds = bounds
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str, label: str) -> LatencyHistogram:
+        key = (stage, label)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, LatencyHistogram(self.bounds))
+        return histogram
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def timer(self, stage: str, label: str):
+        """Context manager timing one operation (when it is sampled)"""
+        if not self.sampled():
+            return _NULL_TIMER
+        return _Timer(self.histogram(stage, label))
+
+    def observe(self, stage: str, label: str, ms: float) -> None:
+        self.histogram(stage, label).observe(ms)
+
+    def timed(self, stage: str, label: Optional[str] = None) -> Callable:
+        """Decorator timing every (sampled) call; label defaults to the function name"""
+        def decorator(func):
+            name = label or func.__name__
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(stage, name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def _items(self) -> List[Tuple[Tuple[str, str], LatencyHistogram]]:
+        with self._lock:
+            return sorted(self._histograms.items())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-stage, per-label summaries (sampled counts, estimated percentiles)"""
+        stages: Dict[str, Dict[str, Any]] = {}
+        for (stage, label), histogram in self._items():
+            stages.setdefault(stage, {})[label] = histogram.summary()
+        return {"sample_rate": self.sample_rate, "stages": stages}
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition: one histogram family, labelled by stage and label"""
+        lines = [
+            "# HELP pc_builder_latency_ms Sampled operation latency in milliseconds",
+            "# TYPE pc_builder_latency_ms histogram",
+        ]
+        for (stage, label), histogram in self._items():
+            with histogram._lock:
+                counts = list(histogram.counts)
+                count = histogram.count
+                total_ms = histogram.total_ms
+            labels = f'stage="{_escape(stage)}",label="{_escape(label)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.bounds, counts):
+                cumulative += bucket_count
+                lines.append(f'pc_builder_latency_ms_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'pc_builder_latency_ms_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"pc_builder_latency_ms_sum{{{labels}}} {total_ms:.6f}")
+            lines.append(f"pc_builder_latency_ms_count{{{labels}}} {count}")
+        lines.append("# HELP pc_builder_latency_sample_rate Fraction of operations timed")
+        lines.append("# TYPE pc_builder_latency_sample_rate gauge")
+        lines.append(f"pc_builder_latency_sample_rate {self.sample_rate:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Process-wide registry used by the agents and the /metrics endpoint
+metrics = LatencyMetrics(sample_rate=float(os.getenv("METRICS_SAMPLE_RATE", "0.1")))
+
+
+class InstrumentedAgentMixin:
+    """
+    Time an AgentBase subclass's SWML renders, dynamic config callback,
+    POM rendering and SWAIG tool calls
+
+    Must come first in the bases so the render timing includes the render
+    cache and tool timings include awaiting async handlers.
+    """
+
+    def _render_swml(self, call_id: str = None, modifications: Optional[dict] = None):
+        with metrics.timer("swml_render", self.route or "/"):
+            return super()._render_swml(call_id, modifications)
+
+    def set_dynamic_config_callback(self, callback):
+        label = f"{self.route or '/'} {getattr(callback, '__name__', 'callback')}"
+
+        @wraps(callback)
+        def timed_callback(query_params, body_params, headers, agent):
+            with metrics.timer("dynamic_config", label):
+                return callback(query_params, body_params, headers, agent)
+        return super().set_dynamic_config_callback(timed_callback)
+
+    def get_prompt(self):
+        with metrics.timer("pom_render", self.route or "/"):
+            return super().get_prompt()
+
+    def on_function_call(self, name: str, args: Dict[str, Any], raw_data: Optional[Dict[str, Any]] = None):
+        # Unknown names come straight from the request; don't mint histograms for them
+        label = name if name in self._tool_registry._swaig_functions else "unknown"
+        with metrics.timer("swaig_tool", label):
+            return super().on_function_call(name, args, raw_data)
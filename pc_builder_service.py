@@ -10,21 +10,60 @@ This service provides specialized PC building assistance through three dedicated
 Key Feature: Uses SignalWire's swml_transfer skill with required_fields for automatic
 context preservation. The skill ensures both the customer's name and a comprehensive summary
 are collected before transferring and makes them available via ${call_data.user_name}
-and ${call_data.summary} to the receiving agent.
+and ${call_data.summary} to the receiving agent. They are also saved to a call
+context store (call_context.py) and restored when the receiving agent's SWML is
+fetched, since global data does not carry over into the new AI session.
 """
 
+import argparse
 import os
-from datetime import datetime
+import sys
+import threading
 from typing import Dict, Any, Optional
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
 from signalwire_agents import AgentBase, AgentServer
 from signalwire_agents.core.function_result import SwaigFunctionResult
 from signalwire_agents.core.logging_config import get_logger
 
+from async_tools import AsyncToolMixin
+from build_catalog import CompatibilityChecker, get_catalog, reload_catalog
+from build_optimizer import BuildOptimizer
+from call_context import PreparedTransferSkill, TransferContextMixin, get_context_store, request_call_id
+from http_cache import INFO_CACHE_CONTROL, PreserializedJSON
+from integrations import format_live_prices, get_inventory, get_ticketing
+from knowledge_store import (
+    KnowledgeStoreWatcher, add_reload_listener, add_shared_search_skill, format_knowledge_results,
+    remove_reload_listener
+)
+from metrics import InstrumentedAgentMixin, metrics
+from prefetch import SpecialistPrefetchMixin, get_prefetcher, register_specialist
+from prefork import WarmupState, install_health_endpoints, serve
+from prompt_compiler import CompactPromptMixin
+from support_tickets import get_ticket_store
+from swml_cache import CachedSWMLMixin, SWMLRenderCache
+from tool_streams import first_step
+from ttl_cache import TTLCache
+
 # Set up logger for this module
 logger = get_logger(__name__)
 
+# Company and house rules every agent's prompt states in its own words; the
+# compact prompt variant (PROMPT_VARIANT=compact) says them once, up front
+SHARED_PREAMBLE = {
+    "title": "PC Builder Pro",
+    "body": "You work at PC Builder Pro, which builds, sells and supports custom PCs.",
+    "bullets": [
+        "Ask clarifying questions about their specific requirements",
+        "Never make customers feel bad about their technical knowledge level",
+    ],
+}
+
+
 # Define the Triage Agent (root route)
-class TriageAgent(AgentBase):
+class TriageAgent(InstrumentedAgentMixin, CompactPromptMixin, CachedSWMLMixin, AsyncToolMixin, AgentBase):
+    prompt_preamble = SHARED_PREAMBLE
+
     def __init__(self):
         super().__init__(
             name="PC Builder Triage Agent",
@@ -36,6 +75,9 @@ class TriageAgent(AgentBase):
         # Configure prompt using POM
         self._configure_prompt()
         
+        # Register tools once; the dynamic callback attaches the transfer tool
+        self._register_tools()
+        
         # Configure language and voice for Alex persona
         self.add_language(
             name="English",
@@ -44,8 +86,25 @@ class TriageAgent(AgentBase):
         )
         
         # Set up dynamic configuration for URL-dependent tools
+        self._transfer_skills = TTLCache(max_entries=64, ttl=3600.0)
         self.set_dynamic_config_callback(self.configure_transfer_tools)
     
+    def _register_tools(self):
+        """Register the triage SWAIG tools once at construction time"""
+        @self.tool(
+            "prepare_specialist",
+            description=(
+                "Get the sales or support specialist ready as soon as it is clear which one the "
+                "customer needs, before collecting their name and summary"
+            )
+        )
+        def prepare_specialist(specialist_type: str, draft_summary: str, raw_data: dict = None):
+            """Speculatively prefetch the specialist's transfer SWML and a knowledge search"""
+            specialist = specialist_type.strip().lower()
+            if specialist in ("sales", "support"):
+                get_prefetcher().prefetch(request_call_id(raw_data), f"/{specialist}", draft_summary)
+            return SwaigFunctionResult("Noted. Carry on collecting their name and what they need.")
+    
     def configure_transfer_tools(self, query_params, body_params, headers, agent):
         """
         DYNAMIC CONFIGURATION - Called fresh for every request
@@ -58,12 +117,25 @@ class TriageAgent(AgentBase):
             headers: HTTP headers from the request
             agent: EphemeralAgentConfig object to configure
         """
-        # Build URLs with proper proxy detection
-        sales_url = self.get_full_url(include_auth=True).rstrip('/') + "/sales?transfer=true"
-        support_url = self.get_full_url(include_auth=True).rstrip('/') + "/support?transfer=true"
-        
-        # Configure transfers using swml_transfer skill
-        agent.add_skill("swml_transfer", {
+        # The skill only depends on the base URL and auth, so it is built once
+        # per (proxy base, credentials) and every later request just attaches it
+        key = (self._resolved_base_url(), self.get_basic_auth_credentials())
+        prepared = self._transfer_skills.get(key)
+        if prepared is None:
+            prepared = PreparedTransferSkill(self._transfer_skill_params(self.get_full_url(include_auth=True)))
+            self._transfer_skills.put(key, prepared)
+        prepared.attach(agent)
+
+    def _transfer_skill_params(self, base_url: str) -> Dict[str, Any]:
+        """
+        swml_transfer parameters for transfers to the specialists under base_url
+
+        The tool runs locally so the name and summary are saved to the call
+        context store for the specialist.
+        """
+        sales_url = base_url.rstrip('/') + "/sales?transfer=true"
+        support_url = base_url.rstrip('/') + "/support?transfer=true"
+        return {
             "tool_name": "transfer_to_specialist",
             "description": "Transfer to sales or support specialist with conversation summary",
             "parameter_name": "specialist_type",
@@ -87,7 +159,7 @@ class TriageAgent(AgentBase):
                 }
             },
             "default_message": "I can transfer you to either our sales or support specialist. Which would you prefer?"
-        })
+        }
     
     def _configure_prompt(self):
         """Configure the prompt for the triage agent using POM"""
@@ -108,6 +180,7 @@ class TriageAgent(AgentBase):
                 "Greet the customer warmly with 'Hi! I'm Alex from PC Builder Pro!'",
                 "Ask for their name in a friendly way",
                 "Determine if they need sales (buying/building) or support (technical issues)",
+                "As soon as that is clear, call prepare_specialist with a one-line draft of their need",
                 "Get a brief description of what they need help with",
                 "Prepare a comprehensive summary before transferring",
                 "Use transfer_to_specialist with both the destination and summary"
@@ -141,7 +214,9 @@ class TriageAgent(AgentBase):
 
 
 # Define the Sales Agent
-class SalesAgent(AgentBase):
+class SalesAgent(InstrumentedAgentMixin, CompactPromptMixin, SpecialistPrefetchMixin, TransferContextMixin, CachedSWMLMixin, AsyncToolMixin, AgentBase):
+    prompt_preamble = SHARED_PREAMBLE
+
     def __init__(self):
         super().__init__(
             name="PC Builder Sales Specialist",
@@ -163,18 +238,42 @@ class SalesAgent(AgentBase):
             voice="elevenlabs.josh"
         )
         
-        # Add search capability for sales knowledge
-        self.add_skill("native_vector_search", {
+        # Add search capability for sales knowledge (served from the shared,
+        # memory-mapped knowledge store when it has been built)
+        self.knowledge = add_shared_search_skill(self, {
             "tool_name": "search_sales_knowledge",
             "description": "Search sales and product information",
             "index_file": "sales_knowledge.swsearch",
-            "count": 3
+            "count": 3,
+            "partition": "sales",
+            "ann": os.getenv("KNOWLEDGE_ANN", "exact")
         })
         
+        # Structured catalog parsed from the sales knowledge base, for
+        # answers that don't need the LLM or a vector search
+        self.catalog = get_catalog()
+        self.compatibility = CompatibilityChecker()
+        self.optimizer = BuildOptimizer(self.catalog, self.compatibility)
+        
+        # Register tools once; the dynamic callback only adds prompt deltas
+        self._register_tools()
+        
+        # Pick up rebuilt knowledge stores without a restart
+        add_reload_listener(self.reload_knowledge)
+        
+    def reload_knowledge(self, store):
+        """Hot-reload hook: serve searches from the new store and re-parse the catalog"""
+        self.knowledge.attach_store(store)
+        self.catalog = reload_catalog()
+        self.optimizer = BuildOptimizer(self.catalog, self.compatibility)
+        
     def configure_dynamic_prompt(self, query_params, body_params, headers, agent):
         """
         Dynamic configuration callback to add transfer information when transfer=true
         
+        Only per-request prompt sections belong here - tools are registered
+        once in _register_tools.
+        
         Args:
             query_params: Query string parameters from the request
             body_params: POST body parameters (empty for GET requests)
@@ -189,6 +288,7 @@ class SalesAgent(AgentBase):
                 bullets=[
                     "The customer's name is ${call_data.user_name} - greet them by name",
                     "They were transferred because: ${call_data.summary}",
+                    "What our knowledge base has on it: ${call_data.knowledge}",
                     "Start by greeting them by name and acknowledging why they were transferred",
                     (
                         "Example: 'Hi ${call_data.user_name}, I'm Morgan! I understand "
@@ -213,31 +313,71 @@ class SalesAgent(AgentBase):
                     )
                 ]
             )
+    
+    def _register_tools(self):
+        """
+        Register the sales SWAIG tools once at construction time
         
-        # Define sales-specific functions
+        Tools are static, so they live on the agent's own registry and are
+        shared by every ephemeral copy the SDK creates per request. The
+        dynamic config callback only contributes per-request prompt sections.
+        """
         @self.tool("create_build_recommendation", description="Create a custom PC build recommendation")
         async def create_build_recommendation(budget: str, use_case: str, preferences: str):
             """Generate a detailed PC build recommendation based on customer requirements"""
-            # First, search the knowledge base for relevant build information
+            # Solve over the catalog's base configs and upgrades when the budget is usable
+            recommendation = self.optimizer.recommend_text(budget, use_case, preferences)
+            if recommendation:
+                yield SwaigFunctionResult(recommendation)
+                # Live prices and stock follow when the inventory service is configured
+                inventory = get_inventory()
+                option = self.optimizer.recommend_for(budget, use_case, preferences) if inventory else None
+                if option is not None:
+                    prices = await inventory.prices([part.name for part in option.parts()])
+                    if prices:
+                        yield f"Live prices and stock for these parts:\n{format_live_prices(prices)}"
+                return
+            
+            # Otherwise ground the answer in the knowledge base in the same round trip
             search_query = f"build configuration {budget} budget {use_case} gaming workstation"
+            results = await self.knowledge.search_async(search_query)
+            if not results:
+                yield SwaigFunctionResult(
+                    f"I'll search our product database for the best {use_case} build within your ${budget} budget. "
+                    f"Based on your preferences ({preferences}), I'll put together a detailed recommendation with current pricing."
+                )
+                return
             
-            # Note: In the actual implementation, this would call search_sales_knowledge
-            # For now, we'll structure it to show how it should work
-            return SwaigFunctionResult(
-                f"I'll search our product database for the best {use_case} build within your ${budget} budget. "
-                f"Based on your preferences ({preferences}), I'll put together a detailed recommendation with current pricing."
+            # Streamed: the closest match first, the details after it
+            yield f"Closest catalog match for a ${budget} {use_case} budget: {first_step(results[0]['content'])}"
+            yield (
+                f"Builds from our catalog matching a ${budget} {use_case} budget "
+                f"(customer preferences: {preferences}):\n{format_knowledge_results(results)}"
             )
         
         @self.tool("check_component_compatibility", description="Check if PC components are compatible")
         async def check_component_compatibility(components: str):
             """Verify component compatibility and identify any issues"""
-            # Search knowledge base for compatibility information
+            # Recognized parts are checked by rule against the catalog specs
+            report, parts, unknown = self.compatibility.check_text(components)
+            if parts:
+                return SwaigFunctionResult(report.summary(unknown))
+            
+            # Nothing recognized - fall back to the knowledge base
             search_query = f"component compatibility {components}"
+            results = await self.knowledge.search_async(search_query)
+            if not results:
+                return SwaigFunctionResult(
+                    f"I'll check our compatibility database for: {components}. "
+                    "This will verify socket types, power requirements, clearances, and any known issues."
+                )
             
             return SwaigFunctionResult(
-                f"I'll check our compatibility database for: {components}. "
-                "This will verify socket types, power requirements, clearances, and any known issues."
+                f"Compatibility information for {components}:\n{format_knowledge_results(results)}"
             )
+        
+        # Rest of create_build_recommendation's streamed result
+        self.define_continuation_tool()
     
     def _configure_prompt(self):
         """Configure the prompt for the sales agent using POM"""
@@ -280,8 +420,8 @@ class SalesAgent(AgentBase):
             body="Use these tools to assist customers:",
             bullets=[
                 "search_sales_knowledge: Find current product information",
-                "create_build_recommendation: Generate custom build suggestions",
-                "check_component_compatibility: Verify component compatibility"
+                "create_build_recommendation: Generate custom build suggestions (includes matching catalog results - no separate search needed)",
+                "check_component_compatibility: Verify component compatibility (socket, memory, power and clearance are checked instantly)"
             ]
         )
         
@@ -302,7 +442,9 @@ class SalesAgent(AgentBase):
 
 
 # Define the Support Agent  
-class SupportAgent(AgentBase):
+class SupportAgent(InstrumentedAgentMixin, CompactPromptMixin, SpecialistPrefetchMixin, TransferContextMixin, CachedSWMLMixin, AsyncToolMixin, AgentBase):
+    prompt_preamble = SHARED_PREAMBLE
+
     def __init__(self):
         super().__init__(
             name="PC Builder Support Specialist",
@@ -324,18 +466,34 @@ class SupportAgent(AgentBase):
             voice="elevenlabs.charlie"
         )
         
-        # Add search capability for support knowledge
-        self.add_skill("native_vector_search", {
+        # Add search capability for support knowledge (served from the shared,
+        # memory-mapped knowledge store when it has been built)
+        self.knowledge = add_shared_search_skill(self, {
             "tool_name": "search_support_knowledge", 
             "description": "Search technical support and troubleshooting information",
             "index_file": "support_knowledge.swsearch",
-            "count": 3
+            "count": 3,
+            "partition": "support",
+            "ann": os.getenv("KNOWLEDGE_ANN", "exact")
         })
         
+        # Register tools once; the dynamic callback only adds prompt deltas
+        self._register_tools()
+        
+        # Pick up rebuilt knowledge stores without a restart
+        add_reload_listener(self.reload_knowledge)
+        
+    def reload_knowledge(self, store):
+        """Hot-reload hook: serve searches from the new store"""
+        self.knowledge.attach_store(store)
+        
     def configure_dynamic_prompt(self, query_params, body_params, headers, agent):
         """
         Dynamic configuration callback to add transfer information when transfer=true
         
+        Only per-request prompt sections belong here - tools are registered
+        once in _register_tools.
+        
         Args:
             query_params: Query string parameters from the request
             body_params: POST body parameters (empty for GET requests)
@@ -350,6 +508,7 @@ class SupportAgent(AgentBase):
                 bullets=[
                     "The customer's name is ${call_data.user_name} - greet them by name",
                     "They were transferred because: ${call_data.summary}",
+                    "What our knowledge base has on it: ${call_data.knowledge}",
                     "Start by greeting them by name and acknowledging their technical issue",
                     (
                         "Example: 'Hi ${call_data.user_name}, I'm Sam. I understand you're "
@@ -374,29 +533,59 @@ class SupportAgent(AgentBase):
                     )
                 ]
             )
+    
+    def _register_tools(self):
+        """
+        Register the support SWAIG tools once at construction time
         
-        # Define support-specific functions
+        See SalesAgent._register_tools for why this is not done per request.
+        """
         @self.tool("diagnose_hardware_issue", description="Help diagnose PC hardware problems")
         async def diagnose_hardware_issue(symptoms: str, system_specs: str):
             """Run through diagnostic steps for hardware issues"""
             # Search the knowledge base for relevant diagnostic procedures
             search_query = f"diagnose troubleshoot {symptoms} hardware issue"
+            results = await self.knowledge.search_async(search_query)
+            if not results:
+                yield SwaigFunctionResult(
+                    f"I'll search our troubleshooting database for issues matching '{symptoms}' on your {system_specs} system. "
+                    "This will give me the most relevant diagnostic steps and common solutions."
+                )
+                return
             
-            return SwaigFunctionResult(
-                f"I'll search our troubleshooting database for issues matching '{symptoms}' on your {system_specs} system. "
-                "This will give me the most relevant diagnostic steps and common solutions."
+            # Streamed: the caller hears the first step while known issues
+            # for their specific system are looked up
+            yield f"First diagnostic step for '{symptoms}': {first_step(results[0]['content'])}"
+            known = {result["content"] for result in results}
+            related = await self.knowledge.search_async(f"{system_specs} {symptoms} known issues")
+            results += [result for result in related if result["content"] not in known]
+            yield (
+                f"Diagnostic steps for '{symptoms}' on a {system_specs} system - "
+                f"walk the customer through them one at a time:\n{format_knowledge_results(results)}"
             )
         
         @self.tool("create_support_ticket", description="Create a support ticket for complex issues")
-        async def create_support_ticket(issue_description: str, customer_info: str, priority: str):
+        async def create_support_ticket(issue_description: str, customer_info: str, priority: str,
+                                        raw_data: dict = None):
             """Create a detailed support ticket for escalation"""
-            ticket_id = f"SUP-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-            
-            return SwaigFunctionResult(
-                f"I've created support ticket {ticket_id} with {priority} priority for {customer_info}. "
+            ticket = get_ticket_store().create(
+                issue_description, customer_info, priority, call_id=request_call_id(raw_data)
+            )
+            response = (
+                f"I've created support ticket {ticket.ticket_id} with {ticket.priority} priority for {customer_info}. "
                 f"Issue: {issue_description}. Our Level 2 team will review this within 4 hours. "
                 "You'll receive an email confirmation with tracking information."
             )
+            
+            # File it with the ticketing system too, when one is configured,
+            # without making the caller wait on it
+            ticketing = get_ticketing()
+            if ticketing:
+                ticketing.submit_in_background(ticket)
+            return SwaigFunctionResult(response)
+        
+        # Rest of diagnose_hardware_issue's streamed result
+        self.define_continuation_tool()
     
     def _configure_prompt(self):
         """Configure the prompt for the support agent using POM"""
@@ -439,7 +628,7 @@ class SupportAgent(AgentBase):
             body="Use these tools to resolve issues:",
             bullets=[
                 "search_support_knowledge: Find technical solutions",
-                "diagnose_hardware_issue: Analyze hardware problems",
+                "diagnose_hardware_issue: Analyze hardware problems (includes matching troubleshooting steps - no separate search needed)",
                 "create_support_ticket: Escalate complex issues"
             ]
         )
@@ -461,7 +650,9 @@ class SupportAgent(AgentBase):
         return True
 
 
-def create_pc_builder_app(host: str = "0.0.0.0", port: int = 3001, log_level: str = "info") -> AgentServer:
+def create_pc_builder_app(host: str = "0.0.0.0", port: int = 3001, log_level: str = "info",
+                          render_cache: bool = True,
+                          knowledge_reload_interval: Optional[float] = None) -> AgentServer:
     """
     Create and configure the PC Builder application with three specialized agents
     
@@ -469,28 +660,59 @@ def create_pc_builder_app(host: str = "0.0.0.0", port: int = 3001, log_level: st
         host: Host to bind the server to
         port: Port to bind the server to  
         log_level: Logging level (debug, info, warning, error, critical)
+        render_cache: Serve SWML from a shared render cache keyed on
+            (route, transfer flag, base URL) instead of re-rendering per request
+        knowledge_reload_interval: Seconds between checks for a rebuilt
+            knowledge store (default KNOWLEDGE_RELOAD_INTERVAL or 5; 0 disables)
     
     Returns:
-        Configured AgentServer with all three agents registered
+        Configured AgentServer with all three agents registered. The render
+        cache (or None) is available as server.render_cache; call its
+        invalidate() after changing agent prompts or skills at runtime. The
+        knowledge store watcher (or None) is server.knowledge_watcher, and
+        the warm-up state /ready reports is server.warmup. Building another
+        app in the same process closes this one (see close_pc_builder_app).
     """
+    global _current_app
+    if _current_app is not None:
+        close_pc_builder_app(_current_app)
+    
     # Create the server
     server = AgentServer(host=host, port=port, log_level=log_level)
+    server.render_cache = SWMLRenderCache() if render_cache else None
+    server.warmup = WarmupState()
+    install_health_endpoints(server)
     
     # Create and register Triage Agent (root)
     triage = TriageAgent()
+    triage.set_render_cache(server.render_cache)
     server.register(triage, "/")
     
     # Create and register Sales Agent
     sales = SalesAgent()
+    sales.set_render_cache(server.render_cache)
     server.register(sales, "/sales")
+    register_specialist(sales)
     
     # Create and register Support Agent
     support = SupportAgent()
+    support.set_render_cache(server.render_cache)
     server.register(support, "/support")
+    register_specialist(support)
     
-    # Add a root endpoint to show available agents
-    @server.app.get("/info")
-    async def info():
+    # Reload the shared knowledge store when knowledge_indexer.py swaps in a new one
+    if knowledge_reload_interval is None:
+        knowledge_reload_interval = float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL", "5"))
+    server.knowledge_watcher = None
+    if knowledge_reload_interval > 0:
+        server.knowledge_watcher = KnowledgeStoreWatcher(interval=knowledge_reload_interval).start()
+    
+    # Add a root endpoint to show available agents. It is serialized once,
+    # on the first request (the context store backend is only settled once
+    # the process serves), and answered from those bytes with an ETag
+    info_document: Dict[int, PreserializedJSON] = {}
+
+    def info_payload() -> Dict[str, Any]:
         return {
             "message": "PC Builder Pro - Multi-Agent Service",
             "agents": {
@@ -509,6 +731,7 @@ def create_pc_builder_app(host: str = "0.0.0.0", port: int = 3001, log_level: st
             },
             "features": {
                 "context_sharing": "Uses swml_transfer skill with user_name and summary requirements",
+                "context_store": get_context_store().stats()["backend"],
                 "pom_prompts": "Structured prompts using Prompt Object Model",
                 "summary_access": "Transfer context available via ${call_data.user_name} and ${call_data.summary}",
                 "multi_agent": "Three specialized agents working together seamlessly"
@@ -519,17 +742,104 @@ def create_pc_builder_app(host: str = "0.0.0.0", port: int = 3001, log_level: st
                 "support_swml": f"GET/POST http://{host}:{port}/support"
             }
         }
+
+    @server.app.get("/info")
+    async def info(request: Request):
+        document = info_document.get(os.getpid())
+        if document is None:
+            document = info_document.setdefault(os.getpid(),
+                                                PreserializedJSON(info_payload(), cache_control=INFO_CACHE_CONTROL))
+        return document.response(request)
     
+    # Sampled latency histograms per route / tool / knowledge partition
+    @server.app.get("/metrics")
+    async def latency_metrics(request: Request):
+        if request.query_params.get("format") == "json":
+            return metrics.snapshot()
+        return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+    
+    _current_app = server
     return server
 
 
+# The last app create_pc_builder_app built in this process, closed when it builds another
+_current_app: Optional[AgentServer] = None
+
+
+def close_pc_builder_app(server: AgentServer) -> None:
+    """
+    Stop an app's knowledge store watcher and its agents' reload listeners
+    
+    The agents themselves are left to the garbage collector. Safe to call
+    more than once.
+    """
+    global _current_app
+    if server.knowledge_watcher is not None:
+        server.knowledge_watcher.stop()
+        server.knowledge_watcher = None
+    for agent in server.agents.values():
+        reload_knowledge = getattr(agent, "reload_knowledge", None)
+        if reload_knowledge is not None:
+            remove_reload_listener(reload_knowledge)
+    if _current_app is server:
+        _current_app = None
+
+
+# Server shared by warm Lambda invocations in the same execution environment
+_lambda_server: Optional[AgentServer] = None
+_lambda_server_lock = threading.Lock()
+
+
+def get_lambda_server() -> AgentServer:
+    """
+    Return the module-level server, building it on first use
+    
+    Building the server constructs all three agents, their prompts and both
+    native_vector_search skills (which load the .swsearch indexes), so it is
+    done once per execution environment rather than once per invocation.
+    """
+    global _lambda_server
+    if _lambda_server is None:
+        with _lambda_server_lock:
+            if _lambda_server is None:
+                _lambda_server = create_pc_builder_app()
+    return _lambda_server
+
+
 def lambda_handler(event, context):
-    """AWS Lambda entry point - delegates to universal server run method"""
-    server = create_pc_builder_app()
-    return server.run(event, context)
+    """AWS Lambda entry point - delegates to the warm server's universal run method"""
+    return get_lambda_server().run(event, context)
+
+
+def _eager_init_requested() -> bool:
+    """Whether to build the Lambda server at import time instead of on first event"""
+    if os.getenv("PC_BUILDER_EAGER_INIT", "").lower() in ("1", "true", "yes"):
+        return True
+    # Provisioned concurrency runs module init ahead of traffic, so pay the cost there
+    return os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency"
+
+
+if __name__ != "__main__" and _eager_init_requested():
+    get_lambda_server()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PC Builder Pro multi-agent service")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PC_BUILDER_WORKERS", "1")),
+                        help="worker processes forked from one warmed-up parent (default PC_BUILDER_WORKERS or 1)")
+    parser.add_argument("--reuse-port", action="store_true",
+                        help="give each worker its own SO_REUSEPORT socket instead of sharing one")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print an import-time and warm-up breakdown of a fresh start, then exit")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        from startup_profile import profile_startup
+        profile_startup()
+        sys.exit(0)
+
     logger.info("Starting PC Builder Pro Multi-Agent Service")
     logger.info("=" * 60)
     logger.info("Triage Agent (Alex): http://localhost:3001/")
@@ -572,9 +882,13 @@ if __name__ == "__main__":
     logger.info("4. Sales/Support agents access context via ${call_data.user_name} and ${call_data.summary}")
     
     # Create and run the server
-    server = create_pc_builder_app()
+    server = create_pc_builder_app(host=args.host, port=args.port)
     
     try:
-        server.run()
+        if args.workers > 1:
+            serve(server, args.workers, reuse_port=args.reuse_port)
+        else:
+            server.warmup.start(server)
+            server.run()
     except KeyboardInterrupt:
         logger.info("Shutting down PC Builder Pro service...") 
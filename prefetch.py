@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Speculative prefetch of the specialist's transfer SWML and knowledge
+
+Triage usually knows where a call is going from the customer's first
+sentence, well before it has collected the name and summary that
+transfer_to_specialist needs. Triage's prepare_specialist tool reports that
+early guess with a draft summary, and returns at once. In the background
+the prefetcher then:
+
+- renders the specialist's /sales?transfer=true or /support?transfer=true
+  SWML for the call, with its SWAIG tokens already minted, and
+- runs a knowledge search on the draft summary in the specialist's
+  partition.
+
+Both are parked in a short-TTL, per-call cache (PREFETCH_TTL seconds,
+default 60). When the specialist's SWML is fetched for that call, the parked
+document is served with the restored transfer context merged in. The search
+results are added as ${call_data.knowledge}, so the specialist can speak to
+the customer's problem on its first turn without a tool round trip. A
+transfer without an earlier guess starts the same prefetch from the final
+summary.
+
+The cache is per process. A fetch served by a different worker renders
+normally, and an entry nobody fetches expires.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from signalwire_agents.core.logging_config import get_logger
+
+from call_context import add_transfer_listener, request_call_id
+from knowledge_store import format_knowledge_results
+from prefork import swml_request
+from process_local import ProcessLocal
+from swml_cache import merge_global_data
+from ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+DEFAULT_PREFETCH_TTL = 60.0
+PREFETCH_WORKERS = 2
+MAX_PREFETCHED_CALLS = 4096
+# Search results handed to the specialist, and how long its SWML fetch waits for them
+KNOWLEDGE_RESULTS = 2
+KNOWLEDGE_MAX_CHARS = 300
+KNOWLEDGE_WAIT = 0.05
+
+# Specialist agents by route; plain module state, so forked workers inherit it
+_specialists: Dict[str, Any] = {}
+
+
+class PrefetchedCall:
+    """What was prepared for one call's transfer to one specialist route"""
+
+    __slots__ = ("route", "base_url", "summary", "document", "knowledge")
+
+    def __init__(self, route: str, base_url: str, summary: str):
+        self.route = route
+        self.base_url = base_url
+        self.summary = summary
+        self.document = None
+        self.knowledge: Future = Future()
+
+    def knowledge_text(self, timeout: float = KNOWLEDGE_WAIT) -> Optional[str]:
+        """The formatted search results, if the search finishes within timeout"""
+        try:
+            results = self.knowledge.result(timeout)
+        except Exception:
+            return None
+        if not results:
+            return None
+        return format_knowledge_results(results[:KNOWLEDGE_RESULTS], max_chars=KNOWLEDGE_MAX_CHARS)
+
+
+class SpecialistPrefetcher:
+    """Per-call cache of prefetched specialist SWML and searches, filled on a small thread pool"""
+
+    def __init__(self, ttl: float = DEFAULT_PREFETCH_TTL, workers: int = PREFETCH_WORKERS):
+        self.ttl = ttl
+        self._calls = TTLCache(max_entries=MAX_PREFETCHED_CALLS, ttl=ttl)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self.started = 0
+        self.served = 0
+
+    def prefetch(self, call_id: str, route: str, summary: str) -> bool:
+        """
+        Start preparing call_id's transfer to route unless that is already under way
+
+        Returns:
+            True if a prefetch was started
+        """
+        agent = _specialists.get(route)
+        if agent is None or not call_id:
+            return False
+        key = (call_id, route)
+        with self._lock:
+            if self._calls.get(key) is not None:
+                return False
+            entry = PrefetchedCall(route, agent._resolved_base_url(), summary)
+            self._calls.put(key, entry)
+        self.started += 1
+        self._pool.submit(self._prepare, agent, call_id, entry)
+        return True
+
+    def _prepare(self, agent, call_id: str, entry: PrefetchedCall) -> None:
+        try:
+            entry.document = agent.prerender_transfer_swml(call_id)
+        except Exception as e:
+            logger.warning("prefetch_render_failed", route=entry.route, call_id=call_id, error=str(e))
+        try:
+            entry.knowledge.set_result(agent.knowledge.search(entry.summary) if entry.summary else [])
+        except Exception as e:
+            entry.knowledge.set_exception(e)
+
+    def get(self, call_id: str, route: str) -> Optional[PrefetchedCall]:
+        return self._calls.get((call_id, route))
+
+    def take(self, call_id: str, route: str) -> Optional[PrefetchedCall]:
+        """Remove and return call_id's entry for route, if any"""
+        entry = self._calls.pop((call_id, route))
+        if entry is not None:
+            self.served += 1
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._calls), "started": self.started, "served": self.served}
+
+
+_prefetcher = ProcessLocal(
+    lambda: SpecialistPrefetcher(ttl=float(os.getenv("PREFETCH_TTL", str(DEFAULT_PREFETCH_TTL))))
+)
+
+
+def get_prefetcher() -> SpecialistPrefetcher:
+    """Process-wide prefetcher, created on first use (TTL from PREFETCH_TTL)"""
+    return _prefetcher.get()
+
+
+def register_specialist(agent) -> None:
+    """Make agent (a SpecialistPrefetchMixin agent) a prefetch target for its route"""
+    _specialists[agent.route] = agent
+
+
+def _prefetch_on_transfer(call_id: str, url: str, call_data: Dict[str, Any]) -> None:
+    get_prefetcher().prefetch(call_id, urlparse(url).path.rstrip("/") or "/", call_data.get("summary", ""))
+
+
+add_transfer_listener(_prefetch_on_transfer)
+
+
+class SpecialistPrefetchMixin:
+    """
+    Serve a specialist's transferred SWML fetch from the call's prefetched entry
+
+    Must come before TransferContextMixin and CachedSWMLMixin in the bases,
+    and the agent needs a `knowledge` search skill.
+    """
+
+    def on_swml_request(self, request_data=None, callback_path=None, request=None):
+        modifications = super().on_swml_request(request_data, callback_path, request)
+        global_data = (modifications or {}).get("global_data")
+        if not global_data or "call_data" not in global_data:
+            return modifications
+        # Transferred call with restored context: add what the prefetch found
+        entry = get_prefetcher().get(request_call_id(request_data), self.route)
+        knowledge = entry.knowledge_text() if entry is not None else None
+        call_data = {**global_data["call_data"], "knowledge": knowledge or "nothing looked up yet"}
+        return {**modifications, "global_data": {**global_data, "call_data": call_data}}
+
+    def prerender_transfer_swml(self, call_id: str):
+        """This agent's transfer SWML for call_id, rendered ahead of the fetch"""
+        modifications = self.on_swml_request(None, None, swml_request(self.route, "transfer=true"))
+        return super()._render_swml(call_id, modifications)
+
+    def _render_swml(self, call_id: str = None, modifications: Optional[dict] = None):
+        request = (modifications or {}).get("__request")
+        if call_id and request is not None and request.query_params.get("transfer") == "true":
+            entry = get_prefetcher().take(call_id, self.route)
+            if entry is not None and entry.document is not None and entry.base_url == self._resolved_base_url():
+                global_data = modifications.get("global_data")
+                if global_data:
+                    return merge_global_data(entry.document, global_data)
+                return entry.document
+        return super()._render_swml(call_id, modifications)
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Warm-up, readiness and pre-fork multi-worker mode for the PC Builder server
+
+The whole application - agents, prompts, the SWML render cache, the mapped
+knowledge store and the query embedding model - is built and warmed once in
+the parent, which then forks N uvicorn workers. Workers start ready, share
+everything built before the fork as copy-on-write pages, and share the SWAIG
+token secret, so a token minted by one worker validates on any other (which
+is not the case with `uvicorn --workers`, where each worker re-imports the
+app).
+
+    python pc_builder_service.py --workers 4 [--reuse-port]
+
+By default the parent binds one listening socket that every worker accepts
+from; with --reuse-port each worker binds its own SO_REUSEPORT socket and the
+kernel spreads connections between them. The parent only supervises: it
+restarts workers that die and forwards SIGTERM/SIGINT for a graceful stop.
+
+Anything that can't cross a fork is re-created per worker: the knowledge
+store watcher, the call context and ticket stores' SQLite connections and the
+async tool loop. Per-process state stays per process: /metrics reports the
+worker that answered, and the in-memory call context store can't follow a
+transfer to another worker, so multi-worker mode defaults
+USE_DATABASE_CONTEXT to true.
+
+/ready answers 503 while a warm-up is running; /health stays 200 (the process
+is alive) and reports the warm-up status. A single-worker server opens its
+port before warming up, in the background: the search skills defer their
+heavy imports (embedding model, NLTK) to the warm-up or their first search,
+so a restarted instance starts listening without waiting for them.
+"""
+
+import gc
+import os
+import signal
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from signalwire_agents.core.logging_config import get_logger
+from starlette.requests import Request
+
+from async_tools import run_awaitable
+from call_context import close_context_store
+from http_cache import PreserializedJSON
+from http_client import get_http_client
+from integrations import get_inventory, get_ticketing
+from knowledge_store import KnowledgeStoreWatcher, SharedStoreSearchEngine, get_knowledge_store
+from support_tickets import close_ticket_store
+
+logger = get_logger(__name__)
+
+WARMUP_QUERY = "computer won't boot after installing new graphics card"
+GRACEFUL_TIMEOUT = 30.0
+
+
+def swml_request(route: str, query: str) -> Request:
+    """A bare GET request for route's SWML, for rendering outside of HTTP"""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": route or "/",
+        "query_string": query.encode(),
+        "headers": [],
+    })
+
+
+def warm_up(server) -> Dict[str, float]:
+    """
+    Do the first-request work ahead of traffic
+
+    Loads the search skills (whose search dependencies are imported on first
+    use), faults in every page of the knowledge store, loads or builds the
+    IVF indexes of skills searching approximately, runs one knowledge search
+    per agent (loading the query embedding model), renders each route's
+    SWML into the render cache and, when a back end is configured, creates
+    the tool loop's HTTP client.
+
+    Returns:
+        Milliseconds spent per stage
+    """
+    timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(name: str):
+        start = time.perf_counter()
+        yield
+        timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    with stage("search_skills"):
+        for agent in server.agents.values():
+            knowledge = getattr(agent, "knowledge", None)
+            if knowledge is not None and hasattr(knowledge, "load"):
+                knowledge.load()
+    with stage("knowledge_store"):
+        store = get_knowledge_store()
+        if store is not None:
+            store.prefault()
+    with stage("ann_index"):
+        for agent in server.agents.values():
+            engine = getattr(getattr(agent, "knowledge", None), "search_engine", None)
+            if isinstance(engine, SharedStoreSearchEngine):
+                engine.ann_index(engine.store, wait=True)
+    with stage("query_embedding"):
+        for agent in server.agents.values():
+            knowledge = getattr(agent, "knowledge", None)
+            if knowledge is not None:
+                knowledge.search(WARMUP_QUERY)
+    with stage("swml_render"):
+        for route, agent in server.agents.items():
+            for query in ("", "transfer=true"):
+                agent._render_swml(None, agent.on_swml_request(None, None, swml_request(route, query)))
+    with stage("http_client"):
+        if get_ticketing() or get_inventory():
+            run_awaitable(get_http_client().open())
+    return timings
+
+
+class WarmupState:
+    """
+    Progress of the server's warm-up, for the readiness endpoint
+
+    A server that is never warmed up counts as ready, so embedding the app
+    elsewhere (gunicorn, tests) behaves as before.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._done = threading.Event()
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return not self._started or self._done.is_set()
+
+    @property
+    def phase(self) -> str:
+        """'not_started', 'running' or 'done'"""
+        if not self._started:
+            return "not_started"
+        return "done" if self._done.is_set() else "running"
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout) if self._started else True
+
+    def run(self, server) -> "WarmupState":
+        """Warm up in the calling thread"""
+        self._started = True
+        start = time.perf_counter()
+        try:
+            self.timings = warm_up(server)
+        except Exception as e:
+            # A cold server still works; it just pays on the first requests
+            self.error = str(e)
+            logger.error("warmup_failed", error=self.error)
+        finally:
+            self._done.set()
+        logger.info("warmup_complete", ms=round((time.perf_counter() - start) * 1000, 1), **self.timings)
+        return self
+
+    def start(self, server) -> "WarmupState":
+        """Warm up in a background thread; /ready answers 503 until it finishes"""
+        self._started = True
+        threading.Thread(target=self.run, args=(server,), name="warmup", daemon=True).start()
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = {"ready": self.ready, "stages_ms": self.timings}
+        if self.error:
+            status["error"] = self.error
+        return status
+
+
+def install_health_endpoints(server) -> None:
+    """
+    Replace the SDK's /health and /ready with versions that report warm-up
+
+    Both bodies only change with the warm-up phase, so each is serialized
+    once per phase (and per worker, for the pid) and served with an ETag.
+    """
+    server.app.router.routes[:] = [
+        route for route in server.app.router.routes if getattr(route, "path", None) not in ("/health", "/ready")
+    ]
+    documents: Dict[Tuple[str, str, int], PreserializedJSON] = {}
+
+    def document(endpoint: str) -> PreserializedJSON:
+        key = (endpoint, server.warmup.phase, os.getpid())
+        cached = documents.get(key)
+        if cached is None:
+            ready = server.warmup.ready
+            if endpoint == "/health":
+                cached = PreserializedJSON({
+                    "status": "ok" if ready else "warming_up",
+                    "agents": len(server.agents),
+                    "routes": list(server.agents.keys()),
+                    "pid": os.getpid(),
+                    "warmup": server.warmup.to_dict(),
+                })
+            else:
+                cached = PreserializedJSON({
+                    "status": "ready" if ready else "warming_up",
+                    "agents": len(server.agents),
+                    "pid": os.getpid(),
+                    "warmup": server.warmup.to_dict(),
+                }, status_code=200 if ready else 503)
+            documents[key] = cached
+        return cached
+
+    @server.app.get("/health")
+    async def health_check(request: Request):
+        return document("/health").response(request)
+
+    @server.app.get("/ready")
+    async def readiness_check(request: Request):
+        return document("/ready").response(request)
+
+
+def _ssl_options() -> Dict[str, str]:
+    """uvicorn SSL settings from the same SWML_SSL_* variables AgentServer.run() reads"""
+    if os.getenv("SWML_SSL_ENABLED", "").lower() not in ("true", "1", "yes"):
+        return {}
+    cert, key = os.getenv("SWML_SSL_CERT_PATH"), os.getenv("SWML_SSL_KEY_PATH")
+    if not cert or not key or not os.path.exists(cert) or not os.path.exists(key):
+        logger.warning("ssl_files_missing", cert=cert, key=key)
+        return {}
+    return {"ssl_certfile": cert, "ssl_keyfile": key}
+
+
+def _listen(host: str, port: int, reuse_port: bool = False) -> socket.socket:
+    # An explicit IPPROTO_TCP matters: asyncio only sets TCP_NODELAY on accepted
+    # sockets whose proto says TCP, and without it responses wait on delayed ACKs
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _exit_worker(signum, frame) -> None:
+    raise SystemExit(0)
+
+
+class PreforkSupervisor:
+    """
+    Fork, watch and stop the worker processes
+
+    Workers accept from sock when given, otherwise each binds its own
+    SO_REUSEPORT socket.
+    """
+
+    def __init__(self, server, workers: int, host: str, port: int, sock: Optional[socket.socket] = None):
+        self.server = server
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.sock = sock
+        self.children: Dict[int, Tuple[int, float]] = {}  # pid -> (worker index, started)
+        self._stopping = False
+        self._watcher = server.knowledge_watcher
+
+    def spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._serve_worker(index)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 0
+            except BaseException as e:
+                logger.error("worker_failed", worker=index, error=str(e))
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = (index, time.monotonic())
+
+    def _serve_worker(self, index: int) -> None:
+        import uvicorn
+
+        # uvicorn installs its own handlers for a graceful shutdown, then re-raises
+        # the signal against these; exiting through SystemExit lets cleanup run
+        signal.signal(signal.SIGTERM, _exit_worker)
+        signal.signal(signal.SIGINT, _exit_worker)
+        if self._watcher is not None:
+            self.server.knowledge_watcher = KnowledgeStoreWatcher(self._watcher.path, self._watcher.interval).start()
+        sock = self.sock if self.sock is not None else _listen(self.host, self.port, reuse_port=True)
+        logger.info("worker_started", worker=index, pid=os.getpid())
+        config = uvicorn.Config(self.server.app, log_level=self.server.log_level, **_ssl_options())
+        try:
+            uvicorn.Server(config).run(sockets=[sock])
+        finally:
+            # The worker leaves through os._exit, which skips atexit: flush this
+            # process's buffered context and ticket writes here
+            close_context_store()
+            close_ticket_store()
+
+    def _stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for index in range(self.workers):
+            self.spawn(index)
+
+        while not self._stopping:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+            if pid not in self.children:
+                continue
+            index, started = self.children.pop(pid)
+            logger.warning("worker_exited", worker=index, pid=pid, status=status)
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)  # don't spin if workers die on start
+            if not self._stopping:
+                self.spawn(index)
+
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        while self.children and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.1)
+            else:
+                self.children.pop(pid, None)
+        for pid in self.children:
+            logger.warning("worker_killed", pid=pid)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.children.clear()
+
+
+def serve(server, workers: int, host: Optional[str] = None, port: Optional[int] = None,
+          reuse_port: bool = False) -> None:
+    """
+    Warm the server up, then serve it from `workers` forked uvicorn processes
+
+    Blocks until SIGTERM or SIGINT, then stops the workers gracefully.
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Multi-worker mode needs os.fork(); run a single worker on this platform")
+    host = host or server.host
+    port = port or server.port
+
+    if os.environ.setdefault("USE_DATABASE_CONTEXT", "true").lower() not in ("1", "true", "yes"):
+        logger.warning("memory_context_store_with_workers",
+                       detail="transfers only keep their context when both legs hit the same worker")
+
+    # Only workers poll for a rebuilt store; the parent never serves a search
+    if server.knowledge_watcher is not None:
+        server.knowledge_watcher.stop()
+    server.warmup.run(server)
+
+    sock = None if reuse_port else _listen(host, port)
+    # Keep the warmed heap out of the collector so workers don't dirty the shared pages
+    gc.collect()
+    gc.freeze()
+    logger.info("prefork_starting", workers=workers, host=host, port=port, reuse_port=reuse_port)
+    PreforkSupervisor(server, workers, host, port, sock=sock).run()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Lazily created process-wide objects that are rebuilt after fork
+
+Threads, event loops, pools and database connections don't survive fork:
+a pre-forked worker that inherited the parent's executor would queue work
+for threads that no longer exist. A ProcessLocal creates its object on
+first use in each process, so a forked worker builds its own.
+
+    _executor = ProcessLocal(lambda: SearchExecutor(...))
+
+    def get_search_executor() -> SearchExecutor:
+        return _executor.get()
+"""
+
+import os
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ProcessLocal(Generic[T]):
+    """One factory() result per process, created on the first get() in it"""
+
+    __slots__ = ("_factory", "_value", "_pid", "_lock")
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._value = self._factory()
+                    # Published after the value, so a reader that sees the pid sees the value
+                    self._pid = os.getpid()
+        return self._value
+
+    def pop(self) -> Optional[T]:
+        """Forget and return this process's object, or None if it never created one"""
+        with self._lock:
+            if self._pid != os.getpid():
+                return None
+            value, self._value, self._pid = self._value, None, None
+        return value
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Prompt compiler for the PC Builder agents' POM prompts
+
+Every SWML fetch ships the agent's whole POM prompt, and the LLM reads it
+on every turn, so prompt size is per-turn latency and cost. The compiler
+renders each route's SWML once per variant (direct call and transfer=true,
+so dynamic sections are included), counts tokens per section of the
+prompt as the LLM sees it (the POM rendered to markdown) and compares each
+route with its budget in prompt_budgets.json.
+
+Tokens are counted with tiktoken's cl100k_base when it is installed and
+estimated otherwise (word pieces of up to 4 letters, digits in threes,
+one token per symbol), which is close enough to track growth.
+
+The compact variant (PROMPT_VARIANT=compact, or compact_pom()) is the same
+prompt with:
+- a shared preamble section (company and house rules common to all agents)
+  in place of each agent restating them,
+- each "AI Role" persona cut to its first sentence,
+- lead-in bodies that only introduce a bullet list ("Key guidelines:") dropped,
+- bullets already said earlier in the prompt, or contained in an earlier
+  bullet, dropped.
+
+Usage:
+    python prompt_compiler.py                  # per-section report, full vs compact
+    python prompt_compiler.py --check          # exit 1 if a route is over budget
+    python prompt_compiler.py --write-budgets  # record current sizes plus headroom
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from signalwire_pom import PromptObjectModel
+
+DEFAULT_BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompt_budgets.json")
+# Headroom --write-budgets leaves over the current size
+BUDGET_HEADROOM = 1.10
+
+VARIANTS = {"direct": "", "transfer": "transfer=true"}
+
+_PIECE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_WORD = re.compile(r"[a-z0-9$]+")
+_STOP_WORDS = frozenset("a an and are as at be by for from in is it of on or the their them they to with your you".split())
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def tokenizer_name() -> str:
+    return "cl100k_base" if _encoding() is not None else "estimate"
+
+
+def count_tokens(text: str) -> int:
+    """LLM tokens in text (cl100k_base if tiktoken is installed, otherwise an estimate)"""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    tokens = 0
+    for piece in _PIECE.findall(text):
+        if piece.isalpha():
+            tokens += (len(piece) + 3) // 4
+        elif piece.isdigit():
+            tokens += (len(piece) + 2) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+def render_markdown(sections: List[Dict[str, Any]]) -> str:
+    """POM sections as the markdown prompt the LLM receives"""
+    return PromptObjectModel.from_json(sections).render_markdown() if sections else ""
+
+
+def _words(text: str) -> frozenset:
+    return frozenset(w for w in _WORD.findall(text.lower()) if w not in _STOP_WORDS)
+
+
+def compact_pom(sections: List[Dict[str, Any]], preamble: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    The compact variant of a POM prompt (see the module docstring for the rules)
+
+    Args:
+        sections: POM sections as returned by get_prompt()
+        preamble: Shared section to lead with; its title is also cut from the persona
+            ("... at PC Builder Pro.")
+
+    Returns:
+        New sections; the input is not modified
+    """
+    compacted = [dict(preamble)] if preamble else []
+    seen: List[frozenset] = [_words(b) for b in (preamble or {}).get("bullets", [])]
+    for section in sections:
+        section = dict(section)
+        body = section.get("body", "")
+        if section.get("title") == "AI Role" and body:
+            body = re.split(r"(?<=[.!?])\s+", body.strip(), maxsplit=1)[0]
+            if preamble:
+                body = body.replace(f" at {preamble['title']}", "")
+        bullets = []
+        for bullet in section.get("bullets", []):
+            words = _words(bullet)
+            if any(words == earlier or (len(words) >= 3 and words <= earlier) for earlier in seen):
+                continue
+            seen.append(words)
+            bullets.append(bullet)
+        if bullets and body.endswith(":") and len(body.split()) <= 10:
+            body = ""
+        if body:
+            section["body"] = body
+        else:
+            section.pop("body", None)
+        if bullets:
+            section["bullets"] = bullets
+        else:
+            section.pop("bullets", None)
+        if section.get("body") or section.get("bullets") or section.get("subsections"):
+            compacted.append(section)
+    return compacted
+
+
+class CompactPromptMixin:
+    """
+    Serve the compact prompt variant when PROMPT_VARIANT=compact
+
+    Set prompt_preamble on the agent class to the shared preamble section.
+    Comes after InstrumentedAgentMixin so pom_render timings include it.
+    """
+
+    prompt_preamble: Optional[Dict[str, Any]] = None
+
+    def get_prompt(self):
+        prompt = super().get_prompt()
+        if isinstance(prompt, list) and os.getenv("PROMPT_VARIANT", "full") == "compact":
+            return compact_pom(prompt, self.prompt_preamble)
+        return prompt
+
+
+def section_report(sections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{"title": s.get("title", ""), "tokens": count_tokens(render_markdown([s]))} for s in sections]
+
+
+def shipped_prompt(agent, route: str, query: str) -> List[Dict[str, Any]]:
+    """The POM sections in the SWML the agent serves for route?query"""
+    from prefork import swml_request
+
+    document = agent._render_swml(None, agent.on_swml_request(None, None, swml_request(route, query)))
+    if isinstance(document, (bytes, str)):
+        document = json.loads(document)
+    ai = next(verb["ai"] for verb in document["sections"]["main"] if "ai" in verb)
+    prompt = ai["prompt"]
+    return prompt["pom"] if "pom" in prompt else [{"title": "", "body": prompt.get("text", "")}]
+
+
+def compile_prompts(server) -> List[Dict[str, Any]]:
+    """
+    Render every route's prompt per variant and count its tokens
+
+    Returns:
+        One report per (route, variant): tokens per section and in total for
+        the prompt as shipped and its compact variant
+    """
+    reports = []
+    for route, agent in server.agents.items():
+        for variant, query in VARIANTS.items():
+            sections = shipped_prompt(agent, route, query)
+            compact = compact_pom(sections, getattr(agent, "prompt_preamble", None))
+            reports.append({
+                "route": route or "/",
+                "variant": variant,
+                "sections": section_report(sections),
+                "tokens": count_tokens(render_markdown(sections)),
+                "compact_sections": section_report(compact),
+                "compact_tokens": count_tokens(render_markdown(compact)),
+            })
+    return reports
+
+
+def load_budgets(path: str = DEFAULT_BUDGET_FILE) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def check_budgets(reports: List[Dict[str, Any]], budgets: Dict[str, Any]) -> List[str]:
+    """
+    Budget violations, one message each
+
+    budgets is {"tokenizer": ..., "routes": {"/sales": {"direct": 600, ...}}};
+    a route or variant without a budget is a violation too, so new routes
+    get one.
+    """
+    problems = []
+    if budgets.get("tokenizer") not in (None, tokenizer_name()):
+        problems.append(f"budgets were counted with {budgets['tokenizer']}, this run uses {tokenizer_name()}")
+    for report in reports:
+        limit = budgets.get("routes", {}).get(report["route"], {}).get(report["variant"])
+        if limit is None:
+            problems.append(f"{report['route']} ({report['variant']}): no budget")
+        elif report["tokens"] > limit:
+            problems.append(f"{report['route']} ({report['variant']}): {report['tokens']} tokens, budget {limit}")
+    return problems
+
+
+def budgets_for(reports: List[Dict[str, Any]], headroom: float = BUDGET_HEADROOM) -> Dict[str, Any]:
+    routes: Dict[str, Dict[str, int]] = {}
+    for report in reports:
+        routes.setdefault(report["route"], {})[report["variant"]] = int(report["tokens"] * headroom)
+    return {"tokenizer": tokenizer_name(), "routes": routes}
+
+
+def print_report(reports: List[Dict[str, Any]]) -> None:
+    print(f"Prompt tokens per route ({tokenizer_name()}; compact = PROMPT_VARIANT=compact)")
+    for report in reports:
+        saved = report["tokens"] - report["compact_tokens"]
+        print(f"\n{report['route']} ({report['variant']}): {report['tokens']} tokens, "
+              f"compact {report['compact_tokens']} (-{saved}, {saved / max(report['tokens'], 1):.0%})")
+        compact = {s["title"]: s["tokens"] for s in report["compact_sections"]}
+        for section in report["sections"]:
+            print(f"  {section['title']:<28} {section['tokens']:>5} {compact.get(section['title'], 0):>7}")
+        for title, tokens in compact.items():
+            if title not in {s["title"] for s in report["sections"]}:
+                print(f"  {title + ' (shared)':<28} {'':>5} {tokens:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report and check the agents' prompt token budgets")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any route exceeds its budget")
+    parser.add_argument("--budgets", default=DEFAULT_BUDGET_FILE, help="budget file")
+    parser.add_argument("--write-budgets", action="store_true",
+                        help=f"write current sizes x {BUDGET_HEADROOM} to the budget file")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SIGNALWIRE_LOG_MODE", "off")
+    # Transfer URLs embed the basic auth credentials, which are random per
+    # process by default; fixed ones of the default length keep counts stable
+    os.environ["SWML_BASIC_AUTH_USER"] = "signalwire"
+    os.environ["SWML_BASIC_AUTH_PASSWORD"] = "x" * 43
+    from pc_builder_service import create_pc_builder_app
+
+    server = create_pc_builder_app(render_cache=False, knowledge_reload_interval=0)
+    reports = compile_prompts(server)
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print_report(reports)
+
+    if args.write_budgets:
+        with open(args.budgets, "w") as f:
+            json.dump(budgets_for(reports), f, indent=2)
+            f.write("\n")
+        print(f"\nWrote {args.budgets}")
+    if args.check:
+        problems = check_budgets(reports, load_budgets(args.budgets))
+        for problem in problems:
+            print(f"OVER BUDGET: {problem}")
+        if problems:
+            sys.exit(1)
+        print("\nAll routes within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Micro-batched query embedding and search for the shared knowledge store
+
+Under load, many calls search the knowledge base at the same moment and each
+would embed its query and scan its partition on its own. The batcher queues
+them instead: one thread waits up to `window` seconds after the first query
+arrives (or until max_batch are queued), embeds the whole batch in one
+encoder pass, then runs one matrix multiply per partition for every query in
+the batch (KnowledgeStore.search_batch), or one against the IVF centroids
+for partitions searched approximately. Queries that arrive while a batch
+is being computed form the next batch, so a busy server batches more and an
+idle one adds at most one window of latency.
+
+QUERY_BATCH_WINDOW_MS (default 1) sets the window and QUERY_BATCH_MAX
+(default 32) the batch size; a window of 0 turns batching off.
+bench_query_batcher.py measures throughput against added latency for a
+range of windows.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from signalwire_agents.core.logging_config import get_logger
+
+from ann_index import DEFAULT_NPROBE
+from metrics import metrics
+from process_local import ProcessLocal
+
+logger = get_logger(__name__)
+
+DEFAULT_BATCH_WINDOW_MS = 1.0
+DEFAULT_MAX_BATCH = 32
+
+
+class _Query:
+    __slots__ = ("store", "partition", "text", "count", "similarity_threshold", "tags", "prepare", "index", "nprobe",
+                 "keyword_weight", "future")
+
+    def __init__(self, store, partition, text, count, similarity_threshold, tags, prepare, index, nprobe,
+                 keyword_weight):
+        self.store = store
+        self.partition = partition
+        self.text = text
+        self.count = count
+        self.similarity_threshold = similarity_threshold
+        self.tags = tags
+        self.prepare = prepare
+        self.index = index
+        self.nprobe = nprobe
+        self.keyword_weight = keyword_weight
+        self.future: Future = Future()
+
+
+class QueryBatcher:
+    """
+    Collects concurrent queries and embeds and searches them a batch at a time
+
+    Args:
+        encode: Embeds a list of texts, returning a len(texts) x D array
+        window: Seconds to wait for more queries after the first one
+        max_batch: Largest batch; a full batch starts without waiting
+    """
+
+    def __init__(self, encode: Callable[[Sequence[str]], Any],
+                 window: float = DEFAULT_BATCH_WINDOW_MS / 1000,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        self.encode = encode
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: Deque[_Query] = deque()
+        self._ready = threading.Condition()
+        self._closed = False
+        self.batches = 0
+        self.queries = 0
+        self._thread = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, store, partition: str, text: str, count: int = 3, similarity_threshold: float = 0.0,
+               tags: Optional[List[str]] = None, prepare: Optional[Callable[[str], str]] = None,
+               index=None, nprobe: int = DEFAULT_NPROBE, keyword_weight: float = 0.0) -> Future:
+        """
+        Queue a search of store's partition for text
+
+        Args:
+            prepare: Optional text -> text step (query expansion) run on the
+                batcher thread before embedding
+            index, nprobe: The partition's ANN index and probe count, as for
+                KnowledgeStore.search (exact search if index is None)
+            keyword_weight: BM25 share of the fused score for text (0 for
+                cosine alone)
+
+        Returns:
+            A Future resolving to the results in search engine format
+        """
+        query = _Query(store, partition, text, count, similarity_threshold, tags, prepare, index, nprobe,
+                       keyword_weight)
+        with self._ready:
+            self._queue.append(query)
+            self._ready.notify()
+        return query.future
+
+    def _next_batch(self) -> List[_Query]:
+        with self._ready:
+            while not self._queue and not self._closed:
+                self._ready.wait()
+            if self._closed:
+                return []
+            deadline = time.monotonic() + self.window
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._ready.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            try:
+                self._process(batch)
+            except Exception as e:
+                logger.error("query_batch_failed", size=len(batch), error=str(e))
+                for query in batch:
+                    if not query.future.done():
+                        query.future.set_exception(e)
+
+    def _process(self, batch: List[_Query]) -> None:
+        import numpy as np
+
+        ready: List[Tuple[_Query, str]] = []
+        for query in batch:
+            try:
+                ready.append((query, query.prepare(query.text) if query.prepare else query.text))
+            except Exception as e:
+                query.future.set_exception(e)
+        if not ready:
+            return
+
+        with metrics.timer("query_embedding", "batch"):
+            vectors = np.asarray(self.encode([text for _, text in ready]), dtype=np.float32)
+
+        groups: Dict[Tuple, List[int]] = {}
+        for index, (query, _) in enumerate(ready):
+            key = (id(query.store), query.partition, id(query.index), query.nprobe)
+            groups.setdefault(key, []).append(index)
+        for indexes in groups.values():
+            first = ready[indexes[0]][0]
+            with metrics.timer("vector_search", first.partition):
+                results = first.store.search_batch(
+                    first.partition, vectors[indexes], max(ready[i][0].count for i in indexes),
+                    index=first.index, nprobe=first.nprobe,
+                    query_texts=[ready[i][0].text for i in indexes],
+                    keyword_weights=[ready[i][0].keyword_weight for i in indexes],
+                    tags=[ready[i][0].tags for i in indexes]
+                )
+            for index, rows in zip(indexes, results):
+                query = ready[index][0]
+                # Rows are best first, so thresholding the batch's top rows is the same as thresholding first
+                rows = [row for row in rows if row["score"] >= query.similarity_threshold]
+                query.future.set_result(rows[:query.count])
+
+        self.batches += 1
+        self.queries += len(ready)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "queries": self.queries,
+            "mean_batch": round(self.queries / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+
+def sentence_transformer_encoder(model_name: Optional[str]) -> Callable[[Sequence[str]], Any]:
+    """Batch encoder over the SDK's cached query model, so both paths share one model"""
+    from signalwire_agents.search.query_processor import _get_cached_model
+
+    def encode(texts: Sequence[str]):
+        model = _get_cached_model(model_name)
+        if model is None:
+            raise RuntimeError(f"Query embedding model {model_name} is unavailable")
+        return model.encode(list(texts), batch_size=len(texts), show_progress_bar=False, convert_to_numpy=True)
+    return encode
+
+
+# Batcher per query model
+_batchers: ProcessLocal[Dict[Optional[str], QueryBatcher]] = ProcessLocal(dict)
+_batchers_lock = threading.Lock()
+
+
+def get_query_batcher(model_name: Optional[str]) -> Optional[QueryBatcher]:
+    """
+    Process-wide batcher for a query model, or None when batching is off
+
+    Configured by QUERY_BATCH_WINDOW_MS and QUERY_BATCH_MAX.
+    """
+    window_ms = float(os.getenv("QUERY_BATCH_WINDOW_MS", str(DEFAULT_BATCH_WINDOW_MS)))
+    if window_ms <= 0:
+        return None
+    batchers = _batchers.get()
+    with _batchers_lock:
+        batcher = batchers.get(model_name)
+        if batcher is None:
+            batcher = batchers[model_name] = QueryBatcher(
+                sentence_transformer_encoder(model_name),
+                window=window_ms / 1000,
+                max_batch=int(os.getenv("QUERY_BATCH_MAX", str(DEFAULT_MAX_BATCH))),
+            )
+    return batcher
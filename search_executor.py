@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Bounded, coalescing executor for knowledge searches
+
+Query embedding and the similarity search are CPU-bound, so they run on a
+small thread pool (numpy and torch release the GIL while they compute)
+rather than on the thread serving the request:
+
+- Bounded: at most max_pending searches are queued or running. Past that,
+  submit() raises SearchBusy straight away instead of queueing work the pool
+  can't finish within anyone's timeout.
+- Timeouts: callers wait at most `timeout` seconds and get SearchTimeout.
+  The search itself keeps running, so its result still reaches the caller's
+  result cache for the next request.
+- Single-flight: identical searches in flight (same key) share one
+  computation, so a burst of "PC won't turn on" embeds and searches once.
+
+    from search_executor import get_search_executor
+
+    results = get_search_executor().run(key, compute)          # blocking
+    results = await get_search_executor().run_async(key, compute)
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from signalwire_agents.core.logging_config import get_logger
+
+from process_local import ProcessLocal
+
+logger = get_logger(__name__)
+
+DEFAULT_SEARCH_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_PENDING = 64
+DEFAULT_SEARCH_TIMEOUT = 2.0
+
+
+class SearchBusy(RuntimeError):
+    """Raised when the executor already has max_pending searches in flight"""
+
+
+class SearchTimeout(TimeoutError):
+    """Raised when a search doesn't finish within the caller's timeout"""
+
+
+class SearchExecutor:
+    """Thread pool for searches with a pending bound, timeouts and single-flight"""
+
+    def __init__(self, workers: int = DEFAULT_SEARCH_WORKERS, max_pending: int = DEFAULT_MAX_PENDING,
+                 timeout: float = DEFAULT_SEARCH_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def submit(self, key: Hashable, fn: Callable[[], Any], direct: bool = False) -> Future:
+        """
+        Start fn() for key, or join the search already running for it
+
+        With direct=True, fn is called in the caller's thread and must return
+        a Future of its own (work handed to the query batcher), so no pool
+        thread sits waiting on it.
+
+        Raises:
+            SearchBusy: If max_pending searches are already in flight
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            if len(self._inflight) >= self.max_pending:
+                self.rejected += 1
+                raise SearchBusy(f"{len(self._inflight)} searches already in flight")
+            future = fn() if direct else self._pool.submit(fn)
+            self._inflight[key] = future
+            self.submitted += 1
+        future.add_done_callback(lambda _, key=key: self._finished(key, future))
+        return future
+
+    def _finished(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def run(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None,
+            direct: bool = False) -> Any:
+        """Block until the (possibly shared) search for key finishes and return its result"""
+        future = self.submit(key, fn, direct)
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            self.timeouts += 1
+            raise SearchTimeout(f"search did not finish in {self.timeout if timeout is None else timeout}s")
+
+    async def run_async(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None,
+                        direct: bool = False) -> Any:
+        """Await the (possibly shared) search for key without blocking the event loop"""
+        future = self.submit(key, fn, direct)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            # Shielded: a caller giving up must not cancel a search others are waiting on
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise SearchTimeout(f"search did not finish in {timeout}s")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._inflight)
+        return {
+            "workers": self.workers,
+            "pending": pending,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+
+_executor = ProcessLocal(lambda: SearchExecutor(
+    workers=int(os.getenv("SEARCH_WORKERS", str(DEFAULT_SEARCH_WORKERS))),
+    max_pending=int(os.getenv("SEARCH_MAX_PENDING", str(DEFAULT_MAX_PENDING))),
+    timeout=float(os.getenv("SEARCH_TIMEOUT", str(DEFAULT_SEARCH_TIMEOUT))),
+))
+
+
+def get_search_executor() -> SearchExecutor:
+    """
+    Process-wide search executor, created on first use
+
+    Sized by SEARCH_WORKERS (default min(4, CPUs)), SEARCH_MAX_PENDING
+    (default 64) and SEARCH_TIMEOUT seconds (default 2).
+    """
+    return _executor.get()
@@ -128,7 +128,7 @@ def main():
     
     print("\n📚 Checking knowledge bases...")
     missing_files = []
-    for source, target in kb_files.items():
+    for source in kb_files:
         if not os.path.exists(source):
             missing_files.append(source)
             print(f"❌ Missing: {source}")
@@ -142,11 +142,14 @@ def main():
     
     # Ask if user wants to build search indexes
     print("\n🔍 RAG Search Setup")
-    print("Would you like to build the search indexes now?")
+    print("Would you like to build (or refresh) the search indexes now?")
     print("This enables RAG search capabilities for the agents.")
+    print("Only sections that changed since the last build are re-embedded.")
     response = input("Build search indexes? (y/n): ").lower().strip()
     
     if response == 'y':
+        # Per-agent .swsearch indexes: what a search skill falls back to when
+        # the shared knowledge store is unavailable
         print("\n🏗️  Building search indexes...")
         for source, target in kb_files.items():
             if os.path.exists(target):
@@ -161,6 +164,15 @@ def main():
                 print(f"   sw-search {source} --output {target}")
             else:
                 print(f"✅ Successfully built {target}")
+        
+        print("\n🏗️  Updating knowledge store...")
+        if not run_command(f"{python_cmd} knowledge_indexer.py"):
+            print("❌ Failed to update the knowledge store")
+            print("💡 You can run it manually later with:")
+            print("   python knowledge_indexer.py")
+        else:
+            print("✅ Knowledge store is up to date")
+            print("💡 Running agents reload it automatically - no restart needed")
     
     # Create .env file if it doesn't exist
     if not os.path.exists(".env"):
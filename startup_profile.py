@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Startup profile for the PC Builder server (pc_builder_service.py --profile-startup)
+
+Starts the service the way `python pc_builder_service.py` does, in a fresh
+interpreter run with `python -X importtime`, and reports where the time
+goes before the port opens and before /ready:
+
+- import:  importing pc_builder_service (the SDK, FastAPI, our modules)
+- build:   create_pc_builder_app() - agents, prompts, skill setup; the
+           port opens after this
+- warm_up: the background warm-up, per stage (search skill loading, the
+           knowledge store, the query embedding model, SWML renders)
+
+Import time is broken down by top-level package and phase, so a heavy
+dependency that creeps back into the import or build phase shows up there.
+Nothing is served.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List
+
+PHASES = ("import", "build", "warm_up")
+_MARKER = "startup_profile phase: "
+
+# Runs in the fresh interpreter; phase markers go to stderr between the importtime lines
+_CHILD_SCRIPT = f"""
+import json, sys, time
+timings = {{}}
+def phase(name):
+    print({_MARKER!r} + name, file=sys.stderr, flush=True)
+    return time.perf_counter()
+start = phase("import")
+import pc_builder_service
+start, timings["import"] = phase("build"), (time.perf_counter() - start) * 1000
+server = pc_builder_service.create_pc_builder_app(knowledge_reload_interval=0)
+start, timings["build"] = phase("warm_up"), (time.perf_counter() - start) * 1000
+server.warmup.run(server)
+timings["warm_up"] = (time.perf_counter() - start) * 1000
+print(json.dumps({{"phases_ms": timings, "stages_ms": server.warmup.timings, "error": server.warmup.error}}))
+"""
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, float]]:
+    """
+    Self import time in ms per top-level package and phase, from -X importtime output
+
+    Returns:
+        {package: {phase: ms}}
+    """
+    packages: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    phase = "interpreter"
+    for line in stderr.splitlines():
+        if line.startswith(_MARKER):
+            phase = line[len(_MARKER):].strip()
+            continue
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, module = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        packages[module.strip().split(".")[0]][phase] += int(self_us) / 1000
+    return packages
+
+
+def run_profile() -> Dict[str, Any]:
+    """Profile one start of the service in a fresh interpreter"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "SIGNALWIRE_LOG_MODE": os.getenv("SIGNALWIRE_LOG_MODE", "off")}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _CHILD_SCRIPT],
+                          cwd=root, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Profiled startup failed:\n{proc.stderr[-2000:]}")
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    report["imports_ms"] = parse_importtime(proc.stderr)
+    return report
+
+
+def print_profile(report: Dict[str, Any], top: int = 15) -> None:
+    phases = report["phases_ms"]
+    print("Startup profile (fresh interpreter, python -X importtime)")
+    print(f"  {'import':<24} {phases['import']:>9.1f} ms")
+    print(f"  {'build':<24} {phases['build']:>9.1f} ms   <- port opens")
+    print(f"  {'warm_up':<24} {phases['warm_up']:>9.1f} ms   <- /ready")
+    for stage, ms in report["stages_ms"].items():
+        print(f"    {stage:<22} {ms:>9.1f} ms")
+    if report.get("error"):
+        print(f"  warm-up failed: {report['error']}")
+
+    imports: Dict[str, Dict[str, float]] = report["imports_ms"]
+    ranked: List = sorted(imports.items(), key=lambda item: -sum(item[1].get(p, 0.0) for p in PHASES))
+    print(f"\nImport time by package, ms (self time; top {top})")
+    print(f"  {'package':<24} " + " ".join(f"{p:>9}" for p in PHASES))
+    for package, by_phase in ranked[:top]:
+        print(f"  {package:<24} " + " ".join(f"{by_phase.get(p, 0.0):>9.1f}" for p in PHASES))
+    totals = [sum(by_phase.get(p, 0.0) for by_phase in imports.values()) for p in PHASES]
+    print(f"  {'(all packages)':<24} " + " ".join(f"{total:>9.1f}" for total in totals))
+
+
+def profile_startup(top: int = 15) -> Dict[str, Any]:
+    """Profile a start of the service and print the breakdown"""
+    report = run_profile()
+    print_profile(report, top)
+    return report
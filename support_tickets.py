@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Support ticket store for the PC Builder support agent
+
+Ticket IDs keep the familiar SUP-YYYYMMDD-HHMMSS prefix followed by a worker
+ID and a per-worker sequence number, e.g. SUP-20261016-143005-3-17:
+
+- Worker IDs are claimed in the database at start-up (the lowest ID not held
+  by a live process on this host), so concurrent processes never share one.
+- Each worker's (second, sequence) pair only moves forward - the sequence
+  resets when the second advances, and if the wall clock steps back the last
+  second is reused - so a worker never repeats an ID. The last second each
+  worker ID used is recorded with every batch, and a process that later
+  claims the ID starts after it.
+
+Tickets live in a WAL-mode SQLite database (TICKET_DB_PATH, default
+pc_builder_tickets.db). create() returns immediately; a background thread
+commits queued tickets in batches with synchronous=FULL, i.e. one fsync per
+batch rather than per ticket. Open tickets are indexed by (status, priority,
+created_at) for priority-ordered queues.
+"""
+
+import atexit
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from signalwire_agents.core.logging_config import get_logger
+
+from process_local import ProcessLocal
+
+logger = get_logger(__name__)
+
+DEFAULT_TICKET_DB_PATH = "pc_builder_tickets.db"
+MAX_WORKERS = 1024
+
+# Highest first; stored as the index into this tuple
+PRIORITIES = ("urgent", "high", "medium", "low")
+
+_PRIORITY_KEYWORDS = (
+    ("urgent", ("urgent", "critical", "emergency", "asap", "p0", "p1")),
+    ("high", ("high", "important", "severe")),
+    ("low", ("low", "minor", "whenever", "p4")),
+)
+
+_COLUMNS = "ticket_id, created_at, priority, status, customer_info, issue, call_id"
+
+
+def normalize_priority(priority: str) -> str:
+    """Map the free-text priority a caller (or the LLM) gives onto PRIORITIES"""
+    text = (priority or "").lower()
+    for level, keywords in _PRIORITY_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return level
+    return "medium"
+
+
+class Ticket:
+    """One support ticket"""
+
+    __slots__ = ("ticket_id", "created_at", "priority", "status", "customer_info", "issue", "call_id")
+
+    def __init__(self, ticket_id: str, created_at: float, priority: str, status: str,
+                 customer_info: str, issue: str, call_id: Optional[str] = None):
+        self.ticket_id = ticket_id
+        self.created_at = created_at
+        self.priority = priority
+        self.status = status
+        self.customer_info = customer_info
+        self.issue = issue
+        self.call_id = call_id
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> "Ticket":
+        ticket_id, created_at, priority, status, customer_info, issue, call_id = row
+        return cls(ticket_id, created_at, PRIORITIES[priority], status, customer_info, issue, call_id)
+
+    def to_row(self) -> Tuple:
+        return (self.ticket_id, self.created_at, PRIORITIES.index(self.priority), self.status,
+                self.customer_info, self.issue, self.call_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class TicketIdGenerator:
+    """Monotonic SUP-YYYYMMDD-HHMMSS-<worker>-<sequence> IDs for one worker"""
+
+    def __init__(self, worker_id: int, clock: Callable[[], float] = time.time, floor: int = 0):
+        self.worker_id = worker_id
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Never mint an ID for a second before floor
+        self._second = floor
+        self._sequence = -1
+
+    def next_id(self) -> Tuple[str, float]:
+        """Return a new ticket ID and the timestamp it was minted at"""
+        now = self._clock()
+        with self._lock:
+            second = int(now)
+            if second > self._second:
+                self._second = second
+                self._sequence = 0
+            else:
+                # Same second, or the clock stepped back: stay on the last second
+                self._sequence += 1
+            second, sequence = self._second, self._sequence
+        stamp = datetime.fromtimestamp(second).strftime("%Y%m%d-%H%M%S")
+        return f"SUP-{stamp}-{self.worker_id}-{sequence}", now
+
+    @property
+    def last_second(self) -> int:
+        return self._second
+
+
+def _windows_process_alive(pid: int) -> bool:
+    """OpenProcess/GetExitCodeProcess; os.kill(pid, 0) would terminate the process on Windows"""
+    import ctypes
+    from ctypes import wintypes
+
+    process_query_limited_information = 0x1000
+    still_active = 259
+    error_access_denied = 5
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    kernel32.GetExitCodeProcess.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+    handle = kernel32.OpenProcess(process_query_limited_information, False, pid)
+    if not handle:
+        # No such process, unless we just aren't allowed to open it
+        return ctypes.get_last_error() == error_access_denied
+    try:
+        exit_code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+            return True
+        return exit_code.value == still_active
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _process_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        return _windows_process_alive(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class TicketStore:
+    """
+    Batched, WAL-mode SQLite ticket store shared across worker processes
+
+    create() queues the ticket and returns it; get() and query() see queued
+    tickets too (query() flushes first). Writers more than max_pending
+    tickets ahead of the database flush inline.
+    """
+
+    def __init__(self, path: str = DEFAULT_TICKET_DB_PATH, batch_size: int = 256,
+                 flush_interval: float = 0.05, max_pending: int = 4096):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._db = sqlite3.connect(path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # FULL: each batch commit is fsynced, so an acknowledged batch survives power loss
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tickets ("
+            " ticket_id TEXT PRIMARY KEY,"
+            " created_at REAL NOT NULL,"
+            " priority INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " customer_info TEXT NOT NULL,"
+            " issue TEXT NOT NULL,"
+            " call_id TEXT"
+            ") WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS tickets_queue ON tickets (status, priority, created_at)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ticket_workers ("
+            " worker_id INTEGER PRIMARY KEY,"
+            " host TEXT NOT NULL,"
+            " pid INTEGER NOT NULL,"
+            " claimed_at REAL NOT NULL,"
+            " last_second INTEGER NOT NULL DEFAULT 0"
+            ")"
+        )
+        self._db_lock = threading.Lock()
+
+        self.worker_id, last_second = self._claim_worker_id()
+        self.ids = TicketIdGenerator(self.worker_id, floor=last_second + 1 if last_second else 0)
+
+        self._pending: List[Ticket] = []
+        self._pending_by_id: Dict[str, Ticket] = {}
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.batches = 0
+        self.tickets_written = 0
+
+        self._thread = threading.Thread(target=self._run, name="ticket-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _claim_worker_id(self) -> Tuple[int, int]:
+        """Take the lowest worker ID not held by a live process; returns it and its last second"""
+        host = socket.gethostname()
+        pid = os.getpid()
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute("SELECT worker_id, host, pid, last_second FROM ticket_workers").fetchall()
+                # Rows for this process belong to other open stores in it
+                held = {worker_id for worker_id, worker_host, worker_pid, _ in rows
+                        if worker_pid > 0 and (worker_host != host or worker_pid == pid or _process_alive(worker_pid))}
+                worker_id = next((i for i in range(MAX_WORKERS) if i not in held), None)
+                if worker_id is None:
+                    raise RuntimeError(f"All {MAX_WORKERS} ticket worker IDs are in use")
+                last_second = next((row[3] for row in rows if row[0] == worker_id), 0)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ticket_workers (worker_id, host, pid, claimed_at, last_second) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (worker_id, host, pid, time.time(), last_second)
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return worker_id, last_second
+
+    def create(self, issue: str, customer_info: str, priority: str = "medium",
+               call_id: Optional[str] = None) -> Ticket:
+        """Open a ticket; it is persisted with the next batch"""
+        ticket_id, created_at = self.ids.next_id()
+        ticket = Ticket(ticket_id, created_at, normalize_priority(priority), "open",
+                        customer_info, issue, call_id)
+        with self._pending_lock:
+            self._pending.append(ticket)
+            self._pending_by_id[ticket_id] = ticket
+            backlog = len(self._pending)
+        if backlog >= self.max_pending:
+            self.flush()
+        elif backlog >= self.batch_size:
+            self._wakeup.set()
+        return ticket
+
+    def get(self, ticket_id: str) -> Optional[Ticket]:
+        with self._pending_lock:
+            ticket = self._pending_by_id.get(ticket_id)
+        if ticket is not None:
+            return ticket
+        with self._db_lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM tickets WHERE ticket_id = ?",
+                                   (ticket_id,)).fetchone()
+        return Ticket.from_row(row) if row else None
+
+    def query(self, priority: Optional[str] = None, status: str = "open", limit: int = 20) -> List[Ticket]:
+        """
+        Tickets with the given status, most urgent first, oldest first within a priority
+
+        Args:
+            priority: Only this priority level (one of PRIORITIES); all when None
+            status: Ticket status to list
+            limit: Maximum number of tickets returned
+        """
+        self.flush()
+        if priority is None:
+            sql = f"SELECT {_COLUMNS} FROM tickets WHERE status = ? ORDER BY priority, created_at LIMIT ?"
+            params = (status, limit)
+        else:
+            sql = (f"SELECT {_COLUMNS} FROM tickets WHERE status = ? AND priority = ? "
+                   "ORDER BY created_at LIMIT ?")
+            params = (status, PRIORITIES.index(normalize_priority(priority)), limit)
+        with self._db_lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [Ticket.from_row(row) for row in rows]
+
+    def counts(self, status: str = "open") -> Dict[str, int]:
+        """Number of tickets per priority level with the given status"""
+        self.flush()
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT priority, COUNT(*) FROM tickets WHERE status = ? GROUP BY priority", (status,)
+            ).fetchall()
+        counts = dict.fromkeys(PRIORITIES, 0)
+        counts.update({PRIORITIES[priority]: count for priority, count in rows})
+        return counts
+
+    def set_status(self, ticket_id: str, status: str) -> bool:
+        """Change a ticket's status; returns False if there is no such ticket"""
+        self.flush()
+        with self._db_lock:
+            updated = self._db.execute("UPDATE tickets SET status = ? WHERE ticket_id = ?",
+                                       (status, ticket_id)).rowcount
+        return bool(updated)
+
+    def flush(self) -> None:
+        """Commit every queued ticket now (one transaction, one fsync)"""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    f"INSERT INTO tickets ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [ticket.to_row() for ticket in batch]
+                )
+                self._db.execute("UPDATE ticket_workers SET last_second = ? WHERE worker_id = ?",
+                                 (self.ids.last_second, self.worker_id))
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                with self._pending_lock:
+                    self._pending[:0] = batch
+                raise
+        with self._pending_lock:
+            for ticket in batch:
+                self._pending_by_id.pop(ticket.ticket_id, None)
+        self.batches += 1
+        self.tickets_written += len(batch)
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error("ticket_write_failed", path=self.path, error=str(e))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5.0)
+        try:
+            self.flush()
+            with self._db_lock:
+                # Keep the row (and its last_second) but mark the ID free
+                self._db.execute("UPDATE ticket_workers SET pid = 0 WHERE worker_id = ? AND pid = ?",
+                                 (self.worker_id, os.getpid()))
+        finally:
+            with self._db_lock:
+                self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {
+            "path": self.path,
+            "worker_id": self.worker_id,
+            "pending": pending,
+            "batches": self.batches,
+            "tickets_written": self.tickets_written,
+        }
+
+
+# A forked child must claim its own worker ID rather than reuse the parent's
+_ticket_store = ProcessLocal(lambda: TicketStore(os.getenv("TICKET_DB_PATH", DEFAULT_TICKET_DB_PATH)))
+
+
+def get_ticket_store() -> TicketStore:
+    """Process-wide ticket store, opened on first use"""
+    return _ticket_store.get()
+
+
+def close_ticket_store() -> None:
+    """Flush pending tickets and release the worker ID if this process opened the store"""
+    store = _ticket_store.pop()
+    if store is not None:
+        store.close()
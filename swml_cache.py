@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+SWML render cache for the PC Builder agents
+
+Rendering a SWML document runs the dynamic config callback on an ephemeral
+copy of the agent (which re-loads every skill), rebuilds the POM prompt and
+resolves webhook URLs. For our agents the output only varies by route, the
+transfer flag and the resolved base URL, so the rendered document is cached
+as pre-serialized JSON bytes keyed on exactly that.
+
+The per-call parts of a document are the SWAIG security tokens, which are
+bound to the call ID, and any per-call global_data (restored transfer
+context). Cached documents keep a slot for each token and splice freshly
+minted tokens in at serve time - a few HMACs instead of a full render - and
+global_data is merged into the served copy's AI verb.
+
+Each cached template has a weak ETag, so a GET whose If-None-Match carries it
+gets a 304 while the template is unchanged. Served documents differ only in
+their freshly minted tokens, which are bound to a new session on a GET. The
+tag is weak because the bytes differ, and documents with per-call global_data
+get no tag.
+"""
+
+import base64
+import contextvars
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import quote_plus, unquote_plus
+
+from signalwire_agents.core.logging_config import get_logger
+
+from http_cache import etag_for, etag_matches, not_modified
+
+logger = get_logger(__name__)
+
+# Call ID used when rendering a template; tokens minted for it become slots
+TEMPLATE_CALL_ID = "swmlcachetemplate"
+
+# Matches the URL-encoded value of a __token query parameter in serialized SWML
+_TOKEN_PATTERN = re.compile(rb"__token=([A-Za-z0-9_\-%.]+)")
+
+# Rendered webhook URLs carry the basic auth credentials: clients may keep a copy, shared caches may not
+SWML_CACHE_CONTROL = "private, no-cache"
+
+# ETag of the cached document the current request was served from, if any
+_served_etag: contextvars.ContextVar = contextvars.ContextVar("swml_served_etag", default=None)
+
+# Agent methods that change what a render produces
+INVALIDATING_METHODS = (
+    "prompt_add_section",
+    "prompt_add_to_section",
+    "prompt_add_subsection",
+    "set_prompt_text",
+    "set_post_prompt",
+    "add_skill",
+    "remove_skill",
+    "define_tool",
+    "add_language",
+    "add_hints",
+    "set_params",
+    "set_global_data",
+    "update_global_data",
+    "set_dynamic_config_callback",
+)
+
+
+class CachedSWMLDocument:
+    """A rendered SWML document split around its per-call token slots"""
+
+    __slots__ = ("segments", "token_functions", "size", "etag")
+
+    def __init__(self, segments: List[bytes], token_functions: List[str]):
+        self.segments = segments
+        self.token_functions = token_functions
+        self.size = sum(len(segment) for segment in segments)
+        # The template up to its token values: what a conditional GET compares
+        self.etag = etag_for(b"\0".join(segments) + "\0".join(token_functions).encode(), weak=True)
+
+    @classmethod
+    def from_rendered(cls, rendered: str) -> "CachedSWMLDocument":
+        """Build a template from a document rendered for TEMPLATE_CALL_ID"""
+        data = rendered.encode("utf-8") if isinstance(rendered, str) else rendered
+        segments = []
+        token_functions = []
+        position = 0
+        for match in _TOKEN_PATTERN.finditer(data):
+            function_name = _template_token_function(match.group(1))
+            if function_name is None:
+                # Not one of ours (e.g. an external webhook) - keep it verbatim
+                continue
+            segments.append(data[position:match.start(1)])
+            token_functions.append(function_name)
+            position = match.end(1)
+        segments.append(data[position:])
+        return cls(segments, token_functions)
+
+    def render(self, session_manager, call_id: str) -> bytes:
+        """Return the document with tokens minted for call_id"""
+        if not self.token_functions:
+            return self.segments[0]
+        parts = [self.segments[0]]
+        for function_name, segment in zip(self.token_functions, self.segments[1:]):
+            token = session_manager.create_tool_token(function_name, call_id)
+            parts.append(quote_plus(token).encode("ascii"))
+            parts.append(segment)
+        return b"".join(parts)
+
+
+def merge_global_data(document: bytes, global_data: Dict[str, Any]) -> bytes:
+    """Return a serialized SWML document with global_data merged into its AI verb"""
+    swml = json.loads(document)
+    for verb in swml.get("sections", {}).get("main", []):
+        if isinstance(verb, dict) and "ai" in verb:
+            verb["ai"]["global_data"] = {**verb["ai"].get("global_data", {}), **global_data}
+    return json.dumps(swml).encode("utf-8")
+
+
+def _template_token_function(encoded_token: bytes) -> Optional[str]:
+    """Return the function name of a token minted for TEMPLATE_CALL_ID, if it is one"""
+    try:
+        decoded = base64.urlsafe_b64decode(unquote_plus(encoded_token.decode("ascii"))).decode()
+    except (ValueError, UnicodeDecodeError):
+        return None
+    parts = decoded.split(".")
+    if len(parts) != 5 or parts[0] != TEMPLATE_CALL_ID:
+        return None
+    return parts[1]
+
+
+class SWMLRenderCache:
+    """
+    Bounded cache of rendered SWML documents
+
+    Keys are (route, transfer flag, resolved base URL). The base URL comes from
+    proxy headers, so the cache is LRU-bounded to keep spoofed hosts from
+    growing it without limit.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, bool, str], CachedSWMLDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple[str, bool, str]) -> Optional[CachedSWMLDocument]:
+        with self._lock:
+            document = self._entries.get(key)
+            if document is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return document
+
+    def put(self, key: Tuple[str, bool, str], document: CachedSWMLDocument) -> None:
+        with self._lock:
+            self._entries[key] = document
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, route: Optional[str] = None) -> int:
+        """
+        Drop cached documents for one route, or everything when route is None
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if route is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [key for key in self._entries if key[0] == route]
+                for key in stale:
+                    del self._entries[key]
+                removed = len(stale)
+            self.invalidations += 1
+        if removed:
+            logger.debug("swml_render_cache_invalidated", route=route, removed=removed)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(document.size for document in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+class CachedSWMLMixin:
+    """
+    Serve SWML for an AgentBase subclass from a shared SWMLRenderCache
+
+    Must come before AgentBase in the bases. Only renders driven by the dynamic
+    config callback are cached; anything else falls through to the SDK.
+    """
+
+    _render_cache: Optional[SWMLRenderCache] = None
+    _render_cache_owner: Optional[int] = None
+    _direct_base_url: Optional[str] = None
+
+    def set_render_cache(self, cache: Optional[SWMLRenderCache]):
+        """Attach (or detach with None) the render cache used by this agent"""
+        self._render_cache = cache
+        self._render_cache_owner = id(self)
+        return self
+
+    def invalidate_render_cache(self) -> None:
+        """Drop this agent's cached documents after its prompt, tools or skills change"""
+        if self._render_cache_owner != id(self):
+            # Ephemeral per-request copies share our __dict__ values and mutate
+            # themselves by design (including skill re-loads); never invalidate for them
+            return
+        self._direct_base_url = None
+        if self._render_cache is not None:
+            self._render_cache.invalidate(self.route)
+
+    def _resolved_base_url(self) -> str:
+        """Base URL the document's webhooks will point at for the current request"""
+        proxy_url_base = getattr(self, "_proxy_url_base", None)
+        if proxy_url_base:
+            return proxy_url_base.rstrip("/")
+        # Without a proxy the URL only depends on process config; resolve it once
+        if self._direct_base_url is None:
+            self._direct_base_url = self.get_full_url(include_auth=True)
+        return self._direct_base_url
+
+    def _render_swml(self, call_id: str = None, modifications: Optional[dict] = None):
+        cache = self._render_cache
+        if (
+            cache is None
+            or not modifications
+            or set(modifications) - {"__use_ephemeral_agent", "__request", "__request_data", "global_data"}
+        ):
+            return super()._render_swml(call_id, modifications)
+
+        # Per-call global data is merged into the served copy, not the template
+        global_data = modifications.get("global_data")
+        if global_data is not None:
+            modifications = {key: value for key, value in modifications.items() if key != "global_data"}
+
+        request = modifications.get("__request")
+        transfer = bool(request is not None and request.query_params.get("transfer") == "true")
+        key = (self.route, transfer, self._resolved_base_url())
+
+        document = cache.get(key)
+        if document is None:
+            rendered = super()._render_swml(TEMPLATE_CALL_ID, modifications)
+            document = CachedSWMLDocument.from_rendered(rendered)
+            cache.put(key, document)
+
+        if call_id is None:
+            call_id = self._session_manager.create_session()
+        rendered = document.render(self._session_manager, call_id)
+        if global_data:
+            return merge_global_data(rendered, global_data)
+        _served_etag.set(document.etag)
+        return rendered
+
+    async def _handle_root_request(self, request):
+        """The SDK's SWML endpoint, plus an ETag and conditional GET for documents served from the cache"""
+        if request.method != "GET" or self._render_cache is None:
+            return await super()._handle_root_request(request)
+        reset = _served_etag.set(None)
+        try:
+            response = await super()._handle_root_request(request)
+            etag = _served_etag.get()
+        finally:
+            _served_etag.reset(reset)
+        if etag is None or response.status_code != 200:
+            return response
+        if etag_matches(request, etag):
+            return not_modified(etag, SWML_CACHE_CONTROL)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = SWML_CACHE_CONTROL
+        return response
+
+
+def _invalidating(method_name: str):
+    """Wrap an AgentBase mutator so it invalidates the render cache afterwards"""
+    def method(self, *args, **kwargs):
+        result = getattr(super(CachedSWMLMixin, self), method_name)(*args, **kwargs)
+        self.invalidate_render_cache()
+        return result
+    method.__name__ = method_name
+    method.__doc__ = f"{method_name} that also invalidates the SWML render cache"
+    return method
+
+
+for _method_name in INVALIDATING_METHODS:
+    setattr(CachedSWMLMixin, _method_name, _invalidating(_method_name))
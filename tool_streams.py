@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Streamed SWAIG tool results
+
+A SWAIG webhook answers with one JSON document, and the AI says nothing
+until it has it, so a tool that builds a long answer is dead air for the
+caller until the last paragraph is done. A tool handler can instead be an
+async generator that yields its result in pieces, the first actionable
+sentence first:
+
+    @self.tool("diagnose_hardware_issue", description="...")
+    async def diagnose_hardware_issue(symptoms: str, system_specs: str):
+        results = await self.knowledge.search_async(symptoms)
+        yield f"Start with this: {first_step(results[0]['content'])}"
+        yield await slower_follow_up(...)
+
+The SWAIG response goes back as soon as the first piece is ready, along with
+anything else that arrives within TOOL_STREAM_WINDOW_MS (default 20). The
+generator keeps running on the tool loop. If it hasn't finished, the
+response tells the AI to speak what it has and then call
+continue_tool_result, which returns the remaining pieces, waiting for them
+if need be. A generator that finishes within the window costs nothing
+extra: its whole result goes out in one response, as before.
+
+Pieces are strings or SwaigFunctionResults; their texts are joined with
+newlines and their actions are kept in order. Streams are per call, and a
+new one replaces a call's previous one. Whatever a finished stream still
+holds is also written to the call context store, so a continuation served by
+another worker (USE_DATABASE_CONTEXT) finds it there.
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from signalwire_agents.core.function_result import SwaigFunctionResult
+from signalwire_agents.core.logging_config import get_logger
+
+from call_context import MemoryContextStore, get_context_store, request_call_id
+from ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+CONTINUATION_TOOL = "continue_tool_result"
+DEFAULT_STREAM_WINDOW_MS = 20
+# How long continue_tool_result waits for the rest of a result
+DEFAULT_CONTINUATION_TIMEOUT = 10.0
+STREAM_TTL = 300.0
+MAX_STREAMS = 1024
+
+Piece = Union[str, SwaigFunctionResult]
+
+_NUMBERED_STEP = re.compile(r"^\s*1[.)]\s+(.+)$", re.M)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def first_step(text: str, max_chars: int = 200) -> str:
+    """
+    The first actionable sentence of a knowledge base section
+
+    The first numbered step if the section has one, otherwise its first
+    sentence, without markdown emphasis.
+    """
+    match = _NUMBERED_STEP.search(text)
+    sentence = match.group(1) if match else _SENTENCE_END.split(" ".join(text.split()), maxsplit=1)[0]
+    sentence = sentence.replace("**", "").strip()
+    if len(sentence) > max_chars:
+        sentence = sentence[:max_chars].rsplit(" ", 1)[0] + "..."
+    return sentence
+
+
+def merge_pieces(pieces: List[Piece]) -> SwaigFunctionResult:
+    """One SwaigFunctionResult for a run of pieces: texts joined by newlines, actions in order"""
+    merged = SwaigFunctionResult()
+    texts = []
+    for piece in pieces:
+        if isinstance(piece, SwaigFunctionResult):
+            if piece.response:
+                texts.append(piece.response)
+            merged.add_actions(piece.action)
+            merged.post_process = merged.post_process or piece.post_process
+        elif piece:
+            texts.append(str(piece))
+    merged.set_response("\n".join(texts))
+    return merged
+
+
+def _window() -> float:
+    return float(os.getenv("TOOL_STREAM_WINDOW_MS", str(DEFAULT_STREAM_WINDOW_MS))) / 1000
+
+
+class ToolStream:
+    """
+    An async generator tool result, drained on the tool loop as it yields
+
+    take() hands out the pieces that have arrived since the last take().
+    """
+
+    def __init__(self, name: str, generator, call_id: Optional[str] = None):
+        self.name = name
+        self.call_id = call_id
+        self._generator = generator
+        self._pieces: List[Piece] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        # Set once a take() returns before the end: a continuation will follow
+        self._continued = False
+        self._condition = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> "ToolStream":
+        asyncio.run_coroutine_threadsafe(self._drain(), loop)
+        return self
+
+    async def _drain(self) -> None:
+        try:
+            async for piece in self._generator:
+                with self._condition:
+                    self._pieces.append(piece)
+                    self._condition.notify_all()
+        except Exception as e:
+            logger.error("tool_stream_failed", tool=self.name, error=str(e))
+            self._error = e
+        finally:
+            with self._condition:
+                self._done = True
+                self._persist()
+                self._condition.notify_all()
+
+    def take(self, timeout: Optional[float] = None, window: float = 0.0) -> Tuple[List[Piece], bool]:
+        """
+        Wait for at least one new piece (or the end), then up to window for more
+
+        Returns:
+            (new pieces, whether the generator has finished)
+
+        Raises:
+            TimeoutError: If nothing arrived within timeout
+            Exception: Whatever the generator raised, if it failed before yielding anything new
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._pieces or self._done, timeout):
+                raise TimeoutError(f"{self.name} produced nothing in {timeout}s")
+            if window > 0 and not self._done:
+                self._condition.wait_for(lambda: self._done, window)
+            pieces, self._pieces = self._pieces, []
+            done = self._done
+            continued, self._continued = self._continued, self._continued or not done
+            if not continued and not done and self.call_id:
+                # Tells a continuation on another worker to wait for the rest
+                get_context_store().put(_stored_key(self.call_id), {"tool": self.name, "pending": True})
+        if not pieces and self._error is not None:
+            raise self._error
+        if done and continued and self.call_id:
+            get_context_store().delete(_stored_key(self.call_id))
+        return pieces, done
+
+    def _persist(self) -> None:
+        """
+        Leave unclaimed pieces in the context store for a continuation on another worker
+
+        Only streams a continuation is expected for; called with the
+        condition held, so a concurrent take() either claims the pieces first
+        or deletes what is written here after.
+        """
+        if not (self.call_id and self._continued):
+            return
+        if self._pieces:
+            result = merge_pieces(self._pieces)
+            get_context_store().put(_stored_key(self.call_id), {
+                "tool": self.name, "response": result.response, "action": result.action,
+            })
+        else:
+            get_context_store().delete(_stored_key(self.call_id))
+
+
+def _stored_key(call_id: str) -> str:
+    return f"{call_id}:tool_stream"
+
+
+_streams = TTLCache(max_entries=MAX_STREAMS, ttl=STREAM_TTL)
+
+
+def start_stream(name: str, generator, raw_data: Optional[Dict[str, Any]], loop) -> SwaigFunctionResult:
+    """
+    Start draining a tool's async generator and return the first part of its result
+
+    Blocks until the first piece arrives, like an awaited tool would.
+    """
+    call_id = request_call_id(raw_data)
+    stream = ToolStream(name, generator, call_id).start(loop)
+    try:
+        pieces, done = stream.take(window=_window())
+    except Exception as e:
+        # Same shape as the SDK's error for a failing sync handler
+        return SwaigFunctionResult(f"Error executing function '{name}': {str(e)}")
+    result = merge_pieces(pieces)
+    if not done:
+        _streams.put(call_id or "", stream)
+        result.set_response(
+            f"{result.response}\n\n(More of this result is on its way. Tell the caller the above now, "
+            f"then call {CONTINUATION_TOOL} for the rest.)"
+        )
+    return result
+
+
+def continue_stream(raw_data: Optional[Dict[str, Any]],
+                    timeout: float = DEFAULT_CONTINUATION_TIMEOUT) -> SwaigFunctionResult:
+    """The next part of the call's streamed tool result, waiting up to timeout for it"""
+    call_id = request_call_id(raw_data)
+    stream = _streams.get(call_id or "")
+    if stream is not None:
+        try:
+            pieces, done = stream.take(timeout, _window())
+        except TimeoutError:
+            return SwaigFunctionResult("The rest of the result isn't ready yet; try again in a moment.")
+        except Exception as e:
+            return SwaigFunctionResult(f"Error executing function '{stream.name}': {str(e)}")
+        result = merge_pieces(pieces)
+        if done:
+            _streams.pop(call_id or "")
+        else:
+            result.set_response(f"{result.response}\n\n(There is still more; call {CONTINUATION_TOOL} again.)")
+        return result
+
+    # Started on another worker: wait for it to finish and leave its remainder
+    store = get_context_store()
+    if call_id and not isinstance(store, MemoryContextStore):
+        deadline = time.monotonic() + timeout
+        stored = store.get(_stored_key(call_id))
+        while stored is not None and stored.get("pending") and time.monotonic() < deadline:
+            time.sleep(0.05)
+            stored = store.get(_stored_key(call_id))
+        if stored is not None and stored.get("pending"):
+            return SwaigFunctionResult("The rest of the result isn't ready yet; try again in a moment.")
+        if stored is not None:
+            store.delete(_stored_key(call_id))
+            return SwaigFunctionResult(stored["response"]).add_actions(stored.get("action") or [])
+    return SwaigFunctionResult("There is nothing more to add to the last result.")
+
+
+def define_continuation_tool(agent) -> None:
+    """Register continue_tool_result on an agent whose tools stream their results"""
+    agent.define_tool(
+        name=CONTINUATION_TOOL,
+        description="Get the rest of a tool result that said more of it is on its way",
+        parameters={},
+        handler=lambda args, raw_data: continue_stream(raw_data),
+    )